@@ -0,0 +1,206 @@
+# pipeline.py
+"""Phase-by-phase TesLang compilation: lex, parse, analyze, generate, optimize"""
+
+import threading
+
+import Parser.parser as teslang_parser
+from Lexer.lexer import base_lexer, make_lexer
+from Lexer.names import NameTable
+from Lexer.scanner import tokenize
+from Parser.ast_nodes import ASTNode
+from SemanticAnalyzerF.semantic_analyzer import SemanticAnalyzer, StreamingAnalyzer
+from IR.codegen import CodeGenerator
+from IR.optimizer import optimize as optimize_code
+
+_parsers = {}
+# The parsers and Parser.parser keep their state at module level, so threads
+# take turns parsing; the other phases run side by side
+_parser_lock = threading.RLock()
+
+
+def get_parser(kind='lalr'):
+    """The parser of the given kind, built once"""
+    with _parser_lock:
+        if kind not in _parsers:
+            _parsers[kind] = teslang_parser.make_parser(kind)
+        return _parsers[kind]
+
+
+def count_nodes(node):
+    """Number of AST nodes below and including node"""
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+        elif isinstance(current, ASTNode):
+            count += 1
+            stack.extend(value for name, value in vars(current).items()
+                         if name != 'line' and isinstance(value, (ASTNode, list)))
+    return count
+
+
+def count_instructions(code):
+    """Executable TSM instructions in generated code"""
+    count = 0
+    for line in code.splitlines():
+        line = line.strip()
+        if line and not line.startswith('#') and not line.endswith(':') and not line.startswith('proc '):
+            count += 1
+    return count
+
+
+class TokenStream:
+    """Feeds an already-lexed token list to the parser
+
+    lexdata is the source text, which the parser reads to find token columns,
+    and names the NameTable the tokens were interned in.
+    """
+
+    def __init__(self, tokens, lexdata=None, names=None):
+        self.tokens = tokens
+        self.lexdata = lexdata
+        self.names = names
+        self.position = 0
+
+    def token(self):
+        if self.position >= len(self.tokens):
+            return None
+        tok = self.tokens[self.position]
+        self.position += 1
+        return tok
+
+
+def lex(code, lexer='ply', names=None):
+    """Split source code into a token list with the PLY lexer or the hand-written scanner
+
+    Identifiers are interned in names, the compilation's NameTable.
+    """
+    if names is None:
+        names = NameTable()
+    if lexer == 'dfa':
+        return tokenize(code, names=names)[0]
+    lexer = base_lexer().clone()
+    lexer.lineno = 1
+    lexer.names = names
+    lexer.input(code)
+    return list(iter(lexer.token, None))
+
+
+def parse(tokens, code=None, parser='lalr', names=None):
+    """Build the AST from a token list; returns (ast, syntax errors)
+
+    Pass the source code the tokens came from to record node columns, and
+    the NameTable they were lexed with; without one the ID tokens are
+    renumbered into a new table.
+    """
+    if names is None:
+        names = NameTable.from_tokens(tokens)
+    with _parser_lock:
+        teslang_parser.reset_parser_state()
+        if parser == 'descent':
+            ast = get_parser(parser).parse_tokens(tokens, code, names)
+        else:
+            stream = TokenStream(tokens, code, names)
+            ast = get_parser(parser).parse(lexer=stream, tokenfunc=stream.token, debug=False)
+        return ast, list(teslang_parser.errors)
+
+
+def analyze(ast):
+    return SemanticAnalyzer().analyze(ast)
+
+
+def generate(ast, bounds_checks=False):
+    """Emit TSM code; returns (code, parameter counts per procedure)"""
+    generator = CodeGenerator(bounds_checks)
+    return generator.generate(ast), generator.param_counts
+
+
+def optimize(code, param_counts):
+    return optimize_code(code, param_counts)
+
+
+class CompileResult:
+    """Outputs of one run through the pipeline"""
+
+    def __init__(self):
+        self.tokens = None
+        self.ast = None
+        self.code = None
+        self.errors = []
+
+
+def compile_source(code, optimize_output=False, bounds_checks=False, profiler=None, lexer='ply',
+                   parser='lalr'):
+    """Run every phase on code, recording each one when a profiler is given"""
+    def run(name, func, *args, **counter):
+        if profiler is None:
+            return func(*args)
+        return profiler.run(name, func, *args, **counter)
+
+    get_parser(parser)
+    result = CompileResult()
+    names = NameTable()
+    result.tokens = run('lex', lex, code, lexer, names, count=len, unit='tokens')
+    result.ast, result.errors = run('parse', parse, result.tokens, code, parser, names,
+                                    count=lambda out: count_nodes(out[0]), unit='nodes')
+    if result.errors or not result.ast:
+        result.errors = result.errors or ["Syntax error: empty program"]
+        return result
+    result.errors = run('semantic', analyze, result.ast, count=len, unit='errors')
+    if result.errors:
+        return result
+    result.code, param_counts = run('codegen', generate, result.ast, bounds_checks,
+                                    count=lambda out: count_instructions(out[0]), unit='instructions')
+    if optimize_output:
+        result.code = run('optimize', optimize, result.code, param_counts,
+                          count=count_instructions, unit='instructions')
+    return result
+
+
+def compile_pipelined(code, writer, bounds_checks=False, lexer='ply', parser='lalr'):
+    """Compile code one top-level function at a time, writing its procs to a TsmWriter
+
+    Tokens are read from the lexer as the parser asks for them. As soon as
+    a top-level function is reduced it is checked against the signatures
+    seen so far, generated and written, and then dropped, so memory stays
+    flat however long the source is. Checks involving calls to functions
+    defined later wait in the analyzer until the end, so a function may be
+    generated before its errors are known; a generation failure is only
+    raised if the program turns out to have none. Returns the errors, as
+    compile_source reports them; once one is found nothing more is
+    written, and what was written should be discarded.
+    """
+    parser_object = get_parser(parser)
+    source = make_lexer(lexer)
+    source.input(code)
+    names = source.names
+    analyzer = StreamingAnalyzer(names)
+    generator = CodeGenerator(bounds_checks, writer)
+    generation_error = None
+
+    def compile_function(function):
+        nonlocal generation_error
+        if teslang_parser.errors:
+            return
+        if analyzer.analyze_function(function) and generation_error is None:
+            try:
+                generator.generate_function(function, len(names))
+            except Exception as e:
+                generation_error = e
+
+    with _parser_lock:
+        teslang_parser.reset_parser_state()
+        teslang_parser.function_sink = compile_function
+        try:
+            ast = parser_object.parse(lexer=source, debug=False)
+        finally:
+            teslang_parser.function_sink = None
+        syntax_errors = list(teslang_parser.errors)
+    if syntax_errors or not ast:
+        return syntax_errors or ["Syntax error: empty program"]
+    errors = analyzer.finish()
+    if generation_error is not None and not errors:
+        raise generation_error
+    return errors
@@ -0,0 +1,102 @@
+# profiler.py
+"""Per-phase wall time, peak memory and output size of a compilation"""
+
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+
+class PhaseRecord:
+    """Measurements of one compiler phase"""
+
+    def __init__(self, name, seconds, peak_bytes, count, unit):
+        self.name = name
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.count = count
+        self.unit = unit
+
+    def as_dict(self):
+        return {'phase': self.name, 'seconds': self.seconds, 'peak_bytes': self.peak_bytes,
+                'count': self.count, 'unit': self.unit}
+
+
+class PhaseProfiler:
+    """Runs phase functions and records how long they take and how much they allocate"""
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.records = []
+        self.calls = {}
+
+    def run(self, name, func, *args, count=None, unit=''):
+        """Call func(*args) as phase name and return its result"""
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = None
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                peak -= base
+                if started_tracing:
+                    tracemalloc.stop()
+        self.calls[name] = (func, args)
+        self.records.append(PhaseRecord(name, elapsed, peak, count(result) if count else None, unit))
+        return result
+
+    @property
+    def total_seconds(self):
+        return sum(record.seconds for record in self.records)
+
+    def slowest(self):
+        return max(self.records, key=lambda record: record.seconds) if self.records else None
+
+    def report(self):
+        """Timing table, one row per phase"""
+        total = self.total_seconds
+        lines = [f"{'Phase':<10} | {'Time ms':>9} | {'%':>5} | {'Peak KB':>9} | Output",
+                 '-' * 60]
+        for record in self.records:
+            share = record.seconds / total * 100 if total else 0
+            peak = f"{record.peak_bytes / 1024:>9.1f}" if record.peak_bytes is not None else f"{'-':>9}"
+            output = f"{record.count} {record.unit}" if record.count is not None else ''
+            lines.append(f"{record.name:<10} | {record.seconds * 1000:>9.2f} | {share:>5.1f} | {peak} | {output}")
+        lines.append('-' * 60)
+        lines.append(f"{'total':<10} | {total * 1000:>9.2f} |")
+        return '\n'.join(lines)
+
+    def as_dict(self):
+        return {'total_seconds': self.total_seconds,
+                'phases': [record.as_dict() for record in self.records]}
+
+    def write_json(self, path, **extra):
+        data = dict(extra)
+        data.update(self.as_dict())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def profile_slowest(self, path=None, limit=15):
+        """Re-run the slowest phase under cProfile; returns (phase name, stats text)"""
+        record = self.slowest()
+        if record is None:
+            return None, ''
+        func, args = self.calls[record.name]
+        profile = cProfile.Profile()
+        profile.runcall(func, *args)
+        if path:
+            profile.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(limit)
+        return record.name, out.getvalue()
@@ -0,0 +1,245 @@
+# server.py
+"""Long-running compile server: one warm compiler answering JSON-RPC requests"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from Driver.pipeline import compile_source, get_parser
+
+CACHE_SIZE = 128
+WARMUP_SOURCE = "funk main() <int> {\n    x :: int = 1;\n    return x;\n}\n"
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+class RPCError(Exception):
+    """A JSON-RPC error response"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class CompileCache:
+    """LRU of compile results keyed by source hash and options"""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(source, optimize, bounds_checks):
+        digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        return digest, optimize, bounds_checks
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+class CompileServer:
+    """Dispatches JSON-RPC requests to a warm compiler
+
+    The parser keeps module-level state, so compiles and cache lookups are
+    serialized with a lock.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache = CompileCache(cache_size)
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.compiles = 0
+        self.running = True
+
+    def warm_up(self):
+        get_parser()
+        compile_source(WARMUP_SOURCE)
+
+    def compile(self, params):
+        source = params.get('source')
+        if source is None and 'path' in params:
+            try:
+                with open(params['path'], 'r', encoding='utf-8') as f:
+                    source = f.read()
+            except OSError as e:
+                raise RPCError(INVALID_PARAMS, f"cannot read {params['path']}: {e}")
+        if not isinstance(source, str):
+            raise RPCError(INVALID_PARAMS, "compile needs a 'source' string or a 'path'")
+        optimize = bool(params.get('optimize', False))
+        bounds_checks = bool(params.get('bounds_checks', False))
+
+        key = self.cache.key(source, optimize, bounds_checks)
+        start = time.perf_counter()
+        with self.lock:
+            entry = self.cache.get(key)
+            cached = entry is not None
+            if not cached:
+                entry = compile_entry(source, optimize, bounds_checks)
+                self.cache.put(key, entry)
+                self.compiles += 1
+        return dict(entry, cached=cached, seconds=time.perf_counter() - start)
+
+    def stats(self, params):
+        return {'uptime': time.time() - self.started, 'compiles': self.compiles,
+                'cache_entries': len(self.cache.entries), 'cache_size': self.cache.size,
+                'hits': self.cache.hits, 'misses': self.cache.misses}
+
+    def clear(self, params):
+        with self.lock:
+            self.cache.entries.clear()
+        return True
+
+    def shutdown(self, params):
+        self.running = False
+        return True
+
+    METHODS = ('compile', 'stats', 'clear', 'shutdown')
+
+    def handle(self, message):
+        """Answer one decoded request; returns the response dict, or None for notifications"""
+        request_id = message.get('id') if isinstance(message, dict) else None
+        try:
+            if not isinstance(message, dict) or not isinstance(message.get('method'), str):
+                raise RPCError(INVALID_REQUEST, "invalid request")
+            method = message['method']
+            if method not in self.METHODS:
+                raise RPCError(METHOD_NOT_FOUND, f"method {method} not found")
+            params = message.get('params') or {}
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "params must be an object")
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': getattr(self, method)(params)}
+        except RPCError as e:
+            response = {'jsonrpc': '2.0', 'id': request_id,
+                        'error': {'code': e.code, 'message': e.message}}
+        if isinstance(message, dict) and 'id' not in message:
+            return None
+        return response
+
+    def handle_line(self, line):
+        """Answer one line of JSON text; returns the response line or None"""
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            response = {'jsonrpc': '2.0', 'id': None,
+                        'error': {'code': PARSE_ERROR, 'message': f"parse error: {e}"}}
+        else:
+            response = self.handle(message)
+        return json.dumps(response) + '\n' if response is not None else None
+
+    def serve_stream(self, input_stream, output_stream):
+        """Serve newline-delimited JSON-RPC until end of input or shutdown"""
+        for line in input_stream:
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                output_stream.write(response)
+                output_stream.flush()
+            if not self.running:
+                break
+
+    def serve_socket(self, path):
+        """Serve newline-delimited JSON-RPC on a Unix socket, one thread per connection"""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    response = server.handle_line(line.decode('utf-8'))
+                    if response is not None:
+                        self.wfile.write(response.encode('utf-8'))
+                        self.wfile.flush()
+                    if not server.running:
+                        threading.Thread(target=socket_server.shutdown, daemon=True).start()
+                        return
+
+        if os.path.exists(path):
+            os.unlink(path)
+        socket_server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        socket_server.daemon_threads = True
+        try:
+            socket_server.serve_forever()
+        finally:
+            socket_server.server_close()
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def compile_entry(source, optimize, bounds_checks):
+    """Cache entry of one compile: its code and errors, the lexer's included
+
+    The lexers print illegal tokens and unclosed comments instead of
+    returning them, which would put them between the responses in stdio mode.
+    """
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+        try:
+            result = compile_source(source, optimize, bounds_checks)
+            code, errors = result.code, list(result.errors)
+        except Exception as e:
+            code, errors = None, [f"Compiler error: {str(e)}"]
+    return {'code': code, 'errors': printed.getvalue().splitlines() + errors}
+
+
+def request(path, method, params=None, request_id=1):
+    """Send one request to a server listening on a Unix socket and return its response"""
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        message = {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params or {}}
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as reader:
+            return json.loads(reader.readline())
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--socket", metavar="PATH",
+                            help="listen on a Unix socket instead of stdin/stdout")
+    arg_parser.add_argument("--cache-size", type=int, default=CACHE_SIZE,
+                            help=f"compile results kept in memory (default: {CACHE_SIZE})")
+    args = arg_parser.parse_args(argv)
+
+    server = CompileServer(args.cache_size)
+    server.warm_up()
+    if args.socket:
+        print(f"teslang compile server listening on {args.socket}", file=sys.stderr)
+        try:
+            server.serve_socket(args.socket)
+        except KeyboardInterrupt:
+            pass
+    else:
+        server.serve_stream(sys.stdin, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# service.py
+"""Asyncio compile service: bounded worker pool, superseded-compile cancellation, backpressure"""
+
+import asyncio
+import concurrent.futures
+import time
+
+from Driver.pipeline import compile_source, get_parser
+
+MAX_WORKERS = 4
+MAX_QUEUE = 64
+
+OK = 'ok'
+FAILED = 'errors'
+SUPERSEDED = 'superseded'
+
+
+class ServiceBusy(Exception):
+    """Raised instead of waiting when the queue is full and the caller asked not to wait"""
+
+
+class CompileOutcome:
+    """Structured result of one compile request"""
+
+    def __init__(self, key, version, status, ast=None, errors=None, code=None, seconds=0.0):
+        self.key = key
+        self.version = version
+        self.status = status
+        self.ast = ast
+        self.errors = errors or []
+        self.code = code
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.status == OK
+
+    def __repr__(self):
+        return f"CompileOutcome({self.key!r}, v{self.version}, {self.status})"
+
+
+def warm_worker():
+    get_parser()
+
+
+def compile_job(source, optimize, bounds_checks):
+    """Worker body: run the pipeline and return (ast, errors, code, seconds)
+
+    The parser keeps module-level state, so worker threads take turns in the
+    parse phase only (see Driver.pipeline); worker processes each have their
+    own parser.
+    """
+    start = time.perf_counter()
+    try:
+        result = compile_source(source, optimize, bounds_checks)
+    except Exception as e:
+        return None, [f"Compiler error: {str(e)}"], None, time.perf_counter() - start
+    return result.ast, list(result.errors), result.code, time.perf_counter() - start
+
+
+class CompileService:
+    """Runs compiles off the event loop
+
+    At most max_workers compiles run at once and at most max_queue more wait
+    for a worker; further requests wait for a slot (or raise ServiceBusy with
+    wait=False). A request for a key, typically a file path, supersedes any
+    older request for the same key: a queued job is cancelled before it
+    starts, a running one has its result dropped, and the older caller gets a
+    'superseded' outcome. A job keeps its slot until it has really ended,
+    so a dropped one that is still running counts against the limit.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_queue=MAX_QUEUE, processes=False):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        if processes:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers, initializer=warm_worker)
+        else:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        self.slots = None
+        self.latest = {}
+        self.pending = {}
+        self.running = 0
+        self.waiting = 0
+        self.versions = 0
+        self.completed = 0
+        self.superseded = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def outstanding(self):
+        """Jobs in the pool, running or queued for a worker, plus requests waiting for a slot"""
+        return self.running + self.waiting
+
+    def supersede(self, key):
+        future = self.pending.get(key)
+        if future is not None and not future.done():
+            future.cancel()
+
+    async def compile(self, key, source, optimize=False, bounds_checks=False, wait=True):
+        """Compile source for key and return a CompileOutcome"""
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        self.versions += 1
+        version = self.versions
+        self.latest[key] = version
+        self.supersede(key)
+
+        try:
+            return await self.run_job(key, version, source, optimize, bounds_checks, wait)
+        finally:
+            # Nothing newer is waiting for key once its latest request is done
+            if self.latest.get(key) == version:
+                del self.latest[key]
+
+    async def run_job(self, key, version, source, optimize, bounds_checks, wait):
+        """Wait for a slot and compile, unless a newer request for key arrives first"""
+        if self.slots.locked() and not wait:
+            raise ServiceBusy(f"{self.outstanding} compiles outstanding")
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        if self.latest.get(key) != version:
+            self.slots.release()
+            return self.dropped(key, version)
+        try:
+            job = self.executor.submit(compile_job, source, optimize, bounds_checks)
+        except BaseException:
+            self.slots.release()
+            raise
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        # Cancelling the future below stops waiting for the job, not the job itself
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self.job_done))
+        future = asyncio.wrap_future(job)
+        self.pending[key] = future
+        try:
+            ast, errors, code, seconds = await future
+        except asyncio.CancelledError:
+            if self.latest.get(key) == version:
+                raise
+            return self.dropped(key, version)
+        finally:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+
+        if self.latest.get(key) != version:
+            return self.dropped(key, version)
+        self.completed += 1
+        return CompileOutcome(key, version, FAILED if errors else OK, ast, errors, code, seconds)
+
+    def job_done(self):
+        self.running -= 1
+        self.slots.release()
+
+    def dropped(self, key, version):
+        self.superseded += 1
+        return CompileOutcome(key, version, SUPERSEDED)
+
+    async def compile_file(self, path, optimize=False, bounds_checks=False, wait=True):
+        """Read path without blocking the loop and compile it under its own name"""
+        source = await asyncio.to_thread(read_source, path)
+        return await self.compile(path, source, optimize, bounds_checks, wait)
+
+    async def close(self):
+        for key in list(self.pending):
+            self.supersede(key)
+        await asyncio.to_thread(self.executor.shutdown, True, cancel_futures=True)
+
+
+def read_source(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
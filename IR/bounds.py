@@ -0,0 +1,265 @@
+# bounds.py
+"""Range analysis that proves vector accesses inside counted loops are in bounds"""
+
+from Parser.ast_nodes import *
+
+
+def child_nodes(node):
+    """AST nodes directly referenced by a node's attributes"""
+    if isinstance(node, list):
+        return node
+    children = []
+    for name, value in vars(node).items():
+        if name == 'line':
+            continue
+        if isinstance(value, ASTNode):
+            children.append(value)
+        elif isinstance(value, list):
+            children.extend(item for item in value if isinstance(item, (ASTNode, list)))
+    return children
+
+
+def walk(node):
+    """Yield a node and everything below it, without entering nested functions"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(child for child in child_nodes(current) if not isinstance(child, Function))
+
+
+def assigned_names(node):
+    """Names of the variables a statement tree assigns to"""
+    names = set()
+    for current in walk(node):
+        if isinstance(current, Assignment) and isinstance(current.target, str):
+            names.add(current.target)
+        elif isinstance(current, For):
+            names.add(current.var)
+    return names
+
+
+def contains_loop(node):
+    return any(isinstance(current, (For, While, DoWhile)) for current in walk(node))
+
+
+def mentions(node, name):
+    for current in walk(node):
+        if isinstance(current, Identifier) and current.name == name:
+            return True
+        if isinstance(current, Assignment) and current.target == name:
+            return True
+        if isinstance(current, ArrayAccess) and current.array == name:
+            return True
+    return False
+
+
+def loop_offset(index, var):
+    """Constant c when index is `var + c`, otherwise None"""
+    if isinstance(index, Identifier) and index.name == var:
+        return 0
+    if isinstance(index, BinaryOp) and index.op in ('+', '-'):
+        left, right = index.left, index.right
+        if isinstance(left, Identifier) and left.name == var and isinstance(right, Number):
+            return right.value if index.op == '+' else -right.value
+        if index.op == '+' and isinstance(right, Identifier) and right.name == var and isinstance(left, Number):
+            return left.value
+    return None
+
+
+class ValueRange:
+    """Integer interval whose upper bound may be relative to a symbol
+
+    The symbol is ('length', x) for length(x) or ('value', n) for a variable
+    that is never reassigned in the function.
+    """
+
+    def __init__(self, low=None, high=None, symbol=None):
+        self.low = low
+        self.high = high
+        self.symbol = symbol
+
+    def __repr__(self):
+        top = f"{self.symbol[1]} + {self.high}" if self.symbol else self.high
+        return f"[{self.low}, {top}]"
+
+
+UNKNOWN = ValueRange()
+
+
+class BoundsAnalyzer:
+    """Finds the vector accesses of one function that need no run-time check"""
+
+    def __init__(self, function):
+        self.function = function
+        self.safe = set()
+        self.guards = {}
+        self.guarded = {}
+        self.constants = self.collect_unassigned()
+        self.fixed_lengths = {}
+        self.length_symbols = {}
+        self.collect_lengths()
+        self.visit_statements(function.body, {}, None)
+
+    def is_safe(self, access):
+        return id(access) in self.safe
+
+    def collect_unassigned(self):
+        """Parameters and variables the function never assigns after entry"""
+        assigned = assigned_names(self.function.body)
+        return {param.name for param in self.function.params if param.name not in assigned}
+
+    def collect_lengths(self):
+        """Local vectors only ever assigned list(N), list(n) or [..] literals
+
+        The first statement of the body that mentions such a vector must be
+        its assignment, so every later access sees an allocated vector.
+        """
+        params = {param.name for param in self.function.params}
+        sizes = {}
+        for current in walk(self.function.body):
+            if not isinstance(current, Assignment) or not isinstance(current.target, str):
+                continue
+            size = self.vector_size(current.value)
+            previous = sizes.get(current.target, size)
+            if size is None or previous is None or type(size) != type(previous):
+                sizes[current.target] = None
+            elif isinstance(size, int):
+                sizes[current.target] = min(size, previous)
+            else:
+                sizes[current.target] = size if size == previous else None
+
+        statements = self.function.body
+        if hasattr(statements, 'statements'):
+            statements = statements.statements
+        elif not isinstance(statements, list):
+            statements = [statements]
+        flattened = []
+        for stmt in statements:
+            flattened.extend(stmt if isinstance(stmt, list) else [stmt])
+
+        for name, size in sizes.items():
+            if size is None or name in params:
+                continue
+            first = next((stmt for stmt in flattened if mentions(stmt, name)
+                          and not isinstance(stmt, VarDeclaration)), None)
+            if not isinstance(first, Assignment) or first.target != name:
+                continue
+            if isinstance(size, int):
+                self.fixed_lengths[name] = size
+            else:
+                self.length_symbols[name] = ('value', size)
+
+    def vector_size(self, value):
+        """Constant size, name of an unassigned size variable, or None"""
+        if isinstance(value, ArrayLiteral):
+            return len(value.elements)
+        if isinstance(value, FunctionCall) and value.name == 'list' and value.args:
+            size = value.args[0]
+            if isinstance(size, Number):
+                return size.value
+            if isinstance(size, Identifier) and size.name in self.constants:
+                return size.name
+        return None
+
+    def value_range(self, node, env):
+        """Conservative range of an expression given the loop variable ranges"""
+        if isinstance(node, Number):
+            return ValueRange(node.value, node.value)
+        if isinstance(node, Identifier):
+            if node.name in env:
+                return env[node.name]
+            if node.name in self.constants:
+                return ValueRange(None, 0, ('value', node.name))
+            return UNKNOWN
+        if isinstance(node, FunctionCall) and node.name == 'length' and node.args:
+            if isinstance(node.args[0], Identifier):
+                return ValueRange(0, 0, ('length', node.args[0].name))
+        if isinstance(node, BinaryOp) and node.op in ('+', '-'):
+            left = self.value_range(node.left, env)
+            right = self.value_range(node.right, env)
+            if node.op == '+':
+                low = left.low + right.low if left.low is not None and right.low is not None else None
+                high, symbol = None, None
+                if left.high is not None and right.high is not None and not (left.symbol and right.symbol):
+                    high, symbol = left.high + right.high, left.symbol or right.symbol
+                return ValueRange(low, high, symbol)
+            low = None
+            if left.low is not None and right.high is not None and right.symbol is None:
+                low = left.low - right.high
+            high = left.high - right.low if left.high is not None and right.low is not None else None
+            return ValueRange(low, high, left.symbol if high is not None else None)
+        return UNKNOWN
+
+    def in_bounds(self, access, env):
+        index = self.value_range(access.index, env)
+        if index.low is None or index.low < 0 or index.high is None:
+            return False
+        if index.symbol is not None:
+            length = ('length', access.array)
+            return index.symbol in (length, self.length_symbols.get(access.array)) and index.high <= -1
+        size = self.fixed_lengths.get(access.array)
+        return size is not None and index.high <= size - 1
+
+    def visit_statements(self, node, env, loop):
+        for stmt in child_nodes(node) if isinstance(node, (list, Block)) else [node]:
+            if stmt is None or isinstance(stmt, Function):
+                continue
+            if isinstance(stmt, (list, Block)):
+                self.visit_statements(stmt, env, loop)
+            elif isinstance(stmt, For):
+                self.visit_For(stmt, env, loop)
+            elif isinstance(stmt, If):
+                self.visit_expression(stmt.condition, env, loop)
+                self.visit_statements(stmt.then_stmt, env, loop)
+                self.visit_statements(stmt.else_stmt, env, loop)
+            elif isinstance(stmt, (While, DoWhile)):
+                self.visit_expression(stmt.condition, env, None)
+                self.visit_statements(stmt.body, env, None)
+            else:
+                self.visit_expression(stmt, env, loop)
+
+    def visit_For(self, node, env, loop):
+        self.visit_expression(node.start, env, loop)
+        self.visit_expression(node.end, env, loop)
+        assigned = assigned_names(node.body)
+        inner_env = {name: value for name, value in env.items() if name != node.var}
+        start = self.value_range(node.start, env)
+        end = self.value_range(node.end, env)
+        if node.var not in assigned and start.low is not None:
+            if end.symbol is not None and end.symbol[1] in assigned:
+                end = UNKNOWN
+            high = end.high - 1 if end.high is not None else None
+            inner_env[node.var] = ValueRange(start.low, high, end.symbol if high is not None else None)
+
+        # The loop compares against the end's registers on every iteration, so a
+        # body that assigns one of them makes the guard's single check stale
+        end_names = {current.name for current in walk(node.end) if isinstance(current, Identifier)}
+        versioned = node.var not in assigned and not end_names & assigned and not contains_loop(node.body)
+        if versioned:
+            self.guards[id(node)] = []
+            self.guarded[id(node)] = set()
+        self.visit_statements(node.body, inner_env, (node, assigned) if versioned else None)
+        if versioned and not self.guards[id(node)]:
+            del self.guards[id(node)]
+            del self.guarded[id(node)]
+
+    def visit_expression(self, node, env, loop):
+        for current in walk(node):
+            if not isinstance(current, ArrayAccess):
+                continue
+            if self.in_bounds(current, env):
+                self.safe.add(id(current))
+            elif loop is not None:
+                self.add_guard(current, loop)
+
+    def add_guard(self, access, loop):
+        """Cover an access `x[i + c]` by one check of the whole range before the loop"""
+        node, assigned = loop
+        offset = loop_offset(access.index, node.var)
+        if offset is None or access.array in assigned:
+            return
+        guard = (access.symbol_id, offset)
+        if guard not in self.guards[id(node)]:
+            self.guards[id(node)].append(guard)
+        self.guarded[id(node)].add(id(access))
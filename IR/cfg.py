@@ -0,0 +1,244 @@
+# cfg.py
+"""Control flow graph, dominator tree and natural loops over TSM procedures"""
+
+from IR.tsm import Instruction
+
+
+class BasicBlock:
+    """A straight-line run of instructions with a single entry and exit"""
+
+    def __init__(self, index):
+        self.index = index
+        self.labels = []
+        self.instrs = []
+        self.succs = []
+        self.preds = []
+
+    @property
+    def label(self):
+        return self.labels[0] if self.labels else None
+
+    @property
+    def last(self):
+        """Last non-comment instruction of the block"""
+        for instr in reversed(self.instrs):
+            if not instr.is_comment and not instr.is_label:
+                return instr
+        return None
+
+    @property
+    def falls_through(self):
+        last = self.last
+        return last is None or not last.is_terminator
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {self.label})"
+
+
+class CFG:
+    """Basic blocks of one procedure in layout order"""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.blocks = []
+        self.label_map = {}
+        self.build(proc.body)
+
+    def build(self, instrs):
+        block = None
+        for instr in instrs:
+            if instr.is_label:
+                if block is None or any(not i.is_comment and not i.is_label for i in block.instrs):
+                    block = self.new_block()
+                block.labels.append(instr.args[0])
+                self.label_map[instr.args[0]] = block
+            elif block is None:
+                block = self.new_block()
+            block.instrs.append(instr)
+            if instr.is_jump or instr.op == 'ret':
+                block = None
+        self.link()
+
+    def new_block(self):
+        block = BasicBlock(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    def link(self):
+        """Recompute successor and predecessor edges from the layout"""
+        for block in self.blocks:
+            block.succs = []
+            block.preds = []
+        for i, block in enumerate(self.blocks):
+            last = block.last
+            if last is not None and last.is_jump:
+                target = self.label_map.get(last.target)
+                if target is not None:
+                    block.succs.append(target)
+            if block.falls_through and i + 1 < len(self.blocks):
+                if self.blocks[i + 1] not in block.succs:
+                    block.succs.append(self.blocks[i + 1])
+        for block in self.blocks:
+            for succ in block.succs:
+                succ.preds.append(block)
+
+    def renumber(self):
+        for i, block in enumerate(self.blocks):
+            block.index = i
+
+    @property
+    def entry(self):
+        return self.blocks[0] if self.blocks else None
+
+    def reverse_postorder(self):
+        order = []
+        seen = set()
+        if self.entry is None:
+            return order
+        stack = [(self.entry, iter(self.entry.succs))]
+        seen.add(self.entry)
+        while stack:
+            block, succs = stack[-1]
+            for succ in succs:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append((succ, iter(succ.succs)))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def linearize(self):
+        """Flatten the blocks back into an instruction list"""
+        body = []
+        for block in self.blocks:
+            body.extend(block.instrs)
+        return body
+
+
+def compute_dominators(cfg):
+    """Immediate dominators using the Cooper-Harvey-Kennedy algorithm.
+
+    Returns a dict mapping each reachable block to its immediate dominator;
+    the entry block maps to itself.
+    """
+    order = cfg.reverse_postorder()
+    position = {block: i for i, block in enumerate(order)}
+    idom = {}
+    if not order:
+        return idom
+    entry = order[0]
+    idom[entry] = entry
+
+    def intersect(a, b):
+        while a is not b:
+            while position[a] > position[b]:
+                a = idom[a]
+            while position[b] > position[a]:
+                b = idom[b]
+        return a
+
+    changed = True
+    while changed:
+        changed = False
+        for block in order[1:]:
+            new_idom = None
+            for pred in block.preds:
+                if pred in idom:
+                    new_idom = pred if new_idom is None else intersect(pred, new_idom)
+            if new_idom is not None and idom.get(block) is not new_idom:
+                idom[block] = new_idom
+                changed = True
+    return idom
+
+
+def dominates(idom, a, b):
+    """Check whether block a dominates block b"""
+    if b not in idom:
+        return False
+    while True:
+        if a is b:
+            return True
+        parent = idom[b]
+        if parent is b:
+            return False
+        b = parent
+
+
+class Loop:
+    """A natural loop: header block, member blocks and back-edge sources"""
+
+    def __init__(self, header):
+        self.header = header
+        self.blocks = {header}
+        self.latches = []
+
+    def exits(self):
+        """Blocks inside the loop with an edge leaving it"""
+        return [b for b in self.blocks if any(s not in self.blocks for s in b.succs)]
+
+    def __repr__(self):
+        return f"Loop({self.header.label}, {len(self.blocks)} blocks)"
+
+
+def find_loops(cfg, idom):
+    """Natural loops keyed by header, innermost (smallest) first
+
+    Only reachable blocks, those in idom, are made loop members.
+    """
+    loops = {}
+    for block in cfg.blocks:
+        for succ in block.succs:
+            if dominates(idom, succ, block):
+                loop = loops.setdefault(succ, Loop(succ))
+                loop.latches.append(block)
+                worklist = [block]
+                while worklist:
+                    node = worklist.pop()
+                    if node not in loop.blocks:
+                        loop.blocks.add(node)
+                        worklist.extend(pred for pred in node.preds if pred in idom)
+    return sorted(loops.values(), key=lambda loop: len(loop.blocks))
+
+
+def insert_preheader(cfg, loop, label, idom):
+    """Return a block that runs exactly once before entering the loop.
+
+    An existing block is reused when it is the loop's only reachable outside
+    predecessor and flows only into the header; otherwise a new labelled
+    block is laid out right before the header and outside jumps are
+    redirected to it. Returns None when the layout makes that impossible.
+    """
+    header = loop.header
+    outside = [p for p in header.preds if p not in loop.blocks and p in idom]
+    pos = cfg.blocks.index(header)
+    layout_pred = cfg.blocks[pos - 1] if pos > 0 else None
+    if layout_pred is not None and layout_pred in loop.blocks and layout_pred.falls_through:
+        return None
+    if len(outside) == 1 and outside[0].succs == [header]:
+        return outside[0]
+
+    preheader = BasicBlock(-1)
+    preheader.labels.append(label)
+    preheader.instrs.append(Instruction('label', [label]))
+    cfg.blocks.insert(pos, preheader)
+    cfg.label_map[label] = preheader
+    for pred in outside:
+        last = pred.last
+        if last is not None and last.is_jump and cfg.label_map.get(last.target) is header:
+            last.args[-1] = label
+    cfg.renumber()
+    cfg.link()
+    return preheader
+
+
+def append_to_block(block, instrs):
+    """Append instructions to a block, ahead of any trailing jump"""
+    last = block.last
+    if last is not None and (last.is_jump or last.op == 'ret'):
+        pos = block.instrs.index(last)
+        block.instrs[pos:pos] = instrs
+    else:
+        block.instrs.extend(instrs)
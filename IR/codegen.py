@@ -1,4 +1,9 @@
-from Parser.parser import *
+from Parser.ast_nodes import BinaryOp, Boolean, FunctionCall, Number, TernaryOp, UnaryOp
+from IR.optimizer import optimize as optimize_code, optimize_procs
+from IR.tsm import parse_program, format_program
+from IR.linemap import LineMap
+from IR.bounds import BoundsAnalyzer
+from IR.superinstr import select_superinstructions
 import sys
 
 class Register:
@@ -24,16 +29,32 @@ class Register:
         self.reserved = {'r0'}
 
 class CodeGenerator:
-    def __init__(self):
+    def __init__(self, bounds_checks=False, writer=None):
         self.code = []
+        self.lines = []
+        self.columns = []
+        self.current_line = None
+        self.current_column = None
         self.register_manager = Register()
         self.current_function = None
-        self.function_vars = {}
-        self.function_params = {}
+        self.name_count = 0
+        self.function_vars = []
+        self.function_params = []
+        self.param_counts = {}
         self.label_counter = 0
+        self.current_params = []
+        self.entry_index = 0
+        self.entry_label = None
+        self.bounds_checks = bounds_checks
+        self.bounds = None
+        self.unchecked = set()
+        self.writer = writer
 
     def emit(self, instruction):
+        """Append one TSM line, tagged with the source position being compiled"""
         self.code.append(instruction)
+        self.lines.append(self.current_line)
+        self.columns.append(self.current_column)
 
     def emit_comment(self, comment):
         self.emit(f"# {comment}")
@@ -60,12 +81,75 @@ class CodeGenerator:
     def visit(self, node):
         method_name = f'visit_{type(node).__name__}'
         visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        return self.at_node(node, visitor, node)
+
+    def at_node(self, node, func, *args):
+        """Call func with the source position of node as the current one"""
+        line = getattr(node, 'line', None)
+        if not line:
+            return func(*args)
+        outer = self.current_line, self.current_column
+        self.current_line, self.current_column = line, getattr(node, 'column', None)
+        try:
+            return func(*args)
+        finally:
+            self.current_line, self.current_column = outer
+
+    def emit_condition(self, node, true_label, false_label):
+        """Jump to true_label if node holds and to false_label if not; a None label falls through
+
+        && and || only evaluate their right operand when the left one does
+        not decide the result, and ! swaps the two targets.
+        """
+        self.at_node(node, self.lower_condition, node, true_label, false_label)
+
+    def lower_condition(self, node, true_label, false_label):
+        if isinstance(node, UnaryOp) and node.op == '!':
+            self.emit_condition(node.operand, false_label, true_label)
+        elif isinstance(node, BinaryOp) and node.op in ('&&', '||'):
+            skip_label = None
+            if node.op == '&&':
+                if false_label is None:
+                    false_label = skip_label = self.generate_label("and_false")
+                self.emit_condition(node.left, None, false_label)
+            else:
+                if true_label is None:
+                    true_label = skip_label = self.generate_label("or_true")
+                self.emit_condition(node.left, true_label, None)
+            self.emit_condition(node.right, None if true_label is skip_label else true_label,
+                                None if false_label is skip_label else false_label)
+            if skip_label is not None:
+                self.emit(f"{skip_label}:")
+        elif isinstance(node, Boolean):
+            label = true_label if node.value == 'true' else false_label
+            if label is not None:
+                self.emit(f"jmp {label}")
+        else:
+            reg = self.visit(node)
+            if true_label is None:
+                self.emit(f"jz {reg}, {false_label}")
+                return
+            self.emit(f"jnz {reg}, {true_label}")
+            if false_label is not None:
+                self.emit(f"jmp {false_label}")
+
+    def procs(self):
+        """Generated code as IR Procs whose instructions carry source positions"""
+        return parse_program(self.code, self.lines, self.columns)
 
     def visit_Program(self, node):
         """Visit program and collect all functions including nested ones"""
+        for function in node.functions:
+            self.generate_function(function, len(node.names))
+
+    def generate_function(self, function, name_count):
+        """Generate a top-level function and the functions nested in it
+
+        name_count is the size of the NameTable once the function is lexed.
+        """
+        self.name_count = name_count
         all_functions = []
-        self.collect_all_functions(node.functions, all_functions)
+        self.collect_all_functions([function], all_functions)
         
         for function in all_functions:
             self.visit(function)
@@ -81,21 +165,27 @@ class CodeGenerator:
     def visit_Function(self, node):
         """Visit function - handle nested functions properly"""
         self.current_function = node.name
-        self.function_vars = {}
-        self.function_params = {}
+        self.function_vars = [None] * self.name_count
+        self.function_params = [None] * self.name_count
         self.register_manager.reset_temp()
+        self.param_counts[node.name] = len(node.params)
         self.emit(f"proc {node.name}")
 
         if node.params:
             param_comments = []
             for i, param in enumerate(node.params):
                 reg = f"r{i + 1}"
-                self.function_params[param.name] = reg
+                self.function_params[param.symbol_id] = reg
                 param_comments.append(f"{param.name} => {reg}")
                 self.register_manager.reserve(reg)
                 self.register_manager.current = max(self.register_manager.current, i + 2)
             self.emit_comment(f"Parameters: {', '.join(param_comments)}")
 
+        self.current_params = [param.symbol_id for param in node.params]
+        self.entry_index = len(self.code)
+        self.entry_label = None
+        self.bounds = BoundsAnalyzer(node) if self.bounds_checks else None
+
         nested_functions = []
         for stmt in self.extract_statements(node.body):
             if hasattr(stmt, '__class__') and stmt.__class__.__name__ == 'Function':
@@ -108,15 +198,18 @@ class CodeGenerator:
                 self.emit("mov r0, 0")
             self.emit("ret")
         self.emit("")
+        if self.writer is not None:
+            self.writer.write_lines(self.code, self.lines, self.columns)
+            self.code, self.lines, self.columns = [], [], []
 
     def visit_Block(self, node):
         for stmt in self.extract_statements(node):
             self.visit(stmt)
 
     def visit_VarDeclaration(self, node):
-        if node.name not in self.function_vars and node.name not in self.function_params:
+        if self.function_vars[node.symbol_id] is None and self.function_params[node.symbol_id] is None:
             reg = self.register_manager.allocate()
-            self.function_vars[node.name] = reg
+            self.function_vars[node.symbol_id] = reg
             self.emit_comment(f"Declare {node.name} in {reg}")
 
     def visit_Assignment(self, node):
@@ -124,17 +217,15 @@ class CodeGenerator:
         value_reg = self.visit(node.value)
         
         if isinstance(node.target, str):
-            if node.target in self.function_params:
-                target_reg = self.function_params[node.target]
-            else:
-                target_reg = self.function_vars.setdefault(node.target, self.register_manager.allocate())
+            target_reg = self.function_params[node.symbol_id]
+            if target_reg is None:
+                target_reg = self.function_var(node.symbol_id)
             if value_reg != target_reg:
                 self.emit(f"mov {target_reg}, {value_reg}")
         
         elif hasattr(node.target, 'array'):  
-            array_reg = self.get_variable_register(node.target.array)
-            index_reg = self.visit(node.target.index)
-            self.emit(f"st {value_reg}, {array_reg}")
+            address_reg = self.element_address(node.target)
+            self.emit(f"st {value_reg}, {address_reg}")
 
     def visit_FunctionCall(self, node):
         """Visit function call - handle built-ins and user functions"""
@@ -155,22 +246,15 @@ class CodeGenerator:
         elif node.name == 'list':
             if node.args:
                 size_reg = self.visit(node.args[0])
-                result_reg = self.register_manager.allocate()
-                self.emit(f"call mem, {result_reg}, {size_reg}")
-                return result_reg
             else:
-                result_reg = self.register_manager.allocate()
-                zero_reg = self.register_manager.allocate()
-                self.emit(f"mov {zero_reg}, 0")
-                self.emit(f"call mem, {result_reg}, {zero_reg}")
-                return result_reg
+                size_reg = self.register_manager.allocate()
+                self.emit(f"mov {size_reg}, 0")
+            return self.allocate_vector(size_reg)
         
         elif node.name == 'length':
             if node.args:
                 array_reg = self.visit(node.args[0])
-                result_reg = self.register_manager.allocate()
-                self.emit(f"mov {result_reg}, 3") 
-                return result_reg
+                return self.load_length(array_reg)
         
         else:
             arg_regs = []
@@ -185,35 +269,167 @@ class CodeGenerator:
                 self.emit(f"call {node.name}, {result_reg}")
             return result_reg
 
+    def allocate_vector(self, size_reg):
+        """Allocate size + 1 words; the length header sits just before element 0"""
+        one_reg = self.register_manager.allocate()
+        words_reg = self.register_manager.allocate()
+        base_reg = self.register_manager.allocate()
+        result_reg = self.register_manager.allocate()
+        self.emit(f"mov {one_reg}, 1")
+        self.emit(f"add {words_reg}, {size_reg}, {one_reg}")
+        self.emit(f"call mem, {base_reg}, {words_reg}")
+        self.emit(f"st {size_reg}, {base_reg}")
+        self.emit(f"add {result_reg}, {base_reg}, {one_reg}")
+        return result_reg
+
+    def element_address(self, node):
+        """Address of x[i]: the vector register points at element 0"""
+        array_reg = self.get_variable_register(node.symbol_id)
+        checked = self.needs_bounds_check(node)
+        if isinstance(node.index, Number) and node.index.value == 0 and not checked:
+            return array_reg
+        index_reg = self.visit(node.index)
+        if checked:
+            self.emit_bounds_check(array_reg, index_reg, node.line)
+        address_reg = self.register_manager.allocate()
+        self.emit(f"add {address_reg}, {array_reg}, {index_reg}")
+        return address_reg
+
+    def needs_bounds_check(self, node):
+        if self.bounds is None or id(node) in self.unchecked:
+            return False
+        return not self.bounds.is_safe(node)
+
+    def load_length(self, array_reg):
+        one_reg = self.register_manager.allocate()
+        header_reg = self.register_manager.allocate()
+        length_reg = self.register_manager.allocate()
+        self.emit(f"mov {one_reg}, 1")
+        self.emit(f"sub {header_reg}, {array_reg}, {one_reg}")
+        self.emit(f"ld {length_reg}, {header_reg}")
+        return length_reg
+
+    def emit_bounds_check(self, array_reg, index_reg, line):
+        """Abort unless 0 <= index < length; the test is a single forward branch"""
+        ok_label = self.generate_label("bounds_ok")
+        zero_reg = self.register_manager.allocate()
+        above_reg = self.register_manager.allocate()
+        self.emit(f"mov {zero_reg}, 0")
+        self.emit(f"cmp>= {above_reg}, {index_reg}, {zero_reg}")
+        length_reg = self.load_length(array_reg)
+        below_reg = self.register_manager.allocate()
+        inside_reg = self.register_manager.allocate()
+        self.emit(f"cmp< {below_reg}, {index_reg}, {length_reg}")
+        self.emit(f"mul {inside_reg}, {above_reg}, {below_reg}")
+        self.emit(f"jnz {inside_reg}, {ok_label}")
+        line_reg = self.register_manager.allocate()
+        self.emit(f"mov {line_reg}, {line or 0}")
+        self.emit(f"call abort, {line_reg}")
+        self.emit(f"{ok_label}:")
+
     def visit_ArrayAccess(self, node):
         """Visit array access: x[0]"""
-        array_reg = self.get_variable_register(node.array)
-        index_reg = self.visit(node.index)
+        address_reg = self.element_address(node)
         result_reg = self.register_manager.allocate()
-        self.emit(f"ld {result_reg}, {array_reg}")
+        self.emit(f"ld {result_reg}, {address_reg}")
         return result_reg
 
-    def get_variable_register(self, var_name):
-        """Get register for variable name"""
-        if var_name in self.function_params:
-            return self.function_params[var_name]
-        elif var_name in self.function_vars:
-            return self.function_vars[var_name]
+    def visit_ArrayLiteral(self, node):
+        """Allocate once, then store the elements through a moving pointer"""
+        size_reg = self.register_manager.allocate()
+        self.emit(f"mov {size_reg}, {len(node.elements)}")
+        result_reg = self.allocate_vector(size_reg)
+        if not node.elements:
+            return result_reg
+        one_reg = self.register_manager.allocate()
+        pointer_reg = self.register_manager.allocate()
+        self.emit(f"mov {one_reg}, 1")
+        self.emit(f"mov {pointer_reg}, {result_reg}")
+        for i, element in enumerate(node.elements):
+            value_reg = self.visit(element)
+            self.emit(f"st {value_reg}, {pointer_reg}")
+            if i + 1 < len(node.elements):
+                self.emit(f"add {pointer_reg}, {pointer_reg}, {one_reg}")
+        return result_reg
+
+    def get_variable_register(self, symbol_id):
+        """Get register for the variable with this NameTable id"""
+        if self.function_params[symbol_id] is not None:
+            return self.function_params[symbol_id]
+        elif self.function_vars[symbol_id] is not None:
+            return self.function_vars[symbol_id]
         else:
             reg = self.register_manager.allocate()
-            self.function_vars[var_name] = reg
+            self.function_vars[symbol_id] = reg
             return reg
 
+    def function_var(self, symbol_id):
+        """Register of variable symbol_id; like dict.setdefault, a candidate register is allocated either way"""
+        reg = self.register_manager.allocate()
+        if self.function_vars[symbol_id] is None:
+            self.function_vars[symbol_id] = reg
+        return self.function_vars[symbol_id]
+
     def visit_Return(self, node):
+        if node.value and self.emit_tail(node.value):
+            return
         reg = self.visit(node.value) if node.value else None
         self.emit(f"mov r0, {reg}" if reg else "mov r0, 0")
         self.emit("ret")
 
+    def is_self_tail_call(self, node):
+        """Check whether an expression in tail position ends in a call to the current function"""
+        if isinstance(node, FunctionCall):
+            return node.name == self.current_function and len(node.args) == len(self.current_params)
+        if isinstance(node, TernaryOp):
+            return self.is_self_tail_call(node.true_expr) or self.is_self_tail_call(node.false_expr)
+        return False
+
+    def emit_tail(self, node):
+        """Emit a returned expression, turning self-calls in tail position into jumps"""
+        if not self.is_self_tail_call(node):
+            return False
+        if isinstance(node, FunctionCall):
+            self.emit_tail_call(node)
+            return True
+
+        false_label = self.generate_label("tail_false")
+        self.emit_condition(node.condition, None, false_label)
+        for branch in (node.true_expr, node.false_expr):
+            if not self.emit_tail(branch):
+                reg = self.visit(branch)
+                self.emit(f"mov r0, {reg}")
+                self.emit("ret")
+            if branch is node.true_expr:
+                self.emit(f"{false_label}:")
+        return True
+
+    def emit_tail_call(self, node):
+        """Reassign the parameter registers and jump back to the function entry"""
+        arg_regs = [self.visit(arg) for arg in node.args]
+        param_regs = {self.function_params[symbol_id] for symbol_id in self.current_params}
+        targets = [f"r{i + 1}" for i in range(len(arg_regs))]
+
+        for i, reg in enumerate(arg_regs):
+            if reg in param_regs and reg != targets[i]:
+                temp = self.register_manager.allocate()
+                self.emit(f"mov {temp}, {reg}")
+                arg_regs[i] = temp
+        for target, reg in zip(targets, arg_regs):
+            if target != reg:
+                self.emit(f"mov {target}, {reg}")
+
+        if self.entry_label is None:
+            self.entry_label = self.generate_label(f"{self.current_function}_entry")
+            self.code.insert(self.entry_index, f"{self.entry_label}:")
+            self.lines.insert(self.entry_index, self.lines[self.entry_index - 1])
+            self.columns.insert(self.entry_index, self.columns[self.entry_index - 1])
+        self.emit(f"jmp {self.entry_label}")
+
     def visit_If(self, node):
-        cond = self.visit(node.condition)
         else_label = self.generate_label("else")
         end_label = self.generate_label("endif")
-        self.emit(f"jz {cond}, {else_label}")
+        self.emit_condition(node.condition, None, else_label)
         for stmt in self.extract_statements(node.then_stmt):
             self.visit(stmt)
         self.emit(f"jmp {end_label}")
@@ -226,8 +442,7 @@ class CodeGenerator:
         start_label = self.generate_label("while_start")
         end_label = self.generate_label("while_end")
         self.emit(f"{start_label}:")
-        cond = self.visit(node.condition)
-        self.emit(f"jz {cond}, {end_label}")
+        self.emit_condition(node.condition, None, end_label)
         for stmt in self.extract_statements(node.body):
             self.visit(stmt)
         self.emit(f"jmp {start_label}")
@@ -248,13 +463,52 @@ class CodeGenerator:
         else:
             self.visit(node.body)
         
-        cond = self.visit(node.condition)
-        self.emit(f"jnz {cond}, {start_label}") 
+        self.emit_condition(node.condition, start_label, None)
 
     def visit_For(self, node):
         start_reg = self.visit(node.start)
         end_reg = self.visit(node.end)
-        var_reg = self.function_vars.setdefault(node.var, self.register_manager.allocate())
+        guards = self.bounds.guards.get(id(node)) if self.bounds else None
+        if not guards:
+            self.emit_for_loop(node, start_reg, end_reg)
+            return
+
+        checked_label = self.generate_label("for_checked")
+        done_label = self.generate_label("for_done")
+        self.emit_loop_guard(guards, start_reg, end_reg, checked_label)
+        self.unchecked = self.bounds.guarded[id(node)]
+        self.emit_for_loop(node, start_reg, end_reg)
+        self.unchecked = set()
+        self.emit(f"jmp {done_label}")
+        self.emit(f"{checked_label}:")
+        self.emit_for_loop(node, start_reg, end_reg)
+        self.emit(f"{done_label}:")
+
+    def emit_loop_guard(self, guards, start_reg, end_reg, checked_label):
+        """Check every x[i + c] of the loop once; take the checked copy if any may fail"""
+        runs_reg = self.register_manager.allocate()
+        self.emit(f"cmp< {runs_reg}, {start_reg}, {end_reg}")
+        self.emit(f"jz {runs_reg}, {checked_label}")
+        zero_reg = self.register_manager.allocate()
+        self.emit(f"mov {zero_reg}, 0")
+        for symbol_id, offset in guards:
+            array_reg = self.get_variable_register(symbol_id)
+            offset_reg = self.register_manager.allocate()
+            low_reg = self.register_manager.allocate()
+            negative_reg = self.register_manager.allocate()
+            self.emit(f"mov {offset_reg}, {offset}")
+            self.emit(f"add {low_reg}, {start_reg}, {offset_reg}")
+            self.emit(f"cmp< {negative_reg}, {low_reg}, {zero_reg}")
+            self.emit(f"jnz {negative_reg}, {checked_label}")
+            high_reg = self.register_manager.allocate()
+            self.emit(f"add {high_reg}, {end_reg}, {offset_reg}")
+            length_reg = self.load_length(array_reg)
+            outside_reg = self.register_manager.allocate()
+            self.emit(f"cmp> {outside_reg}, {high_reg}, {length_reg}")
+            self.emit(f"jnz {outside_reg}, {checked_label}")
+
+    def emit_for_loop(self, node, start_reg, end_reg):
+        var_reg = self.function_var(node.symbol_id)
         self.emit(f"mov {var_reg}, {start_reg}")
         start_label = self.generate_label("for_start")
         end_label = self.generate_label("for_end")
@@ -271,7 +525,7 @@ class CodeGenerator:
         self.emit(f"{end_label}:")
 
     def visit_Identifier(self, node):
-        return self.function_params.get(node.name) or self.function_vars.get(node.name) or self.register_manager.allocate()
+        return self.function_params[node.symbol_id] or self.function_vars[node.symbol_id] or self.register_manager.allocate()
 
     def visit_Number(self, node):
         reg = self.register_manager.allocate()
@@ -284,14 +538,12 @@ class CodeGenerator:
         return reg
 
     def visit_TernaryOp(self, node):
-        cond_reg = self.visit(node.condition)
-        
         false_label = self.generate_label("ternary_false")
         end_label = self.generate_label("ternary_end")
         
         result_reg = self.register_manager.allocate()
         
-        self.emit(f"jz {cond_reg}, {false_label}")
+        self.emit_condition(node.condition, None, false_label)
         
         true_reg = self.visit(node.true_expr)
         self.emit(f"mov {result_reg}, {true_reg}")
@@ -307,6 +559,8 @@ class CodeGenerator:
 
     def visit_BinaryOp(self, node):
         """Visit binary operation"""
+        if node.op in ('&&', '||'):
+            return self.condition_value(node)
         left = self.visit(node.left)
         right = self.visit(node.right)
         result = self.register_manager.allocate()
@@ -321,6 +575,32 @@ class CodeGenerator:
         self.emit(f"{instruction} {result}, {left}, {right}")
         return result
 
+    def visit_UnaryOp(self, node):
+        """Visit unary operation"""
+        if node.op == '!':
+            return self.condition_value(node)
+        operand = self.visit(node.operand)
+        if node.op == '+':
+            return operand
+        zero = self.register_manager.allocate()
+        result = self.register_manager.allocate()
+        self.emit(f"mov {zero}, 0")
+        self.emit(f"sub {result}, {zero}, {operand}")
+        return result
+
+    def condition_value(self, node):
+        """Materialize a boolean expression as 0 or 1 through its jump chain"""
+        result = self.register_manager.allocate()
+        false_label = self.generate_label("bool_false")
+        end_label = self.generate_label("bool_end")
+        self.emit_condition(node, None, false_label)
+        self.emit(f"mov {result}, 1")
+        self.emit(f"jmp {end_label}")
+        self.emit(f"{false_label}:")
+        self.emit(f"mov {result}, 0")
+        self.emit(f"{end_label}:")
+        return result
+
     def generic_visit(self, node):
         """Improved generic visit with debugging"""
         print(f"Warning: No visitor for {type(node).__name__}")
@@ -334,30 +614,76 @@ class CodeGenerator:
                     self.visit(attr_value)
 
 
-def generate_code(ast):
-    generator = CodeGenerator()
-    return generator.generate(ast)
-
-
-def compile_teslang_with_codegen(code):
-    global symbol_table, current_function, errors
-    symbol_table = SymbolTable()
-    current_function = None
-    errors = []
-    parser = yacc.yacc()
+def generate_code(ast, optimize=False, bounds_checks=False):
+    generator = CodeGenerator(bounds_checks)
+    code = generator.generate(ast)
+    if optimize:
+        code = optimize_code(code, generator.param_counts)
+    return code
+
+
+def generate_procs(ast, optimize=False, bounds_checks=False, superinstructions=False):
+    """Like generate_code, but return Procs that keep each instruction's source line"""
+    generator = CodeGenerator(bounds_checks)
+    generator.generate(ast)
+    procs = generator.procs()
+    if optimize:
+        optimize_procs(procs, generator.param_counts)
+    if superinstructions:
+        select_superinstructions(procs, generator.param_counts)
+    return procs
+
+
+def generate_code_with_map(ast, optimize=False, bounds_checks=False):
+    """Like generate_code, but also return the LineMap of the emitted text"""
+    generator = CodeGenerator(bounds_checks)
+    code = generator.generate(ast)
+    if not optimize:
+        return code, LineMap.from_lines(generator.lines, generator.columns)
+    procs = optimize_procs(generator.procs(), generator.param_counts)
+    return format_program(procs), LineMap.from_procs(procs)
+
+
+def write_code(ast, writer, optimize=False, bounds_checks=False, superinstructions=False):
+    """Generate code into a TsmWriter, handing over each proc as soon as it is finished
+
+    Inlining looks at every proc, so optimized code is generated in full
+    first and then written one proc at a time; so is code rewritten to use
+    superinstructions, which only the built-in VM runs.
+    """
+    if not optimize and not superinstructions:
+        CodeGenerator(bounds_checks, writer).generate(ast)
+        return writer
+    for proc in generate_procs(ast, optimize, bounds_checks, superinstructions):
+        writer.write_proc(proc)
+    return writer
+
+
+def compile_teslang_with_codegen(code, optimize=False, bounds_checks=False, line_map=False, lexer=None,
+                                 parser='lalr'):
+    """Compile source to TSM text; returns (code, errors), or (code, LineMap, errors) with line_map"""
+    import Parser.parser as teslang_parser
+    from SemanticAnalyzerF.semantic_analyzer import SemanticAnalyzer
+
+    teslang_parser.reset_parser_state()
+    errors = teslang_parser.errors
+    parser = teslang_parser.make_parser(parser)
+    failed = (None, None, errors) if line_map else (None, errors)
     try:
-        ast = parser.parse(code, debug=False)
+        ast = parser.parse(code, lexer=lexer, debug=False)
         if not ast:
-            return None, errors
+            return failed
         analyzer = SemanticAnalyzer()
         semantic_errors = analyzer.analyze(ast)
         if semantic_errors:
-            return None, semantic_errors
-        intermediate_code = generate_code(ast)
+            return failed[:-1] + (semantic_errors,)
+        if line_map:
+            return generate_code_with_map(ast, optimize, bounds_checks) + ([],)
+        intermediate_code = generate_code(ast, optimize, bounds_checks)
         return intermediate_code, []
     except Exception as e:
         errors.append(f"Compiler error: {str(e)}")
-        return None, errors
+        return failed
 
 if __name__ == "__main__":
     test_code = '''funk main() <null> {
@@ -0,0 +1,238 @@
+# inline.py
+"""Inlining of small and single-call-site procedures"""
+
+from IR.tsm import Instruction, BUILTINS, is_register
+from IR.cfg import CFG, compute_dominators, find_loops
+
+SMALL_PROC_SIZE = 12
+SINGLE_CALL_PROC_SIZE = 200
+MAX_CALLER_SIZE = 1000
+GROWTH_FACTOR = 1.5
+GROWTH_SLACK = 32
+ENTRY_PROC = 'main'
+
+
+def proc_size(proc):
+    """Number of executable instructions in a procedure"""
+    return sum(1 for instr in proc.body if not instr.is_label and not instr.is_comment)
+
+
+def entry_live(proc):
+    """Registers a procedure may read before writing them, which a call starts at 0"""
+    cfg = CFG(proc)
+    if not cfg.blocks:
+        return set()
+    gen = {}
+    kill = {}
+    for block in cfg.blocks:
+        read, written = set(), set()
+        for instr in block.instrs:
+            read.update(reg for reg in instr.uses() if reg not in written)
+            written.update(instr.defs())
+        gen[block], kill[block] = read, written
+    live = {block: set() for block in cfg.blocks}
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(cfg.blocks):
+            out = set().union(*(live[succ] for succ in block.succs))
+            new = gen[block] | (out - kill[block])
+            if new != live[block]:
+                live[block] = new
+                changed = True
+    return live[cfg.blocks[0]]
+
+
+def call_sites(proc):
+    return [instr for instr in proc.body
+            if instr.op == 'call' and instr.args[0] not in BUILTINS]
+
+
+class Inliner:
+    """Replaces `call` instructions with a renamed copy of the callee body"""
+
+    def __init__(self, procs):
+        self.procs = procs
+        self.by_name = {proc.name: proc for proc in procs}
+        self.counter = 0
+        self.inlined = 0
+        self.inlined_names = set()
+        total = sum(proc_size(proc) for proc in procs)
+        self.budget = int(total * (GROWTH_FACTOR - 1)) + GROWTH_SLACK
+
+    def callees(self, proc):
+        return [instr.args[0] for instr in call_sites(proc) if instr.args[0] in self.by_name]
+
+    def is_recursive(self, name):
+        """Check whether a procedure can reach itself through the call graph"""
+        seen = set()
+        stack = list(self.callees(self.by_name[name]))
+        while stack:
+            callee = stack.pop()
+            if callee == name:
+                return True
+            if callee not in seen:
+                seen.add(callee)
+                stack.extend(self.callees(self.by_name[callee]))
+        return False
+
+    def bottom_up_order(self):
+        """Procedures ordered so that callees come before their callers"""
+        order = []
+        visited = set()
+
+        def visit(name):
+            visited.add(name)
+            for callee in self.callees(self.by_name[name]):
+                if callee not in visited:
+                    visit(callee)
+            order.append(name)
+
+        for proc in self.procs:
+            if proc.name not in visited:
+                visit(proc.name)
+        return [self.by_name[name] for name in order]
+
+    def run(self):
+        recursive = {proc.name for proc in self.procs if self.is_recursive(proc.name)}
+        site_counts = {}
+        for proc in self.procs:
+            for name in self.callees(proc):
+                site_counts[name] = site_counts.get(name, 0) + 1
+
+        for caller in self.bottom_up_order():
+            for site in self.choose_sites(caller, recursive, site_counts):
+                self.expand(caller, site)
+
+        self.remove_dead_procs()
+        return self.procs
+
+    def choose_sites(self, caller, recursive, site_counts):
+        """Pick the call sites to inline in one caller, deepest loops first"""
+        depth = self.loop_depths(caller)
+        candidates = []
+        for pos, instr in enumerate(caller.body):
+            if instr.op != 'call' or instr.args[0] not in self.by_name:
+                continue
+            name = instr.args[0]
+            if name in recursive or name == caller.name or name == ENTRY_PROC:
+                continue
+            size = proc_size(self.by_name[name])
+            single = site_counts.get(name) == 1
+            if size > SMALL_PROC_SIZE and not (single and size <= SINGLE_CALL_PROC_SIZE):
+                continue
+            candidates.append((-depth.get(pos, 0), size, pos, instr, single))
+        candidates.sort(key=lambda c: c[:3])
+
+        chosen = []
+        caller_size = proc_size(caller)
+        for _, size, _, instr, single in candidates:
+            if caller_size + size > MAX_CALLER_SIZE:
+                continue
+            if not single:
+                if size > self.budget:
+                    continue
+                self.budget -= size
+            caller_size += size
+            chosen.append(instr)
+        return chosen
+
+    def loop_depths(self, proc):
+        """Map instruction positions to the number of loops enclosing them"""
+        cfg = CFG(proc)
+        loops = find_loops(cfg, compute_dominators(cfg))
+        depth = {}
+        pos = 0
+        for block in cfg.blocks:
+            nesting = sum(1 for loop in loops if block in loop.blocks)
+            for _ in block.instrs:
+                if nesting:
+                    depth[pos] = nesting
+                pos += 1
+        return depth
+
+    def expand(self, caller, site):
+        """Replace one call instruction with the callee body"""
+        callee = self.by_name[site.args[0]]
+        result = site.args[1] if len(site.args) > 1 else None
+        args = site.args[2:]
+        self.counter += 1
+        suffix = f"_{callee.name}{self.counter}"
+        end_label = f"inline_end{suffix}"
+        next_reg = max(caller.max_register(), 0) + 1
+
+        written = set()
+        for instr in callee.body:
+            written.update(instr.defs())
+
+        mapping = {}
+        prologue = []
+        for i, arg in enumerate(args):
+            param = f"r{i + 1}"
+            if param not in written and is_register(arg):
+                mapping[param] = arg
+            else:
+                mapping[param] = f"r{next_reg}"
+                next_reg += 1
+                prologue.append(Instruction('mov', [mapping[param], arg], site.line, site.column))
+        if result is not None and result not in args:
+            mapping['r0'] = result
+        for reg in sorted(callee.registers()):
+            if reg not in mapping:
+                mapping[reg] = f"r{next_reg}"
+                next_reg += 1
+        # Inside a loop the copy of such a register would keep the last call's value
+        params = {f"r{i + 1}" for i in range(len(args))}
+        for reg in sorted(entry_live(callee) - params):
+            prologue.append(Instruction('mov', [mapping[reg], '0'], site.line, site.column))
+
+        body = [Instruction('#', [f"inline {callee.name}"], site.line, site.column)] + prologue
+        executable = [instr for instr in callee.body if not instr.is_comment]
+        for i, instr in enumerate(executable):
+            if instr.op == 'ret':
+                if any(not later.is_label for later in executable[i + 1:]):
+                    body.append(Instruction('jmp', [end_label], instr.line, instr.column))
+                continue
+            copy = self.rename(instr, mapping, suffix)
+            body.append(copy)
+        body.append(Instruction('label', [end_label], site.line, site.column))
+        if result is not None and mapping.get('r0') != result:
+            body.append(Instruction('mov', [result, mapping['r0']], site.line, site.column))
+
+        pos = caller.body.index(site)
+        caller.body[pos:pos + 1] = body
+        self.inlined += 1
+        self.inlined_names.add(callee.name)
+
+    def rename(self, instr, mapping, suffix):
+        copy = instr.copy()
+        if copy.is_label:
+            copy.args = [copy.args[0] + suffix]
+        elif copy.is_jump:
+            copy.args = [mapping.get(a, a) for a in copy.args[:-1]] + [copy.args[-1] + suffix]
+        elif copy.op == 'call':
+            copy.args = [copy.args[0]] + [mapping.get(a, a) for a in copy.args[1:]]
+        else:
+            copy.args = [mapping.get(a, a) for a in copy.args]
+        return copy
+
+    def remove_dead_procs(self):
+        """Drop procedures that are no longer called from anywhere"""
+        while True:
+            called = set()
+            for proc in self.procs:
+                called.update(self.callees(proc))
+            dead = [proc for proc in self.procs if proc.name in self.inlined_names
+                    and proc.name not in called and proc.name != ENTRY_PROC]
+            if not dead:
+                return
+            for proc in dead:
+                self.procs.remove(proc)
+                del self.by_name[proc.name]
+
+
+def inline_procs(procs):
+    """Inline small and single-call procedures; returns the Inliner"""
+    inliner = Inliner(procs)
+    inliner.run()
+    return inliner
@@ -0,0 +1,260 @@
+# layout.py
+"""Block layout: loop rotation, jump threading and fall-through friendly block order"""
+
+from IR.tsm import Instruction
+from IR.cfg import CFG, compute_dominators, find_loops
+
+# Longest loop test, in instructions, that is copied to the bottom of the loop
+ROTATE_LIMIT = 8
+INVERTED = {'jz': 'jnz', 'jnz': 'jz'}
+
+
+def executable(block):
+    return [instr for instr in block.instrs if not instr.is_label and not instr.is_comment]
+
+
+class BlockLayout:
+    """Rewrites the block order of one Proc so that fewer jumps execute
+
+    A loop whose header tests and jumps out, with latches that `jmp` back
+    to it, gets a copy of the test at the bottom of each latch that
+    branches back to the first body block. The header is left in front as
+    the guard of the first iteration, so each iteration runs one branch
+    instead of two. Jumps to blocks holding only a `jmp` are sent straight
+    to the final target, a block entered only through a `jmp` is moved
+    right after it, and jumps and branches to the next block are dropped.
+    """
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.next_reg = proc.max_register() + 1
+        self.label_counter = 0
+        self.rotated = 0
+        self.threaded = 0
+        self.moved = 0
+        self.removed = 0
+
+    def new_register(self):
+        reg = f"r{self.next_reg}"
+        self.next_reg += 1
+        return reg
+
+    def run(self):
+        cfg = CFG(self.proc)
+        idom = compute_dominators(cfg)
+        use_counts = {}
+        for instr in self.proc.body:
+            for reg in instr.uses():
+                use_counts[reg] = use_counts.get(reg, 0) + 1
+        for loop in find_loops(cfg, idom):
+            self.rotate(cfg, loop, use_counts)
+        self.proc.body = cfg.linearize()
+        self.thread_jumps()
+        self.order_blocks()
+        self.drop_jumps_to_next()
+        return self.proc
+
+    def rotate(self, cfg, loop, use_counts):
+        """Turn a top-tested loop into a guarded, bottom-tested one
+
+        The header's conditional jump may leave the loop, with the body
+        falling through, or enter the body, with the exit falling through;
+        in the second case the body is first moved up behind the header and
+        the header's test inverted.
+        """
+        header = loop.header
+        test = executable(header)
+        if header.label is None or not test or test[-1].op not in INVERTED or len(test) > ROTATE_LIMIT:
+            return
+        pos = cfg.blocks.index(header)
+        target = cfg.label_map.get(test[-1].target)
+        if target is None or pos + 1 == len(cfg.blocks):
+            return
+        following = cfg.blocks[pos + 1]
+        if target in loop.blocks and following not in loop.blocks:
+            exit_block = following
+        elif target not in loop.blocks and following in loop.blocks:
+            exit_block = target
+        else:
+            return
+        if any(succ not in loop.blocks and succ is not exit_block for block in loop.blocks for succ in block.succs):
+            # A loop left from the middle as well keeps its shape
+            return
+        latches = [block for block in loop.blocks
+                   if block.last is not None and block.last.op == 'jmp' and block.last.target in header.labels]
+        if not latches:
+            return
+        if exit_block is following:
+            if not self.move_body(cfg, loop, target):
+                return
+            test[-1].op = INVERTED[test[-1].op]
+            test[-1].args[-1] = self.block_label(cfg, exit_block, header, "exit", test[0])
+            following = target
+        body = following
+
+        body_label = self.block_label(cfg, body, header, "body", test[0])
+        exit_label = test[-1].target
+        own = self.test_registers(test, use_counts)
+        for latch in latches:
+            mapping = {reg: self.new_register() for reg in own}
+            bottom = [rename(instr, mapping) for instr in test]
+            bottom[-1].op = INVERTED[bottom[-1].op]
+            bottom[-1].args[-1] = body_label
+            jump = latch.last
+            after = cfg.blocks.index(latch) + 1
+            if after == len(cfg.blocks) or cfg.blocks[after] is not exit_block:
+                bottom.append(Instruction('jmp', [exit_label], jump.line, jump.column))
+            at = latch.instrs.index(jump)
+            latch.instrs[at:at + 1] = bottom
+        self.rotated += 1
+
+    def move_body(self, cfg, loop, body):
+        """Move the loop's blocks, laid out together from body on, right behind its header"""
+        start = cfg.blocks.index(body)
+        end = start + len(loop.blocks) - 1
+        members = cfg.blocks[start:end]
+        if set(members) != loop.blocks - {loop.header} or cfg.blocks[start - 1].falls_through:
+            return False
+        if not members[-1].last or not members[-1].last.is_terminator:
+            return False
+        del cfg.blocks[start:end]
+        at = cfg.blocks.index(loop.header) + 1
+        cfg.blocks[at:at] = members
+        self.moved += 1
+        return True
+
+    def block_label(self, cfg, block, header, kind, position):
+        """A label of block, adding one named after the loop header if it has none"""
+        if block.label is None:
+            self.label_counter += 1
+            label = f"{header.label}_{kind}{self.label_counter}"
+            block.labels.insert(0, label)
+            block.instrs.insert(0, Instruction('label', [label], position.line, position.column))
+            cfg.label_map[label] = block
+        return block.label
+
+    def test_registers(self, test, use_counts):
+        """Registers the loop test writes before reading and that nothing else reads"""
+        own = set()
+        seen = set()
+        local_uses = {}
+        for instr in test:
+            for reg in instr.uses():
+                local_uses[reg] = local_uses.get(reg, 0) + 1
+                seen.add(reg)
+            for reg in instr.defs():
+                if reg not in seen:
+                    own.add(reg)
+                seen.add(reg)
+        return {reg for reg in own if local_uses.get(reg, 0) == use_counts.get(reg, 0) and reg != 'r0'}
+
+    def thread_jumps(self):
+        """Send jumps to blocks that only `jmp` on to the final target"""
+        cfg = CFG(self.proc)
+        forward = {}
+        for block in cfg.blocks:
+            code = executable(block)
+            if len(code) == 1 and code[0].op == 'jmp':
+                for label in block.labels:
+                    forward[label] = code[0].target
+        for instr in self.proc.body:
+            if not instr.is_jump:
+                continue
+            target = instr.target
+            seen = {target}
+            while target in forward and forward[target] not in seen:
+                target = forward[target]
+                seen.add(target)
+            if target != instr.target:
+                instr.args[-1] = target
+                self.threaded += 1
+
+    def order_blocks(self):
+        """Drop unreachable blocks and move blocks entered only by a `jmp` right after it"""
+        cfg = CFG(self.proc)
+        live = set(cfg.reverse_postorder())
+        self.removed += sum(len(executable(block)) for block in cfg.blocks if block not in live)
+        cfg.blocks = [block for block in cfg.blocks if block in live]
+        cfg.renumber()
+        cfg.link()
+        while self.move_jump_target(cfg):
+            cfg.renumber()
+            cfg.link()
+        self.proc.body = cfg.linearize()
+
+    def move_jump_target(self, cfg):
+        blocks = cfg.blocks
+        spans = [(min(b.index for b in loop.blocks), max(b.index for b in loop.blocks), loop.blocks)
+                 for loop in find_loops(cfg, compute_dominators(cfg))]
+        for i, block in enumerate(blocks):
+            last = block.last
+            if last is None or last.op != 'jmp':
+                continue
+            target = cfg.label_map.get(last.target)
+            if target is None or len(target.preds) != 1:
+                continue
+            j = target.index
+            if j == 0 or j == i + 1 or blocks[j - 1].falls_through:
+                continue
+            k = j
+            while k < len(blocks) and blocks[k].falls_through:
+                k += 1
+            if k == len(blocks) or j <= i <= k:
+                continue
+            if any(first <= i < last and not members.issuperset(blocks[j:k + 1]) for first, last, members in spans):
+                continue
+            chain = blocks[j:k + 1]
+            del blocks[j:k + 1]
+            at = blocks.index(block) + 1
+            blocks[at:at] = chain
+            block.instrs.remove(last)
+            self.moved += 1
+            return True
+        return False
+
+    def drop_jumps_to_next(self):
+        """Remove jumps and branches to the next block and branch over a `jmp` with the inverted test"""
+        cfg = CFG(self.proc)
+        blocks = cfg.blocks
+        for i, block in enumerate(blocks):
+            last = block.last
+            if last is None or not last.is_jump or i + 1 == len(blocks):
+                continue
+            following = blocks[i + 1]
+            if last.target in following.labels and (last.op == 'jmp' or last.op in INVERTED):
+                # Either way control goes on to the next block; the test has no other effect
+                block.instrs.remove(last)
+                self.removed += 1
+                continue
+            if last.op not in INVERTED or following.labels or i + 2 == len(blocks):
+                continue
+            code = executable(following)
+            if len(code) == 1 and code[0].op == 'jmp' and last.target in blocks[i + 2].labels:
+                following.instrs.remove(code[0])
+                self.removed += 1
+                if code[0].target in blocks[i + 2].labels:
+                    # Both ways lead to the block after the `jmp`
+                    block.instrs.remove(last)
+                    self.removed += 1
+                    continue
+                last.op = INVERTED[last.op]
+                last.args[-1] = code[0].target
+        self.proc.body = cfg.linearize()
+
+
+def rename(instr, mapping):
+    """Copy of instr with the registers in mapping renamed, written ones included"""
+    copy = instr.copy()
+    written = copy.defs()
+    copy.replace_uses(mapping)
+    if written:
+        i = 1 if copy.op == 'call' else 0
+        copy.args[i] = mapping.get(copy.args[i], copy.args[i])
+    return copy
+
+
+def layout_blocks(proc):
+    """Run loop rotation, jump threading and block ordering on one Proc"""
+    layout = BlockLayout(proc)
+    layout.run()
+    return layout
@@ -0,0 +1,184 @@
+# linemap.py
+"""Compact map from the lines of a .tsm file back to TesLang source positions"""
+
+MAGIC = b'TSLM'
+VERSION = 1
+
+
+def encode_varint(value, out):
+    """Append an unsigned LEB128 integer to a bytearray"""
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def decode_varint(data, pos):
+    """Read an unsigned LEB128 integer; returns (value, next position)"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("truncated line map")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value):
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+class LineMap:
+    """Source (line, column) of each .tsm row that came from the source
+
+    Rows are 0-based line numbers of the .tsm text. On disk the map is the
+    magic bytes, a version byte and an entry count, followed by one entry per
+    mapped row: the row delta, the zigzagged source line delta and the column
+    (0 when unknown), each as a LEB128 varint. Consecutive instructions
+    usually share a line, so most entries take three bytes.
+    """
+
+    def __init__(self, positions=None):
+        self.positions = positions if positions is not None else {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __eq__(self, other):
+        return isinstance(other, LineMap) and self.positions == other.positions
+
+    def add(self, row, line, column=None):
+        if line:
+            self.positions[row] = (line, column)
+
+    def lookup(self, row):
+        """(line, column) of a .tsm row, or None if it has no source position"""
+        return self.positions.get(row)
+
+    def source_positions(self, row_count):
+        """Parallel source line and column lists for the first row_count rows"""
+        lines = [None] * row_count
+        columns = [None] * row_count
+        for row, (line, column) in self.positions.items():
+            if row < row_count:
+                lines[row] = line
+                columns[row] = column
+        return lines, columns
+
+    @classmethod
+    def from_lines(cls, lines, columns):
+        """Map for code whose rows run parallel to the lines and columns lists"""
+        line_map = cls()
+        for row, (line, column) in enumerate(zip(lines, columns)):
+            line_map.add(row, line, column)
+        return line_map
+
+    @classmethod
+    def from_procs(cls, procs):
+        """Map for the text format_program renders from procs"""
+        line_map = cls()
+        row = 0
+        for proc in procs:
+            row += 1  # proc header
+            for instr in proc.body:
+                line_map.add(row, instr.line, instr.column)
+                row += 1
+            row += 1  # blank line after each proc
+        return line_map
+
+    def encode(self):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        encode_varint(len(self.positions), out)
+        previous_row = -1
+        previous_line = 0
+        for row in sorted(self.positions):
+            line, column = self.positions[row]
+            encode_varint(row - previous_row - 1, out)
+            encode_varint(zigzag(line - previous_line), out)
+            encode_varint(column or 0, out)
+            previous_row, previous_line = row, line
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data):
+        if len(data) <= len(MAGIC) or data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a TSM line map")
+        if data[len(MAGIC)] != VERSION:
+            raise ValueError(f"unsupported line map version {data[len(MAGIC)]}")
+        count, pos = decode_varint(data, len(MAGIC) + 1)
+        positions = {}
+        row = -1
+        line = 0
+        for _ in range(count):
+            delta, pos = decode_varint(data, pos)
+            line_delta, pos = decode_varint(data, pos)
+            column, pos = decode_varint(data, pos)
+            row += delta + 1
+            line += unzigzag(line_delta)
+            positions[row] = (line, column or None)
+        return cls(positions)
+
+    def write(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.encode())
+
+    @classmethod
+    def read(cls, path):
+        with open(path, 'rb') as f:
+            return cls.decode(f.read())
+
+
+class LineMapEncoder:
+    """Builds the encoded form of a LineMap directly, for rows added in order
+
+    Holds a few bytes per mapped row instead of a dict entry and a tuple,
+    so a map can be collected alongside output that is written as it goes.
+    """
+
+    def __init__(self):
+        self.entries = bytearray()
+        self.count = 0
+        self.previous_row = -1
+        self.previous_line = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, row, line, column=None):
+        if not line:
+            return
+        if row <= self.previous_row:
+            raise ValueError(f"line map row {row} added after row {self.previous_row}")
+        encode_varint(row - self.previous_row - 1, self.entries)
+        encode_varint(zigzag(line - self.previous_line), self.entries)
+        encode_varint(column or 0, self.entries)
+        self.previous_row, self.previous_line = row, line
+        self.count += 1
+
+    def encode(self):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        encode_varint(self.count, out)
+        return bytes(out + self.entries)
+
+    def write(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.encode())
+
+
+def map_path(tsm_path):
+    """Where the line map of a .tsm file is stored"""
+    return tsm_path + '.map'
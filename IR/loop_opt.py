@@ -0,0 +1,205 @@
+# loop_opt.py
+"""Loop-invariant code motion and induction variable strength reduction"""
+
+from IR.tsm import Instruction, COMPARE_OPS, BUILTINS, is_register
+from IR.cfg import CFG, compute_dominators, dominates, find_loops, insert_preheader, append_to_block
+
+PURE_OPS = ('mov', 'add', 'sub', 'mul') + COMPARE_OPS
+TRAPPING_OPS = ('div', 'mod', 'ld')
+
+
+class LoopOptimizer:
+    """Hoists invariant computations out of loops and reduces `mul` on induction variables"""
+
+    def __init__(self, proc, param_count=0):
+        self.proc = proc
+        self.param_count = param_count
+        self.next_reg = proc.max_register() + 1
+        self.preheader_counter = 0
+        self.hoisted = 0
+        self.reduced = 0
+
+    def new_register(self):
+        reg = f"r{self.next_reg}"
+        self.next_reg += 1
+        return reg
+
+    def run(self):
+        """Optimize every loop, innermost first, until nothing more moves"""
+        done = set()
+        while True:
+            cfg = CFG(self.proc)
+            idom = compute_dominators(cfg)
+            loops = [loop for loop in find_loops(cfg, idom) if loop.header.label not in done]
+            if not loops:
+                break
+            loop = loops[0]
+            done.add(loop.header.label)
+            if loop.header.label is None:
+                continue
+            if self.optimize_loop(cfg, idom, loop):
+                self.proc.body = cfg.linearize()
+        return self.proc
+
+    def def_counts(self):
+        counts = {f"r{i}": 1 for i in range(1, self.param_count + 1)}
+        for instr in self.proc.body:
+            for reg in instr.defs():
+                counts[reg] = counts.get(reg, 0) + 1
+        return counts
+
+    def optimize_loop(self, cfg, idom, loop):
+        counts = self.def_counts()
+        loop_defs = {}
+        clobbers_memory = False
+        for block in loop.blocks:
+            for instr in block.instrs:
+                for reg in instr.defs():
+                    loop_defs[reg] = loop_defs.get(reg, 0) + 1
+                if instr.op == 'st' or (instr.op == 'call' and instr.args[0] not in BUILTINS):
+                    clobbers_memory = True
+
+        invariant = self.find_invariants(cfg, idom, loop, counts, loop_defs, clobbers_memory)
+        reductions = self.find_reductions(loop, counts, loop_defs, invariant)
+        if not invariant and not reductions:
+            return False
+
+        self.preheader_counter += 1
+        preheader = insert_preheader(cfg, loop, f"{loop.header.label}_pre{self.preheader_counter}", idom)
+        if preheader is None:
+            return False
+
+        hoisted = []
+        for block, instr in invariant:
+            block.instrs.remove(instr)
+            hoisted.append(instr)
+        self.hoisted += len(hoisted)
+
+        for mul, block, reg, factor, updates in reductions:
+            block.instrs.remove(mul)
+            hoisted.append(Instruction('mul', [mul.args[0], reg, factor], mul.line, mul.column))
+            for update_block, update in updates:
+                step = update.args[2]
+                delta = self.new_register()
+                hoisted.append(Instruction('mul', [delta, step, factor], mul.line, mul.column))
+                pos = update_block.instrs.index(update) + 1
+                update_block.instrs.insert(pos, Instruction(update.op, [mul.args[0], mul.args[0], delta], mul.line, mul.column))
+            self.reduced += 1
+
+        append_to_block(preheader, hoisted)
+        return True
+
+    def find_invariants(self, cfg, idom, loop, counts, loop_defs, clobbers_memory):
+        """Collect (block, instruction) pairs that compute the same value on every iteration"""
+        exits = loop.exits()
+        uses = self.use_blocks(cfg)
+        selected = []
+        chosen = set()
+        invariant_regs = set()
+        changed = True
+        while changed:
+            changed = False
+            for block in cfg.blocks:
+                if block not in loop.blocks:
+                    continue
+                for instr in block.instrs:
+                    if instr in chosen or not (instr.op in PURE_OPS or instr.op in TRAPPING_OPS):
+                        continue
+                    dest = instr.args[0]
+                    if dest == 'r0' or counts.get(dest) != 1:
+                        continue
+                    if not all(u in invariant_regs or u not in loop_defs for u in instr.uses()):
+                        continue
+                    if instr.op in TRAPPING_OPS and not all(dominates(idom, block, e) for e in exits):
+                        continue
+                    if instr.op == 'ld' and clobbers_memory:
+                        continue
+                    if not all(dominates(idom, block, b) for b in uses.get(dest, ()) if b is not block):
+                        continue
+                    if not self.defined_before_local_uses(block, instr):
+                        continue
+                    selected.append((block, instr))
+                    chosen.add(instr)
+                    invariant_regs.add(dest)
+                    changed = True
+        return selected
+
+    def use_blocks(self, cfg):
+        uses = {}
+        for block in cfg.blocks:
+            for instr in block.instrs:
+                for reg in instr.uses():
+                    uses.setdefault(reg, set()).add(block)
+        return uses
+
+    def defined_before_local_uses(self, block, instr):
+        dest = instr.args[0]
+        for other in block.instrs:
+            if other is instr:
+                return True
+            if dest in other.uses():
+                return False
+        return True
+
+    def find_reductions(self, loop, counts, loop_defs, invariant):
+        """Find `mul t, i, c` where i only steps by invariant amounts inside the loop"""
+        hoisted = {instr for _, instr in invariant}
+        varying = {reg for reg in loop_defs if not any(instr.args[0] == reg for instr in hoisted)}
+        updates = {}
+        for block in loop.blocks:
+            for instr in block.instrs:
+                for reg in instr.defs():
+                    updates.setdefault(reg, []).append((block, instr))
+
+        def is_basic_induction(reg):
+            steps = updates.get(reg)
+            if not steps:
+                return False
+            for _, instr in steps:
+                if instr.op not in ('add', 'sub') or instr.args[1] != reg:
+                    return False
+                step = instr.args[2]
+                if not is_register(step) or step in varying:
+                    return False
+            return True
+
+        reductions = []
+        for block in loop.blocks:
+            for instr in block.instrs:
+                if instr.op != 'mul' or instr in hoisted or counts.get(instr.args[0]) != 1:
+                    continue
+                dest, a, b = instr.args
+                if is_basic_induction(a) and b not in varying:
+                    iv, factor = a, b
+                elif is_basic_induction(b) and a not in varying:
+                    iv, factor = b, a
+                else:
+                    continue
+                if not is_register(factor) or not self.uses_stay_local(loop, block, instr, iv):
+                    continue
+                reductions.append((instr, block, iv, factor, updates[iv]))
+        return reductions
+
+    def uses_stay_local(self, loop, block, instr, iv):
+        """All reads of the product follow it in its block, before `iv` changes"""
+        dest = instr.args[0]
+        pos = block.instrs.index(instr)
+        local_uses = 0
+        iv_changed = False
+        for other in block.instrs[pos + 1:]:
+            if dest in other.uses():
+                if iv_changed:
+                    return False
+                local_uses += 1
+            if iv in other.defs():
+                iv_changed = True
+        total_uses = sum(1 for b in loop.blocks for i in b.instrs if dest in i.uses())
+        outside_uses = sum(1 for i in self.proc.body if dest in i.uses()) - total_uses
+        return local_uses == total_uses and outside_uses == 0
+
+
+def optimize_loops(proc, param_count=0):
+    """Run loop-invariant code motion and strength reduction on one Proc"""
+    optimizer = LoopOptimizer(proc, param_count)
+    optimizer.run()
+    return optimizer
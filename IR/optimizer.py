@@ -0,0 +1,25 @@
+# optimizer.py
+"""Optimization passes over generated TSM code"""
+
+from IR.tsm import parse_program, format_program
+from IR.loop_opt import optimize_loops
+from IR.inline import inline_procs
+from IR.layout import layout_blocks
+
+
+def optimize_procs(procs, param_counts=None, layout=True):
+    """Optimize a list of Procs in place and return it"""
+    param_counts = param_counts or {}
+    inline_procs(procs)
+    for proc in procs:
+        optimize_loops(proc, param_counts.get(proc.name, 0))
+        if layout:
+            layout_blocks(proc)
+    return procs
+
+
+def optimize(code, param_counts=None):
+    """Optimize TSM text and return the rewritten program"""
+    procs = parse_program(code)
+    optimize_procs(procs, param_counts)
+    return format_program(procs)
@@ -0,0 +1,455 @@
+# pycodegen.py
+"""Python backend: lowers a checked TesLang AST straight to Python code objects"""
+
+import ast
+import sys
+
+import Parser.parser as teslang_parser
+from Parser.ast_nodes import *
+from IR.bounds import BoundsAnalyzer
+from SemanticAnalyzerF.semantic_analyzer import SemanticAnalyzer
+
+DEFAULTS = {'int': 0, 'bool': False, 'str': '', 'mstr': '', 'vector': None, 'null': None}
+COMPARE_MAP = {
+    '<': ast.Lt, '>': ast.Gt, '<=': ast.LtE, '>=': ast.GtE, '==': ast.Eq, '!=': ast.NotEq,
+}
+ARITHMETIC_MAP = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult}
+RECURSION_LIMIT = 20000
+
+
+class TesLangRuntimeError(Exception):
+    """Raised by compiled TesLang code for run-time faults"""
+
+
+def function_name(name):
+    return f"f_{name}"
+
+
+def variable_name(name):
+    return f"v_{name}"
+
+
+class PythonGenerator:
+    """Visits the TesLang AST and builds a Python `ast.Module`"""
+
+    def __init__(self, filename='<teslang>'):
+        self.filename = filename
+        self.temp_counter = 0
+        self.current_function = None
+        self.loop_depth = 0
+        self.tail_calls = False
+        self.bounds = None
+
+    def new_temp(self):
+        self.temp_counter += 1
+        return f"t_{self.temp_counter}"
+
+    def at(self, py_node, node):
+        """Copy the TesLang source line onto a Python node"""
+        py_node.lineno = py_node.end_lineno = getattr(node, 'line', None) or 1
+        py_node.col_offset = py_node.end_col_offset = 0
+        return py_node
+
+    def extract_statements(self, node):
+        if hasattr(node, 'statements'):
+            return node.statements
+        elif isinstance(node, list):
+            return node
+        elif node is None:
+            return []
+        else:
+            return [node]
+
+    def collect_all_functions(self, functions, result):
+        """Recursively collect all functions including nested ones"""
+        for func in functions:
+            result.append(func)
+            for stmt in self.extract_statements(func.body):
+                if isinstance(stmt, Function):
+                    self.collect_all_functions([stmt], result)
+
+    def generate(self, program):
+        functions = []
+        self.collect_all_functions(program.functions, functions)
+        body = [self.visit_Function(func) for func in functions]
+        module = ast.Module(body=body, type_ignores=[])
+        return ast.fix_missing_locations(module)
+
+    def visit(self, node):
+        method_name = f'visit_{type(node).__name__}'
+        visitor = getattr(self, method_name, None)
+        if visitor is None:
+            raise TypeError(f"Python backend: no visitor for {type(node).__name__}")
+        return visitor(node)
+
+    # Statements
+
+    def visit_statements(self, node):
+        result = []
+        for stmt in self.extract_statements(node):
+            if isinstance(stmt, Function):
+                continue
+            if isinstance(stmt, list):
+                result.extend(self.visit_statements(stmt))
+                continue
+            generated = self.visit(stmt)
+            if isinstance(generated, ast.expr):
+                generated = self.at(ast.Expr(value=generated), stmt)
+            if isinstance(generated, list):
+                result.extend(generated)
+            elif generated is not None:
+                result.append(generated)
+        return result
+
+    def collect_declarations(self, statements, declared):
+        """Find every VarDeclaration in a function body, including nested blocks"""
+        for stmt in self.extract_statements(statements):
+            if isinstance(stmt, VarDeclaration):
+                declared.setdefault(stmt.name, stmt.var_type)
+            elif isinstance(stmt, (Block, list)):
+                self.collect_declarations(stmt, declared)
+            elif isinstance(stmt, If):
+                self.collect_declarations(stmt.then_stmt, declared)
+                self.collect_declarations(stmt.else_stmt, declared)
+            elif isinstance(stmt, (While, DoWhile, For)):
+                self.collect_declarations(stmt.body, declared)
+
+    def visit_Function(self, node):
+        params = [ast.arg(arg=variable_name(p.name)) for p in node.params]
+        declared = {}
+        self.collect_declarations(node.body, declared)
+        param_names = {p.name for p in node.params}
+        self.current_function = node
+        self.tail_calls = False
+        self.bounds = BoundsAnalyzer(node)
+        prologue = []
+        for name, var_type in declared.items():
+            if name not in param_names:
+                prologue.append(self.at(ast.Assign(
+                    targets=[ast.Name(id=variable_name(name), ctx=ast.Store())],
+                    value=ast.Constant(DEFAULTS.get(var_type))), node))
+        body = self.visit_statements(node.body)
+        if not body or not isinstance(body[-1], ast.Return):
+            body.append(self.at(ast.Return(value=ast.Constant(0)), node))
+        if self.tail_calls:
+            body = [self.at(ast.While(test=ast.Constant(True), body=body, orelse=[]), node)]
+        body = prologue + body
+        func = ast.FunctionDef(
+            name=function_name(node.name),
+            args=ast.arguments(posonlyargs=[], args=params, vararg=None, kwonlyargs=[],
+                               kw_defaults=[], kwarg=None, defaults=[]),
+            body=body, decorator_list=[], returns=None, type_params=[])
+        return self.at(func, node)
+
+    def visit_Block(self, node):
+        return self.visit_statements(node)
+
+    def visit_VarDeclaration(self, node):
+        return None
+
+    def visit_Assignment(self, node):
+        value = self.visit(node.value)
+        if isinstance(node.target, str):
+            target = ast.Name(id=variable_name(node.target), ctx=ast.Store())
+        else:
+            target = ast.Subscript(
+                value=ast.Name(id=variable_name(node.target.array), ctx=ast.Load()),
+                slice=self.element_index(node.target), ctx=ast.Store())
+        return self.at(ast.Assign(targets=[target], value=value), node)
+
+    def visit_Return(self, node):
+        if node.value is not None and self.loop_depth == 0:
+            tail = self.tail_statements(node.value, node)
+            if tail:
+                return tail
+        value = self.visit(node.value) if node.value else ast.Constant(0)
+        return self.at(ast.Return(value=value), node)
+
+    def is_self_tail_call(self, expr):
+        func = self.current_function
+        return (isinstance(expr, FunctionCall) and expr.name == func.name
+                and len(expr.args) == len(func.params))
+
+    def tail_statements(self, expr, node):
+        """Self tail calls rebind the parameters and restart the function loop"""
+        if self.is_self_tail_call(expr):
+            self.tail_calls = True
+            statements = []
+            if expr.args:
+                targets = [ast.Name(id=variable_name(p.name), ctx=ast.Store()) for p in self.current_function.params]
+                values = [self.visit(arg) for arg in expr.args]
+                statements.append(self.at(ast.Assign(
+                    targets=[ast.Tuple(elts=targets, ctx=ast.Store())],
+                    value=ast.Tuple(elts=values, ctx=ast.Load())), node))
+            statements.append(self.at(ast.Continue(), node))
+            return statements
+        if isinstance(expr, TernaryOp):
+            then_tail = self.tail_statements(expr.true_expr, node)
+            else_tail = self.tail_statements(expr.false_expr, node)
+            if then_tail or else_tail:
+                return [self.at(ast.If(
+                    test=self.visit(expr.condition),
+                    body=then_tail or [self.at(ast.Return(value=self.visit(expr.true_expr)), node)],
+                    orelse=else_tail or [self.at(ast.Return(value=self.visit(expr.false_expr)), node)]), node)]
+        return None
+
+    def visit_loop_body(self, body):
+        self.loop_depth += 1
+        try:
+            return self.visit_statements(body) or [ast.Pass()]
+        finally:
+            self.loop_depth -= 1
+
+    def visit_If(self, node):
+        return self.at(ast.If(
+            test=self.visit(node.condition),
+            body=self.visit_statements(node.then_stmt) or [ast.Pass()],
+            orelse=self.visit_statements(node.else_stmt)), node)
+
+    def visit_While(self, node):
+        return self.at(ast.While(
+            test=self.visit(node.condition),
+            body=self.visit_loop_body(node.body),
+            orelse=[]), node)
+
+    def visit_DoWhile(self, node):
+        exit_test = ast.If(test=ast.UnaryOp(op=ast.Not(), operand=self.visit(node.condition)),
+                           body=[ast.Break()], orelse=[])
+        body = self.visit_loop_body(node.body) + [self.at(exit_test, node)]
+        return self.at(ast.While(test=ast.Constant(True), body=body, orelse=[]), node)
+
+    def visit_For(self, node):
+        """`for (i = a to b)` becomes a range loop; i ends at max(a, b) like the TSM loop
+
+        The TSM loop compares against the register of a variable bound on
+        every iteration, so when the body assigns i or that variable the
+        loop is a while loop that reads the variable again each time.
+        """
+        var = variable_name(node.var)
+        load = lambda name: ast.Name(id=name, ctx=ast.Load())
+        store = lambda name: ast.Name(id=name, ctx=ast.Store())
+        statements = []
+
+        def bound(expr):
+            if isinstance(expr, Number):
+                return lambda: ast.Constant(expr.value)
+            temp = self.new_temp()
+            statements.append(self.at(ast.Assign(targets=[store(temp)], value=self.visit(expr)), node))
+            return lambda: load(temp)
+
+        start = bound(node.start)
+        live_end = isinstance(node.end, Identifier) and self.assigns(node.body, node.end.name)
+        end = (lambda: load(variable_name(node.end.name))) if live_end else bound(node.end)
+        if live_end or self.assigns(node.body, node.var):
+            statements.append(self.at(ast.Assign(targets=[store(var)], value=start()), node))
+            increment = ast.AugAssign(target=store(var), op=ast.Add(), value=ast.Constant(1))
+            loop = ast.While(
+                test=ast.Compare(left=load(var), ops=[ast.Lt()], comparators=[end()]),
+                body=self.visit_loop_body(node.body) + [self.at(increment, node)], orelse=[])
+            statements.append(self.at(loop, node))
+            return statements
+        loop = ast.For(
+            target=store(var),
+            iter=ast.Call(func=load('range'), args=[start(), end()], keywords=[]),
+            body=self.visit_loop_body(node.body), orelse=[])
+        if isinstance(node.start, Number) and isinstance(node.end, Number):
+            final = ast.Constant(max(node.start.value, node.end.value))
+        else:
+            final = ast.IfExp(test=ast.Compare(left=start(), ops=[ast.Gt()], comparators=[end()]),
+                              body=start(), orelse=end())
+        statements.append(self.at(loop, node))
+        statements.append(self.at(ast.Assign(targets=[store(var)], value=final), node))
+        return statements
+
+    def assigns(self, body, name):
+        """Check whether a statement list assigns to a variable"""
+        for stmt in self.extract_statements(body):
+            if isinstance(stmt, Assignment) and stmt.target == name:
+                return True
+            if isinstance(stmt, For) and (stmt.var == name or self.assigns(stmt.body, name)):
+                return True
+            if isinstance(stmt, If) and (self.assigns(stmt.then_stmt, name) or self.assigns(stmt.else_stmt, name)):
+                return True
+            if isinstance(stmt, (While, DoWhile, Block)) and self.assigns(getattr(stmt, 'body', stmt), name):
+                return True
+            if isinstance(stmt, list) and self.assigns(stmt, name):
+                return True
+        return False
+
+    # Expressions
+
+    def visit_Number(self, node):
+        return ast.Constant(node.value)
+
+    def visit_String(self, node):
+        return ast.Constant(node.value)
+
+    def visit_Boolean(self, node):
+        return ast.Constant(node.value == 'true')
+
+    def visit_Identifier(self, node):
+        return ast.Name(id=variable_name(node.name), ctx=ast.Load())
+
+    def visit_BinaryOp(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if node.op in ARITHMETIC_MAP:
+            return ast.BinOp(left=left, op=ARITHMETIC_MAP[node.op](), right=right)
+        if node.op == '/':
+            return ast.Call(func=ast.Name(id='rt_div', ctx=ast.Load()), args=[left, right], keywords=[])
+        if node.op in COMPARE_MAP:
+            return ast.Compare(left=left, ops=[COMPARE_MAP[node.op]()], comparators=[right])
+        if node.op == '&&':
+            return ast.BoolOp(op=ast.And(), values=[left, right])
+        if node.op == '||':
+            return ast.BoolOp(op=ast.Or(), values=[left, right])
+        raise TypeError(f"Python backend: unknown operator {node.op}")
+
+    def visit_UnaryOp(self, node):
+        ops = {'-': ast.USub, '+': ast.UAdd, '!': ast.Not}
+        return ast.UnaryOp(op=ops[node.op](), operand=self.visit(node.operand))
+
+    def visit_TernaryOp(self, node):
+        return ast.IfExp(test=self.visit(node.condition),
+                         body=self.visit(node.true_expr), orelse=self.visit(node.false_expr))
+
+    def checked_index(self, index_node):
+        """Index expression that refuses negative values instead of wrapping around"""
+        if isinstance(index_node, Number):
+            return ast.Constant(index_node.value)
+        index = self.visit(index_node)
+        if isinstance(index_node, Identifier):
+            name, value = index.id, index
+        else:
+            name = self.new_temp()
+            value = ast.NamedExpr(target=ast.Name(id=name, ctx=ast.Store()), value=index)
+        return ast.IfExp(
+            test=ast.Compare(left=value, ops=[ast.GtE()], comparators=[ast.Constant(0)]),
+            body=ast.Name(id=name, ctx=ast.Load()),
+            orelse=ast.Call(func=ast.Name(id='rt_bad_index', ctx=ast.Load()),
+                            args=[ast.Name(id=name, ctx=ast.Load())], keywords=[]))
+
+    def element_index(self, node):
+        """Proven accesses index the list directly; Python checks the upper bound"""
+        if self.bounds.is_safe(node):
+            return self.visit(node.index)
+        return self.checked_index(node.index)
+
+    def visit_ArrayAccess(self, node):
+        return ast.Subscript(value=ast.Name(id=variable_name(node.array), ctx=ast.Load()),
+                             slice=self.element_index(node), ctx=ast.Load())
+
+    def visit_ArrayLiteral(self, node):
+        return ast.List(elts=[self.visit(e) for e in node.elements], ctx=ast.Load())
+
+    def visit_FunctionCall(self, node):
+        args = [self.visit(arg) for arg in node.args]
+        call = lambda name, call_args: ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=call_args, keywords=[])
+        if node.name == 'print':
+            return call('rt_print', args)
+        if node.name == 'scan':
+            return call('rt_scan', [])
+        if node.name == 'list':
+            size = args[0] if args else ast.Constant(0)
+            return ast.BinOp(left=ast.List(elts=[ast.Constant(0)], ctx=ast.Load()), op=ast.Mult(), right=size)
+        if node.name == 'length':
+            return call('len', args)
+        return call(function_name(node.name), args)
+
+
+class PythonProgram:
+    """A TesLang program compiled to Python functions"""
+
+    def __init__(self, module, filename):
+        self.module = module
+        self.filename = filename
+        self.code = compile(module, filename, 'exec')
+        self.output = []
+        self.pending_input = []
+        self.input_stream = sys.stdin
+        self.output_stream = sys.stdout
+        self.namespace = self.runtime()
+        exec(self.code, self.namespace)
+
+    @property
+    def source(self):
+        return ast.unparse(self.module)
+
+    def function(self, name):
+        """The compiled Python function for a TesLang function"""
+        return self.namespace[function_name(name)]
+
+    def runtime(self):
+        output = self.output
+        pending = self.pending_input
+
+        def rt_print(*values):
+            for value in values:
+                output.append(value if isinstance(value, str) else str(int(value)))
+                output.append('\n')
+            if len(output) >= 8192:
+                self.flush()
+
+        def rt_scan():
+            while not pending:
+                self.flush()
+                line = self.input_stream.readline()
+                if not line:
+                    raise TesLangRuntimeError("scan: end of input")
+                pending.extend(reversed(line.split()))
+            return int(pending.pop())
+
+        def rt_div(a, b):
+            if b == 0:
+                raise TesLangRuntimeError("division by zero")
+            q = abs(a) // abs(b)
+            return q if (a < 0) == (b < 0) else -q
+
+        def rt_bad_index(index):
+            raise TesLangRuntimeError(f"vector index {index} out of range")
+
+        return {'rt_print': rt_print, 'rt_scan': rt_scan, 'rt_div': rt_div,
+                'rt_bad_index': rt_bad_index, '__name__': 'teslang'}
+
+    def flush(self):
+        if self.output:
+            self.output_stream.write(''.join(self.output))
+            del self.output[:]
+
+    def run(self, input_stream=None, output_stream=None, entry='main'):
+        """Call the entry function with buffered I/O and return its result"""
+        self.input_stream = input_stream if input_stream is not None else sys.stdin
+        self.output_stream = output_stream if output_stream is not None else sys.stdout
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(old_limit, RECURSION_LIMIT))
+        try:
+            return self.function(entry)()
+        except RecursionError:
+            raise TesLangRuntimeError("call stack overflow")
+        except IndexError:
+            raise TesLangRuntimeError("vector index out of range")
+        finally:
+            sys.setrecursionlimit(old_limit)
+            self.flush()
+
+
+def compile_to_python(ast_root, filename='<teslang>'):
+    """Compile a checked TesLang AST to a PythonProgram"""
+    generator = PythonGenerator(filename)
+    return PythonProgram(generator.generate(ast_root), filename)
+
+
+def compile_teslang_to_python(code, filename='<teslang>'):
+    """Parse, check and compile TesLang source; returns (program, errors)"""
+    ast_root = teslang_parser.parse_code(code)
+    if teslang_parser.errors:
+        return None, list(teslang_parser.errors)
+    if not ast_root:
+        return None, ["Syntax error: empty program"]
+    semantic_errors = SemanticAnalyzer().analyze(ast_root)
+    if semantic_errors:
+        return None, semantic_errors
+    try:
+        return compile_to_python(ast_root, filename), []
+    except (TypeError, SyntaxError) as e:
+        return None, [f"Compiler error: {e}"]
@@ -0,0 +1,128 @@
+# superinstr.py
+"""Superinstruction selection: fused compare-and-branch and immediate operands for the built-in VM"""
+
+from IR.tsm import Instruction, COMPARE_OPS, is_register
+from IR.cfg import CFG, compute_dominators, dominates
+
+# Fused branch taken when `cmp t, a, b` leaves t non-zero, and when it leaves t zero
+TRUE_BRANCH = {'cmp<': 'jlt', 'cmp>': 'jgt', 'cmp<=': 'jle', 'cmp>=': 'jge', 'cmp==': 'jeq', 'cmp!=': 'jne'}
+FALSE_BRANCH = {'cmp<': 'jge', 'cmp>': 'jle', 'cmp<=': 'jgt', 'cmp>=': 'jlt', 'cmp==': 'jne', 'cmp!=': 'jeq'}
+# The same test with its operands swapped
+MIRRORED = {'jlt': 'jgt', 'jgt': 'jlt', 'jle': 'jge', 'jge': 'jle', 'jeq': 'jeq', 'jne': 'jne'}
+
+
+class SuperinstructionSelector:
+    """Rewrites one Proc to use the built-in VM's fused instructions
+
+    `cmp t, a, b` followed by `jz t, L` or `jnz t, L` becomes one branch
+    when nothing else reads t. A register whose only definition is
+    `mov r, k` and that dominates a use is replaced there by k as the last
+    operand of add, sub or a fused branch, which covers the code
+    generator's `mov r, 1` / `add i, i, r` loop steps and comparisons
+    against constant bounds. Movs left without readers are dropped.
+    """
+
+    def __init__(self, proc, param_count=0):
+        self.proc = proc
+        self.param_count = param_count
+        self.fused = 0
+        self.folded = 0
+
+    def run(self):
+        proc = self.proc
+        cfg = CFG(proc)
+        self.idom = compute_dominators(cfg)
+        self.position = {}
+        for block in cfg.blocks:
+            for i, instr in enumerate(block.instrs):
+                self.position[id(instr)] = (block, i)
+        self.count_registers()
+        removed = set()
+        for block in cfg.blocks:
+            code = [instr for instr in block.instrs if not instr.is_comment and not instr.is_label]
+            for i, instr in enumerate(code):
+                if instr.op == 'add' or instr.op == 'sub':
+                    self.fold_operand(instr)
+                elif instr.op in COMPARE_OPS and i + 1 < len(code) and self.fuse(instr, code[i + 1]):
+                    removed.add(id(instr))
+        for reg, (definition, _) in self.constants.items():
+            if not self.uses.get(reg):
+                removed.add(id(definition))
+        proc.body = [instr for instr in proc.body if id(instr) not in removed]
+        return proc
+
+    def count_registers(self):
+        self.defs = {f"r{i}": 1 for i in range(self.param_count + 1)}
+        self.uses = {}
+        moves = {}
+        for instr in self.proc.body:
+            for reg in instr.defs():
+                self.defs[reg] = self.defs.get(reg, 0) + 1
+            for reg in instr.uses():
+                self.uses[reg] = self.uses.get(reg, 0) + 1
+            if instr.op == 'mov' and is_register(instr.args[0]) and not is_register(instr.args[1]):
+                moves[instr.args[0]] = instr
+        self.constants = {reg: (instr, instr.args[1]) for reg, instr in moves.items() if self.defs[reg] == 1}
+
+    def constant_at(self, reg, instr):
+        """The integer reg always holds when instr runs, or None"""
+        entry = self.constants.get(reg)
+        if entry is None:
+            return None
+        definition, value = entry
+        def_block, def_index = self.position[id(definition)]
+        use_block, use_index = self.position[id(instr)]
+        if def_block is use_block:
+            return value if def_index < use_index else None
+        return value if dominates(self.idom, def_block, use_block) else None
+
+    def fold_operand(self, instr):
+        """Put a constant last operand of add or sub in place of its register"""
+        args = instr.args
+        if not is_register(args[2]):
+            return
+        value = self.constant_at(args[2], instr)
+        if value is None and instr.op == 'add' and is_register(args[1]):
+            value = self.constant_at(args[1], instr)
+            if value is not None:
+                args[1], args[2] = args[2], args[1]
+        if value is not None:
+            self.uses[args[2]] -= 1
+            args[2] = value
+            self.folded += 1
+
+    def fuse(self, compare, branch):
+        """Turn compare and the conditional jump after it into one fused branch"""
+        flag = compare.args[0]
+        if (branch.op not in ('jz', 'jnz') or branch.args[0] != flag or self.uses.get(flag) != 1
+                or self.defs.get(flag) != 1):
+            return False
+        op = (TRUE_BRANCH if branch.op == 'jnz' else FALSE_BRANCH)[compare.op]
+        a, b = compare.args[1], compare.args[2]
+        fused = Instruction(op, [a, b, branch.args[1]], branch.line, branch.column)
+        self.fold_branch_operand(fused, branch)
+        branch.op, branch.args = fused.op, fused.args
+        self.uses[flag] = 0
+        self.fused += 1
+        return True
+
+    def fold_branch_operand(self, fused, branch):
+        a, b, label = fused.args
+        value = self.constant_at(b, branch) if is_register(b) else None
+        if value is None and is_register(a) and is_register(b):
+            value = self.constant_at(a, branch)
+            if value is not None:
+                fused.op = MIRRORED[fused.op]
+                a, b = b, a
+        if value is not None:
+            self.uses[b] -= 1
+            fused.args = [a, value, label]
+            self.folded += 1
+
+
+def select_superinstructions(procs, param_counts=None):
+    """Rewrite a list of Procs in place for the built-in VM and return it"""
+    param_counts = param_counts or {}
+    for proc in procs:
+        SuperinstructionSelector(proc, param_counts.get(proc.name, 0)).run()
+    return procs
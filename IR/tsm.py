@@ -0,0 +1,196 @@
+# tsm.py
+"""Instruction model for TSM code emitted by the code generator"""
+
+import re
+
+BUILTINS = ('iget', 'iput', 'mem', 'rel', 'abort')
+SINK_BUILTINS = ('iput', 'rel', 'abort')
+ARITHMETIC_OPS = ('add', 'sub', 'mul', 'div', 'mod')
+COMPARE_OPS = ('cmp<', 'cmp>', 'cmp<=', 'cmp>=', 'cmp==', 'cmp!=')
+# Fused compare-and-branch superinstructions: `jlt a, b, L` jumps when a < b;
+# b may be an integer. Only the built-in VM runs them (see IR/superinstr.py).
+BRANCH_OPS = ('jlt', 'jgt', 'jle', 'jge', 'jeq', 'jne')
+JUMP_OPS = ('jmp', 'jz', 'jnz') + BRANCH_OPS
+
+REGISTER_RE = re.compile(r'r\d+$')
+
+
+def is_register(operand):
+    """Check whether an operand names a register"""
+    return bool(REGISTER_RE.match(operand))
+
+
+def register_number(reg):
+    return int(reg[1:])
+
+
+class Instruction:
+    """A single TSM line: opcode, operands and the source position it came from"""
+
+    __slots__ = ('op', 'args', 'line', 'column')
+
+    def __init__(self, op, args=None, line=None, column=None):
+        self.op = op
+        self.args = args if args is not None else []
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        if self.op == 'label':
+            return f"{self.args[0]}:"
+        if self.op == '#':
+            return f"# {self.args[0]}"
+        if self.op == 'proc':
+            return f"proc {self.args[0]}"
+        if not self.args:
+            return self.op
+        return f"{self.op} {', '.join(self.args)}"
+
+    def __repr__(self):
+        return f"Instruction({self})"
+
+    def copy(self):
+        return Instruction(self.op, list(self.args), self.line, self.column)
+
+    @property
+    def is_label(self):
+        return self.op == 'label'
+
+    @property
+    def is_comment(self):
+        return self.op == '#'
+
+    @property
+    def is_jump(self):
+        return self.op in JUMP_OPS
+
+    @property
+    def is_terminator(self):
+        return self.op in ('jmp', 'ret')
+
+    @property
+    def target(self):
+        """Label targeted by a jump instruction"""
+        return self.args[-1] if self.op in JUMP_OPS else None
+
+    def defs(self):
+        """Registers written by this instruction"""
+        op, args = self.op, self.args
+        if op == 'mov' or op == 'ld' or op in ARITHMETIC_OPS or op in COMPARE_OPS:
+            return [args[0]]
+        if op == 'call':
+            if args[0] in SINK_BUILTINS:
+                return []
+            return [args[1]] if len(args) > 1 else []
+        return []
+
+    def uses(self):
+        """Registers read by this instruction"""
+        op, args = self.op, self.args
+        if op == 'mov' or op == 'ld':
+            return [a for a in args[1:] if is_register(a)]
+        if op in ARITHMETIC_OPS or op in COMPARE_OPS:
+            return [a for a in args[1:] if is_register(a)]
+        if op == 'st':
+            return [a for a in args if is_register(a)]
+        if op == 'jz' or op == 'jnz':
+            return [args[0]]
+        if op in BRANCH_OPS:
+            return [a for a in args[:2] if is_register(a)]
+        if op == 'ret':
+            return ['r0']
+        if op == 'call':
+            if args[0] in SINK_BUILTINS:
+                return args[1:2]
+            if args[0] == 'mem':
+                return args[-1:]
+            return args[2:]
+        return []
+
+    def replace_uses(self, mapping):
+        """Rename the registers this instruction reads"""
+        op, args = self.op, self.args
+        if op in ('mov', 'ld') or op in ARITHMETIC_OPS or op in COMPARE_OPS:
+            self.args = [args[0]] + [mapping.get(a, a) for a in args[1:]]
+        elif op == 'st':
+            self.args = [mapping.get(a, a) for a in args]
+        elif op in ('jz', 'jnz'):
+            self.args = [mapping.get(args[0], args[0]), args[1]]
+        elif op in BRANCH_OPS:
+            self.args = [mapping.get(a, a) for a in args[:2]] + [args[2]]
+        elif op == 'call':
+            if args[0] in SINK_BUILTINS:
+                self.args = [args[0]] + [mapping.get(a, a) for a in args[1:]]
+            elif args[0] == 'mem':
+                self.args = args[:-1] + [mapping.get(args[-1], args[-1])]
+            else:
+                self.args = args[:2] + [mapping.get(a, a) for a in args[2:]]
+
+
+class Proc:
+    """A TSM procedure: its name and its body instructions"""
+
+    def __init__(self, name, body=None):
+        self.name = name
+        self.body = body if body is not None else []
+
+    def registers(self):
+        """All register names mentioned in this procedure"""
+        regs = set()
+        for instr in self.body:
+            regs.update(instr.defs())
+            regs.update(instr.uses())
+        return regs
+
+    def max_register(self):
+        return max((register_number(r) for r in self.registers()), default=0)
+
+
+def parse_line(text, line=None, column=None):
+    """Parse one line of TSM text into an Instruction, or None for blank lines"""
+    text = text.strip()
+    if not text:
+        return None
+    if text.startswith('#'):
+        return Instruction('#', [text[1:].strip()], line, column)
+    if text.endswith(':'):
+        return Instruction('label', [text[:-1]], line, column)
+    parts = text.split(None, 1)
+    args = [a.strip() for a in parts[1].split(',')] if len(parts) > 1 else []
+    return Instruction(parts[0], args, line, column)
+
+
+def parse_program(lines, source_lines=None, source_columns=None):
+    """Split TSM lines into a list of Procs.
+
+    `lines` may be a single string or a list of lines. `source_lines` and
+    `source_columns`, when given, run parallel to `lines` and are stored on
+    each instruction.
+    """
+    if isinstance(lines, str):
+        lines = lines.split('\n')
+    procs = []
+    current = None
+    for i, text in enumerate(lines):
+        instr = parse_line(text, source_lines[i] if source_lines else None,
+                           source_columns[i] if source_columns else None)
+        if instr is None:
+            continue
+        if instr.op == 'proc':
+            current = Proc(instr.args[0])
+            procs.append(current)
+        elif current is not None:
+            current.body.append(instr)
+    return procs
+
+
+def format_proc(proc):
+    """Render a Proc back to TSM lines, in the code generator's layout"""
+    return [f"proc {proc.name}"] + [str(instr) for instr in proc.body] + [""]
+
+
+def format_program(procs):
+    lines = []
+    for proc in procs:
+        lines.extend(format_proc(proc))
+    return '\n'.join(lines)
@@ -0,0 +1,38 @@
+# writer.py
+"""Streaming output of generated TSM code, one finished proc at a time"""
+
+from IR.linemap import LineMapEncoder
+from IR.tsm import format_proc
+
+
+class TsmWriter:
+    """Writes each proc to a file as soon as it is finished, optionally echoing it
+
+    The text is exactly what joining the whole program would give, but no
+    more than one proc needs to be held for it. Rows are counted on the way
+    out, so the encoded line map of the file is built along the way.
+    """
+
+    def __init__(self, out, echo=None):
+        self.streams = [out] if echo is None else [out, echo]
+        self.line_map = LineMapEncoder()
+        self.rows = 0
+
+    def write_lines(self, lines, source_lines=None, source_columns=None):
+        """Write one proc given as code generator lines, ending with a blank one"""
+        if source_lines is not None:
+            add = self.line_map.add
+            for row, (line, column) in enumerate(zip(source_lines, source_columns), self.rows):
+                add(row, line, column)
+        text = '\n'.join(lines)
+        if self.rows:
+            text = '\n' + text
+        for stream in self.streams:
+            stream.write(text)
+        self.rows += len(lines)
+
+    def write_proc(self, proc):
+        """Write an IR Proc in the code generator's layout"""
+        lines = [None] + [instr.line for instr in proc.body] + [None]
+        columns = [None] + [instr.column for instr in proc.body] + [None]
+        self.write_lines(format_proc(proc), lines, columns)
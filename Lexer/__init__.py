@@ -1,5 +1,12 @@
 # Lexer/__init__.py
-from .lexer import find_column, print_tokens
 from .tokens import tokens
 
-__all__ = ['lexer', 'find_column', 'print_tokens', 'tokens']
\ No newline at end of file
+__all__ = ['lexer', 'find_column', 'print_tokens', 'tokens']
+
+
+def __getattr__(name):
+    # Lexer.lexer loads PLY, which the hand-written scanner does not need
+    if name in ('find_column', 'print_tokens'):
+        from . import lexer
+        return getattr(lexer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,16 +1,50 @@
 # lexer
-import ply.lex as lex
-import Lexer.tokens as tokens  
-lexer = lex.lex(module=tokens)
+from importlib import import_module
+
+from Lexer.names import NameTable
+
+LEXERS = ('ply', 'dfa')
+_lexer = None
+
+
+def base_lexer():
+    """The shared PLY lexer, built on first use"""
+    global _lexer
+    if _lexer is None:
+        import ply.lex as lex
+        # The module itself: Lexer/__init__ binds Lexer.tokens to the token list
+        _lexer = lex.lex(module=import_module('Lexer.tokens'))
+        _lexer.names = NameTable()
+    return _lexer
+
+
+def __getattr__(name):
+    if name == 'lexer':
+        return base_lexer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def make_lexer(kind='ply'):
+    """A fresh lexer starting at line 1 with an empty NameTable: the PLY lexer or the hand-written scanner"""
+    if kind == 'dfa':
+        from Lexer.scanner import Scanner
+        return Scanner()
+    if kind != 'ply':
+        raise ValueError(f"unknown lexer {kind}")
+    fresh = base_lexer().clone()
+    fresh.lineno = 1
+    fresh.names = NameTable()
+    return fresh
 
 def find_column(code, token):
     line_start = code.rfind('\n', 0, token.lexpos) + 1
     return (token.lexpos - line_start) + 1
 
 
-def print_tokens(code):
-    lexer.input(code)
-    tokens_list = list(lexer)
+def print_tokens(code, kind='ply'):
+    source = make_lexer(kind)
+    source.input(code)
+    tokens_list = list(source)
 
     print(f"{'Line':>6} | {'Column':>7} | {'Token':<20} | Value")
     print('-' * 80)
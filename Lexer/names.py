@@ -0,0 +1,68 @@
+# names.py
+"""Per-compilation table of identifier names with dense integer ids"""
+
+import sys
+
+
+class NameTable:
+    """Every identifier of one compilation, numbered from 0 in order of appearance
+
+    The lexer interns each identifier here once. ID tokens and the AST nodes
+    built from them carry the integer id as symbol_id, so later phases keep
+    their per-name data in lists indexed by it instead of dicts keyed by
+    strings, and all occurrences of a name share one string object.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        """Id of name, numbering it if it is new"""
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return symbol_id
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, symbol_id):
+        return self.names[symbol_id]
+
+    def __eq__(self, other):
+        return isinstance(other, NameTable) and self.names == other.names
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        """A table for a token list lexed elsewhere, renumbering its ID tokens"""
+        table = cls()
+        for tok in tokens:
+            if tok.type == 'ID':
+                tok.symbol_id = table.intern(tok.value)
+                tok.value = table.names[tok.symbol_id]
+        return table
+
+
+class NameToken:
+    """An ID token, carrying the NameTable id of its name
+
+    Both lexers emit these for identifiers. Like the scanner's tokens they
+    have slots for what the PLY parser reads, including the lexer it stores
+    on a token it reports a syntax error at.
+    """
+
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'symbol_id', 'lexer')
+
+    def __init__(self, value, lineno, lexpos, symbol_id):
+        self.type = 'ID'
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+        self.symbol_id = symbol_id
+
+    def __str__(self):
+        return f"LexToken(ID,{self.value!r},{self.lineno},{self.lexpos})"
+
+    __repr__ = __str__
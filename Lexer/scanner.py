@@ -0,0 +1,228 @@
+# scanner.py
+"""Hand-written TesLang scanner, a drop-in replacement for the PLY lexer"""
+
+import gc
+import re
+
+from Lexer.names import NameTable, NameToken
+from Lexer.tokens import keywords
+
+# Character classes of the dispatch table
+SPACE, NEWLINE, LETTER, DIGIT, QUOTE, OPERATOR = range(6)
+
+CHAR_CLASSES = {}
+for _ch in ' \t':
+    CHAR_CLASSES[_ch] = SPACE
+CHAR_CLASSES['\n'] = NEWLINE
+for _ch in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_':
+    CHAR_CLASSES[_ch] = LETTER
+for _ch in '0123456789':
+    CHAR_CLASSES[_ch] = DIGIT
+for _ch in '"\'':
+    CHAR_CLASSES[_ch] = QUOTE
+for _ch in '+-*/=!<>:;,?|&(){}[]':
+    CHAR_CLASSES[_ch] = OPERATOR
+
+# PLY tries longer patterns first, so two-character operators win
+TWO_CHAR_OPERATORS = {
+    '==': 'EQEQ', '!=': 'NEQ', '>=': 'GTEQ', '<=': 'LTEQ', '::': 'DBL_COLON',
+    '||': 'OR', '&&': 'AND', '=>': 'ARROW',
+}
+ONE_CHAR_OPERATORS = {
+    '+': 'PLUS', '-': 'MINUS', '*': 'MULTIPLY', '/': 'DIVIDE', '=': 'EQ', '!': 'NOT',
+    '<': 'LESS_THAN', '>': 'GREATER_THAN', ':': 'COLON', ';': 'SEMI_COLON', ',': 'COMMA',
+    '?': 'QMARK', '(': 'LPAREN', ')': 'RPAREN', '{': 'LCURLYEBR', '}': 'RCURLYEBR',
+    '[': 'LSQUAREBR', ']': 'RSQUAREBR',
+}
+
+IDENTIFIER_RE = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+NUMBER_RE = re.compile(r'\d+')
+STRING_RE = re.compile(r'("([^"\\\n]|\\.)*")|(\'([^\'\\\n]|\\.)*\')')
+MSTRING_RE = re.compile(r'"""(.|\n)*?"""')
+WHITESPACE_RE = re.compile(r'[ \t\n]+')
+COMMENT_MARK_RE = re.compile(r'</|/>')
+ILLEGAL_STOP = ' ;\n\t'
+
+
+class Token:
+    """A token with the attributes the PLY parser reads
+
+    The parser also stores its lexer on the token it reports a syntax error at.
+    Identifiers are NameTokens instead.
+    """
+
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __init__(self, type, value, lineno, lexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __str__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    __repr__ = __str__
+
+
+def skip_comment(data, pos, lineno):
+    """End position and line count after a nested </ ... /> comment starting at pos"""
+    depth = 1
+    start_line = lineno
+    pos += 2
+    for mark in COMMENT_MARK_RE.finditer(data, pos):
+        lineno += data.count('\n', pos, mark.start())
+        pos = mark.end()
+        if mark.group() == '</':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos, lineno
+    print(f"Error: Unclosed comment starting at line {start_line}")
+    return len(data), lineno + data.count('\n', pos)
+
+
+def skip_illegal(data, pos, lineno):
+    """Report an illegal run of characters like Lexer.tokens.t_error and skip it"""
+    start = pos
+    end = len(data)
+    while pos < end and data[pos] not in ILLEGAL_STOP:
+        pos += 1
+    print("Illegal token \"" + data[start:pos] + "\" in line " + str(lineno))
+    return pos
+
+
+def tokenize(data, lineno=1, names=None):
+    """List of the tokens in data, numbering lines from lineno; returns (tokens, last line)
+
+    Identifiers are interned in names, a fresh NameTable unless one is given.
+
+    Tokens never form reference cycles, so the cyclic garbage collector is
+    paused while they are allocated instead of running dozens of times.
+    """
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        tokens = list(scan(data, lineno, NameTable() if names is None else names))
+    finally:
+        if collecting:
+            gc.enable()
+    # Every newline is counted once, whether it ends a token, a comment or an error
+    return tokens, lineno + data.count('\n')
+
+
+def scan(data, lineno, names):
+    """Generate the tokens in data one by one, numbering lines from lineno"""
+    classes = CHAR_CLASSES
+    keyword_type = keywords.get
+    known = names.ids.get
+    spellings = names.names
+    intern = names.intern
+    identifier = IDENTIFIER_RE.match
+    number = NUMBER_RE.match
+    whitespace = WHITESPACE_RE.match
+    end = len(data)
+    pos = 0
+    while pos < end:
+        ch = data[pos]
+        kind = classes.get(ch)
+        if kind == SPACE or kind == NEWLINE:
+            match_end = whitespace(data, pos).end()
+            lineno += data.count('\n', pos, match_end)
+            pos = match_end
+        elif kind == LETTER:
+            match = identifier(data, pos)
+            value = match.group()
+            kind = keyword_type(value)
+            if kind is None:
+                symbol_id = known(value)
+                if symbol_id is None:
+                    symbol_id = intern(value)
+                yield NameToken(spellings[symbol_id], lineno, pos, symbol_id)
+            else:
+                yield Token(kind, value, lineno, pos)
+            pos = match.end()
+        elif kind == OPERATOR:
+            two = data[pos:pos + 2]
+            if two == '</':
+                pos, lineno = skip_comment(data, pos, lineno)
+            elif two in TWO_CHAR_OPERATORS:
+                yield Token(TWO_CHAR_OPERATORS[two], two, lineno, pos)
+                pos += 2
+            elif ch in ONE_CHAR_OPERATORS:
+                yield Token(ONE_CHAR_OPERATORS[ch], ch, lineno, pos)
+                pos += 1
+            else:
+                pos = skip_illegal(data, pos, lineno)
+        elif kind == DIGIT:
+            match = number(data, pos)
+            yield Token('NUMBER', int(match.group()), lineno, pos)
+            pos = match.end()
+        elif kind == QUOTE:
+            match = STRING_RE.match(data, pos)
+            if match:
+                yield Token('STRING', match.group()[1:-1], lineno, pos)
+                pos = match.end()
+                continue
+            match = MSTRING_RE.match(data, pos)
+            if match:
+                text = match.group()
+                yield Token('MSTRING', text[3:-3], lineno, pos)
+                lineno += text.count('\n')
+                pos = match.end()
+            else:
+                pos = skip_illegal(data, pos, lineno)
+        else:
+            # \d also matches non-ASCII digits, as in the PLY rule
+            match = number(data, pos)
+            if match:
+                yield Token('NUMBER', int(match.group()), lineno, pos)
+                pos = match.end()
+            else:
+                pos = skip_illegal(data, pos, lineno)
+
+
+class Scanner:
+    """Lexer object with the interface the PLY parser expects
+
+    input() only starts a scan of the text; token() scans on to the next
+    token when the parser asks for it, so memory does not grow with the
+    input. Like the PLY lexer, lineno carries over between inputs.
+    Unlike it, an unclosed comment ends the input instead of rescanning it.
+    """
+
+    def __init__(self):
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lineno = 1
+        self.pending = iter(())
+        self.names = NameTable()
+
+    def input(self, data):
+        self.lexdata = data
+        self.pending = scan(data, self.lineno, self.names)
+        self.lineno += data.count('\n')
+        self.lexpos = 0
+
+    def token(self):
+        tok = next(self.pending, None)
+        if tok is None:
+            self.lexpos = len(self.lexdata)
+            return None
+        self.lexpos = tok.lexpos
+        return tok
+
+    def clone(self):
+        copy = Scanner()
+        copy.lineno = self.lineno
+        return copy
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
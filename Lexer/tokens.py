@@ -2,6 +2,8 @@
 
 import re
 
+from Lexer.names import NameToken
+
 tokens = [
     'ID', 'NUMBER', 'STRING', 'MSTRING',
     'PLUS', 'MINUS', 'MULTIPLY', 'DIVIDE',
@@ -70,6 +72,10 @@ t_ARROW          = r'=>'
 def t_ID(t):
     r'[a-zA-Z_][a-zA-Z0-9_]*'
     t.type = keywords.get(t.value, 'ID')
+    if t.type == 'ID':
+        names = t.lexer.names
+        symbol_id = names.intern(t.value)
+        return NameToken(names.names[symbol_id], t.lineno, t.lexpos, symbol_id)
     return t
 
 def t_NUMBER(t):
@@ -68,203 +68,252 @@ class ASTNode:
         return result
 
 class Program(ASTNode):
-    def __init__(self, functions):
+    def __init__(self, functions, names=None):
         self.functions = functions
+        self.names = names
     
     def __str__(self):
         return f"Program(functions={len(self.functions)})"
 
 class Function(ASTNode):
-    def __init__(self, name, params, return_type, body, line):
+    def __init__(self, name, params, return_type, body, line, column=None, symbol_id=None):
         self.name = name
         self.params = params
         self.return_type = return_type
         self.body = body
         self.line = line
+        self.column = column
+        self.symbol_id = symbol_id
     
     def __str__(self):
         return f"Function({self.name}, {self.return_type})"
 
 class Parameter(ASTNode):
-    def __init__(self, name, param_type, line):
+    def __init__(self, name, param_type, line, column=None, symbol_id=None):
         self.name = name
         self.param_type = param_type
         self.line = line
+        self.column = column
+        self.symbol_id = symbol_id
     
     def __str__(self):
         return f"Parameter({self.name}: {self.param_type})"
 
 class VarDeclaration(ASTNode):
-    def __init__(self, name, var_type, line):
+    def __init__(self, name, var_type, line, column=None, symbol_id=None):
         self.name = name
         self.var_type = var_type
         self.line = line
+        self.column = column
+        self.symbol_id = symbol_id
     
     def __str__(self):
         return f"VarDeclaration({self.name}: {self.var_type})"
 
 class Assignment(ASTNode):
-    def __init__(self, target, value, line):
+    def __init__(self, target, value, line, column=None, symbol_id=None):
         self.target = target
         self.value = value
         self.line = line
+        self.column = column
+        self.symbol_id = symbol_id
     
     def __str__(self):
         target_str = self.target if isinstance(self.target, str) else str(self.target)
         return f"Assignment({target_str})"
 
 class FunctionCall(ASTNode):
-    def __init__(self, name, args, line):
+    def __init__(self, name, args, line, column=None, symbol_id=None):
         self.name = name
         self.args = args
         self.line = line
+        self.column = column
+        self.symbol_id = symbol_id
     
     def __str__(self):
         return f"FunctionCall({self.name}, {len(self.args)} args)"
 
 class Return(ASTNode):
-    def __init__(self, value, line):
+    def __init__(self, value, line, column=None):
         self.value = value
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"Return({self.value is not None})"
 
 class If(ASTNode):
-    def __init__(self, condition, then_stmt, else_stmt, line):
+    def __init__(self, condition, then_stmt, else_stmt, line, column=None):
         self.condition = condition
         self.then_stmt = then_stmt
         self.else_stmt = else_stmt
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"If(has_else={self.else_stmt is not None})"
 
 class For(ASTNode):
-    def __init__(self, var, start, end, body, line):
+    def __init__(self, var, start, end, body, line, column=None, symbol_id=None):
         self.var = var
         self.start = start
         self.end = end
         self.body = body
         self.line = line
+        self.column = column
+        self.symbol_id = symbol_id
     
     def __str__(self):
         return f"For({self.var})"
 
 class While(ASTNode):
-    def __init__(self, condition, body, line):
+    def __init__(self, condition, body, line, column=None):
         self.condition = condition
         self.body = body
         self.line = line
+        self.column = column
     
     def __str__(self):
         return "While"
 
 class DoWhile(ASTNode):
-    def __init__(self, body, condition, line):
+    def __init__(self, body, condition, line, column=None):
         self.body = body
         self.condition = condition
         self.line = line
+        self.column = column
 
     def __str__(self):
         return f"DoWhile (line {self.line})"
 
 
 class Block(ASTNode):
-    def __init__(self, statements, line):
+    def __init__(self, statements, line, column=None):
         self.statements = statements
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"Block({len(self.statements)} statements)"
 
 class BinaryOp(ASTNode):
-    def __init__(self, left, op, right, line):
+    def __init__(self, left, op, right, line, column=None):
         self.left = left
         self.op = op
         self.right = right
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"BinaryOp({self.op})"
 
 class UnaryOp(ASTNode):
-    def __init__(self, op, operand, line):
+    def __init__(self, op, operand, line, column=None):
         self.op = op
         self.operand = operand
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"UnaryOp({self.op})"
 
 class Identifier(ASTNode):
-    def __init__(self, name, line):
+    def __init__(self, name, line, column=None, symbol_id=None):
         self.name = name
         self.line = line
+        self.column = column
+        self.symbol_id = symbol_id
     
     def __str__(self):
         return f"Identifier({self.name})"
 
 class Number(ASTNode):
-    def __init__(self, value, line):
+    def __init__(self, value, line, column=None):
         self.value = value
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"Number({self.value})"
 
 class String(ASTNode):
-    def __init__(self, value, line):
+    def __init__(self, value, line, column=None):
         self.value = value
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"String({self.value})"
 
 class Boolean(ASTNode):
-    def __init__(self, value, line):
+    def __init__(self, value, line, column=None):
         self.value = value
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"Boolean({self.value})"
 
 class TernaryOp(ASTNode):
-    def __init__(self, condition, true_expr, false_expr, line):
+    def __init__(self, condition, true_expr, false_expr, line, column=None):
         self.condition = condition
         self.true_expr = true_expr
         self.false_expr = false_expr
         self.line = line
+        self.column = column
     
     def __str__(self):
         return "TernaryOp(?:)"
 
 class ArrayAccess(ASTNode):
-    def __init__(self, array, index, line):
+    def __init__(self, array, index, line, column=None, symbol_id=None):
         self.array = array
         self.index = index
         self.line = line
+        self.column = column
+        self.symbol_id = symbol_id
     
     def __str__(self):
         return f"ArrayAccess({self.array})"
 
 class ArrayLiteral(ASTNode):
-    def __init__(self, elements, line):
+    def __init__(self, elements, line, column=None):
         self.elements = elements
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"ArrayLiteral({len(self.elements)} elements)"
 
 class ListCall(ASTNode):
-    def __init__(self, size, line):
+    def __init__(self, size, line, column=None):
         self.size = size
         self.line = line
+        self.column = column
     
     def __str__(self):
         return f"ListCall({self.size})"
 
 
+POSITION_FIELDS = ('line', 'column')
+
+
+def ast_equal(a, b, positions=True):
+    """Structural equality of two ASTs; line and column count only with positions"""
+    if isinstance(a, list) or isinstance(b, list):
+        return (isinstance(a, list) and isinstance(b, list) and len(a) == len(b)
+                and all(ast_equal(x, y, positions) for x, y in zip(a, b)))
+    if not isinstance(a, ASTNode) and not isinstance(b, ASTNode):
+        return a == b
+    if type(a) is not type(b):
+        return False
+    fields, other = vars(a), vars(b)
+    if fields.keys() != other.keys():
+        return False
+    return all(ast_equal(value, other[name], positions) for name, value in fields.items()
+               if positions or name not in POSITION_FIELDS)
+
+
 def print_ast_tree(ast_node, title="Abstract Syntax Tree"):
     """Print AST in a tree format"""
     if ast_node is None:
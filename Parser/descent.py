@@ -0,0 +1,420 @@
+# descent.py
+"""Recursive-descent TesLang parser with Pratt expressions, a drop-in for the PLY grammar"""
+
+import gc
+
+import Parser.parser as grammar
+from Parser.ast_nodes import *
+
+END = '$end'
+
+TYPES = frozenset(('INT', 'STR', 'MSTR', 'BOOL', 'VECTOR', 'NULL'))
+BINARY_OPERATORS = ('PLUS', 'MINUS', 'MULTIPLY', 'DIVIDE', 'EQEQ', 'NEQ', 'LESS_THAN',
+                    'GREATER_THAN', 'LTEQ', 'GTEQ', 'AND', 'OR')
+
+# (level, level of the right operand) for every name in the grammar's
+# precedence table: a left-associative operator only lets tighter operators
+# into its right operand, a right-associative one also lets itself in
+LEVELS = {}
+for _level, (_associativity, *_names) in enumerate(grammar.precedence, 1):
+    for _name in _names:
+        LEVELS[_name] = (_level, _level + 1 if _associativity == 'left' else _level)
+
+INFIX = {name: LEVELS[name] for name in BINARY_OPERATORS + ('QMARK',)}
+UNARY_OPERAND_LEVEL = LEVELS['UMINUS'][1]
+
+# Tokens after an ID that make it an indexing or a call rather than a name
+ID_SUFFIXES = frozenset(('LSQUAREBR', 'LPAREN'))
+
+
+class ParseError(Exception):
+    """Raised at the first token the grammar cannot accept; None means end of input"""
+
+    def __init__(self, token):
+        super().__init__(token)
+        self.token = token
+
+
+class DescentParser:
+    """Parser with one method per grammar rule and precedence climbing for expressions
+
+    parse() takes the arguments of the PLY parser's parse() and builds the
+    same AST, positions included. Syntax errors are reported through p_error
+    in Parser/parser.py at the same token PLY reports, but parsing stops
+    there, while PLY tries to recover and may report more.
+
+    Methods refer to tokens by index: self.types and self.columns run
+    parallel to self.tokens, and types ends with END so that looking one
+    token ahead never runs off the list.
+    """
+
+    def __init__(self):
+        self.tokens = []
+        self.types = [END]
+        self.columns = []
+        self.names = None
+        self.pos = 0
+        self.statements = {
+            'ID': self.identifier_statement, 'PRINT': self.call_statement, 'LEN': self.call_statement,
+            'RETURN': self.return_statement, 'IF': self.if_statement, 'FOR': self.for_statement,
+            'WHILE': self.while_statement, 'DO': self.do_while_statement, 'BEGIN': self.block,
+            'FUNK': self.function,
+        }
+        self.prefixes = {
+            'ID': self.identifier, 'NUMBER': self.number, 'STRING': self.string, 'MSTRING': self.string,
+            'TRUE': self.boolean, 'FALSE': self.boolean, 'LPAREN': self.group,
+            'LSQUAREBR': self.array_literal, 'PRINT': self.call, 'LEN': self.call,
+            'NOT': self.unary, 'MINUS': self.unary, 'PLUS': self.unary,
+        }
+
+    def parse(self, input=None, lexer=None, debug=False, tracking=False, tokenfunc=None):
+        """Parse input (or the text already fed to lexer); returns the Program or None"""
+        if lexer is None:
+            from Lexer.lexer import base_lexer
+            lexer = base_lexer()
+        if input is not None:
+            lexer.input(input)
+        tokens = list(iter(tokenfunc or lexer.token, None))
+        return self.parse_tokens(tokens, getattr(lexer, 'lexdata', None), getattr(lexer, 'names', None))
+
+    def parse_tokens(self, tokens, lexdata=None, names=None):
+        """Parse an already-lexed token list; lexdata is the source, for columns
+
+        names is the NameTable the tokens were interned in, kept on the Program.
+
+        AST nodes never form reference cycles, so the cyclic garbage
+        collector is paused while they are built, as in Lexer.scanner.
+        """
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self.parse_list(tokens, lexdata, names)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def parse_list(self, tokens, lexdata, names):
+        self.tokens = tokens
+        self.names = names
+        self.types = [tok.type for tok in tokens]
+        self.types.append(END)
+        if lexdata:
+            rfind = lexdata.rfind
+            self.columns = [tok.lexpos - rfind('\n', 0, tok.lexpos) for tok in tokens]
+        else:
+            self.columns = [None] * len(tokens)
+        self.pos = 0
+        try:
+            return self.program()
+        except ParseError as e:
+            grammar.p_error(e.token)
+            return None
+        finally:
+            self.tokens = []
+            self.types = [END]
+            self.columns = []
+            self.names = None
+
+    # Tokens
+
+    def error(self):
+        if self.pos < len(self.tokens):
+            return ParseError(self.tokens[self.pos])
+        return ParseError(None)
+
+    def expect(self, kind):
+        """Consume a token of the given type and return its index"""
+        i = self.pos
+        if self.types[i] != kind:
+            raise self.error()
+        self.pos = i + 1
+        return i
+
+    # Functions
+
+    def program(self):
+        functions = []
+        add = grammar.function_sink or functions.append
+        add(self.function())
+        while self.types[self.pos] == 'FUNK':
+            add(self.function())
+        if self.types[self.pos] != END:
+            raise self.error()
+        return Program(functions, self.names)
+
+    def function(self):
+        start = self.expect('FUNK')
+        name = self.tokens[self.expect('ID')]
+        self.expect('LPAREN')
+        params = []
+        if self.types[self.pos] != 'RPAREN':
+            params.append(self.parameter())
+            while self.types[self.pos] == 'COMMA':
+                self.pos += 1
+                params.append(self.parameter())
+        self.expect('RPAREN')
+        self.expect('LESS_THAN')
+        return_type = self.type()
+        self.expect('GREATER_THAN')
+        if self.types[self.pos] == 'ARROW':
+            self.pos += 1
+            ret = self.expect('RETURN')
+            value = self.expression()
+            self.expect('SEMI_COLON')
+            body = [Return(value, self.tokens[ret].lineno, self.columns[ret])]
+        else:
+            self.expect('LCURLYEBR')
+            body = self.statement_list('RCURLYEBR')
+        return Function(name.value, params, return_type, body, self.tokens[start].lineno, self.columns[start],
+                        name.symbol_id)
+
+    def parameter(self):
+        i = self.expect('ID')
+        self.expect('AS')
+        tok = self.tokens[i]
+        return Parameter(tok.value, self.type(), tok.lineno, self.columns[i], tok.symbol_id)
+
+    def type(self):
+        i = self.pos
+        if self.types[i] not in TYPES:
+            raise self.error()
+        self.pos = i + 1
+        return self.tokens[i].value
+
+    # Statements
+
+    def statement_list(self, end):
+        """Statements up to and including the end token, declarations with values flattened"""
+        statements = []
+        types = self.types
+        while types[self.pos] != end:
+            stmt = self.statement()
+            if isinstance(stmt, list):
+                statements.extend(stmt)
+            else:
+                statements.append(stmt)
+        self.pos += 1
+        return statements
+
+    def statement(self):
+        rule = self.statements.get(self.types[self.pos])
+        if rule is None:
+            raise self.error()
+        return rule()
+
+    def identifier_statement(self):
+        i = self.pos
+        tok = self.tokens[i]
+        following = self.types[i + 1]
+        if following == 'DBL_COLON':
+            self.pos = i + 2
+            decl = VarDeclaration(tok.value, self.type(), tok.lineno, self.columns[i], tok.symbol_id)
+            if self.types[self.pos] == 'SEMI_COLON':
+                self.pos += 1
+                return decl
+            eq = self.expect('EQ')
+            value = self.expression()
+            self.expect('SEMI_COLON')
+            return [decl, Assignment(tok.value, value, self.tokens[eq].lineno, self.columns[eq], tok.symbol_id)]
+        if following == 'LPAREN':
+            return self.call_statement()
+        if following == 'LSQUAREBR':
+            target, symbol_id = self.array_access(), None
+        else:
+            target, symbol_id = tok.value, tok.symbol_id
+            self.pos = i + 1
+        eq = self.expect('EQ')
+        value = self.expression()
+        self.expect('SEMI_COLON')
+        return Assignment(target, value, self.tokens[eq].lineno, self.columns[eq], symbol_id)
+
+    def call_statement(self):
+        call = self.call()
+        self.expect('SEMI_COLON')
+        return call
+
+    def return_statement(self):
+        i = self.pos
+        self.pos = i + 1
+        value = None
+        if self.types[self.pos] != 'SEMI_COLON':
+            value = self.expression()
+        self.expect('SEMI_COLON')
+        return Return(value, self.tokens[i].lineno, self.columns[i])
+
+    def condition(self):
+        """The expression of [[ expression ]]"""
+        self.expect('LSQUAREBR')
+        self.expect('LSQUAREBR')
+        condition = self.expression()
+        self.expect('RSQUAREBR')
+        self.expect('RSQUAREBR')
+        return condition
+
+    def if_statement(self):
+        i = self.pos
+        self.pos = i + 1
+        condition = self.condition()
+        then_stmt = self.statement()
+        else_stmt = None
+        if self.types[self.pos] == 'ELSE':
+            self.pos += 1
+            else_stmt = self.statement()
+        return If(condition, then_stmt, else_stmt, self.tokens[i].lineno, self.columns[i])
+
+    def for_statement(self):
+        i = self.pos
+        self.pos = i + 1
+        self.expect('LPAREN')
+        var = self.tokens[self.expect('ID')]
+        self.expect('EQ')
+        start = self.expression()
+        self.expect('TO')
+        end = self.expression()
+        self.expect('RPAREN')
+        self.expect('BEGIN')
+        body = self.statement_list('END')
+        return For(var.value, start, end, body, self.tokens[i].lineno, self.columns[i], var.symbol_id)
+
+    def while_statement(self):
+        i = self.pos
+        self.pos = i + 1
+        condition = self.condition()
+        return While(condition, self.statement(), self.tokens[i].lineno, self.columns[i])
+
+    def do_while_statement(self):
+        i = self.pos
+        self.pos = i + 1
+        body = self.statement()
+        self.expect('WHILE')
+        condition = self.condition()
+        self.expect('SEMI_COLON')
+        return DoWhile(body, condition, self.tokens[i].lineno, self.columns[i])
+
+    def block(self):
+        i = self.pos
+        self.pos = i + 1
+        return Block(self.statement_list('END'), self.tokens[i].lineno, self.columns[i])
+
+    # Expressions
+
+    def expression(self, level=0):
+        """Precedence climbing: parse operators binding at least as tightly as level
+
+        Plain names and numbers, most of all operands, are built inline
+        rather than through prefix().
+        """
+        types = self.types
+        tokens = self.tokens
+        columns = self.columns
+        i = self.pos
+        kind = types[i]
+        if kind == 'ID' and types[i + 1] not in ID_SUFFIXES:
+            tok = tokens[i]
+            left = Identifier(tok.value, tok.lineno, columns[i], tok.symbol_id)
+            self.pos = i = i + 1
+        elif kind == 'NUMBER':
+            tok = tokens[i]
+            left = Number(tok.value, tok.lineno, columns[i])
+            self.pos = i = i + 1
+        else:
+            left = self.prefix()
+            i = self.pos
+        while True:
+            operator = INFIX.get(types[i])
+            if operator is None or operator[0] < level:
+                return left
+            tok = tokens[i]
+            self.pos = i + 1
+            if tok.type == 'QMARK':
+                middle = self.expression()
+                self.expect('COLON')
+                left = TernaryOp(left, middle, self.expression(operator[1]), tok.lineno, columns[i])
+            else:
+                left = BinaryOp(left, tok.value, self.expression(operator[1]), tok.lineno, columns[i])
+            i = self.pos
+
+    def prefix(self):
+        rule = self.prefixes.get(self.types[self.pos])
+        if rule is None:
+            raise self.error()
+        return rule()
+
+    def unary(self):
+        i = self.pos
+        self.pos = i + 1
+        tok = self.tokens[i]
+        operand = self.expression(UNARY_OPERAND_LEVEL)
+        return UnaryOp(tok.value, operand, tok.lineno, self.columns[i])
+
+    def group(self):
+        self.pos += 1
+        value = self.expression()
+        self.expect('RPAREN')
+        return value
+
+    def array_literal(self):
+        i = self.pos
+        self.pos = i + 1
+        elements = []
+        if self.types[self.pos] != 'RSQUAREBR':
+            elements = self.arguments()
+        self.expect('RSQUAREBR')
+        return ArrayLiteral(elements, self.tokens[i].lineno, self.columns[i])
+
+    def literal(self, node_class):
+        i = self.pos
+        self.pos = i + 1
+        tok = self.tokens[i]
+        return node_class(tok.value, tok.lineno, self.columns[i])
+
+    def number(self):
+        return self.literal(Number)
+
+    def string(self):
+        return self.literal(String)
+
+    def boolean(self):
+        return self.literal(Boolean)
+
+    def identifier(self):
+        following = self.types[self.pos + 1]
+        if following == 'LSQUAREBR':
+            return self.array_access()
+        if following == 'LPAREN':
+            return self.call()
+        i = self.pos
+        self.pos = i + 1
+        tok = self.tokens[i]
+        return Identifier(tok.value, tok.lineno, self.columns[i], tok.symbol_id)
+
+    def array_access(self):
+        i = self.pos
+        self.pos = i + 2
+        index = self.expression()
+        self.expect('RSQUAREBR')
+        tok = self.tokens[i]
+        return ArrayAccess(tok.value, index, tok.lineno, self.columns[i], tok.symbol_id)
+
+    def call(self):
+        """name(args), print(args) or length(expression)"""
+        i = self.pos
+        self.pos = i + 1
+        tok = self.tokens[i]
+        self.expect('LPAREN')
+        if tok.type == 'LEN':
+            args = [self.expression()]
+        elif self.types[self.pos] == 'RPAREN':
+            args = []
+        else:
+            args = self.arguments()
+        self.expect('RPAREN')
+        symbol_id = tok.symbol_id if tok.type == 'ID' else None
+        return FunctionCall(tok.value, args, tok.lineno, self.columns[i], symbol_id)
+
+    def arguments(self):
+        args = [self.expression()]
+        while self.types[self.pos] == 'COMMA':
+            self.pos += 1
+            args.append(self.expression())
+        return args
@@ -0,0 +1,384 @@
+# lrtables.py
+"""Compact binary LALR tables for the TesLang grammar and the parser that runs on them"""
+
+import array
+import os
+import struct
+import sys
+import zlib
+
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsetab.bin')
+
+MAGIC = b'TSLR'
+VERSION = 1
+# magic, version, grammar signature, size of the name block, terminals,
+# nonterminals, states, productions, action slots, goto slots
+HEADER = struct.Struct('<4sHIIHHHHII')
+
+END = '$end'
+ERROR = 'error'
+# Tokens to shift after a syntax error before another one is reported, as in ply.yacc
+ERROR_COUNT = 3
+
+
+def grammar_signature(module):
+    """CRC of everything the tables are built from: precedence, tokens and rules"""
+    rules = sorted((value.__code__.co_firstlineno, name, value.__doc__ or '')
+                   for name, value in vars(module).items()
+                   if name.startswith('p_') and name != 'p_error' and callable(value))
+    parts = [''.join(''.join(level) for level in module.precedence), ' '.join(sorted(module.tokens))]
+    parts.extend(f"{name}:{doc}" for _, name, doc in rules)
+    return zlib.crc32('\n'.join(parts).encode('utf-8'))
+
+
+def displace(rows, width):
+    """Pack sparse {column: value} rows into one array by row displacement
+
+    Returns (bases, checks, values): the entry of row r in column c sits at
+    bases[r] + c, and checks there is r if the row has such an entry. Rows
+    are placed first-fit, widest first, and the arrays are padded so every
+    bases[r] + c with c < width is in range.
+    """
+    bases = [0] * len(rows)
+    checks = []
+    values = []
+    for r in sorted(range(len(rows)), key=lambda r: -len(rows[r])):
+        columns = sorted(rows[r])
+        if not columns:
+            continue
+        base = 0
+        while any(base + c < len(checks) and checks[base + c] != -1 for c in columns):
+            base += 1
+        if len(checks) < base + width:
+            checks.extend([-1] * (base + width - len(checks)))
+            values.extend([0] * (base + width - len(values)))
+        for c in columns:
+            checks[base + c] = r
+            values[base + c] = rows[r][c]
+        bases[r] = base
+    if len(checks) < width:
+        checks.extend([-1] * (width - len(checks)))
+        values.extend([0] * (width - len(values)))
+    return bases, checks, values
+
+
+def int16(values):
+    """array('h') of values; raises OverflowError if the grammar outgrows 16 bits"""
+    return array.array('h', values)
+
+
+class CompactTables:
+    """LALR tables as row-displaced int16 arrays
+
+    The action of state s on terminal t is action_values[action_bases[s] + t]
+    if action_checks holds s at that index, and a syntax error otherwise:
+    positive actions shift to that state, negative ones reduce by that
+    production and 0 accepts. Gotos are found the same way, without a check
+    since the parser only follows gotos that exist. default_reductions holds
+    the reduction of states that reduce whatever the next token is, else 0.
+    """
+
+    ARRAYS = ('action_bases', 'action_checks', 'action_values', 'goto_bases', 'goto_values',
+              'default_reductions', 'production_lhs', 'production_lengths')
+
+    def __init__(self, signature, terminals, nonterminals, functions, **arrays):
+        self.signature = signature
+        self.terminals = terminals
+        self.nonterminals = nonterminals
+        self.functions = functions
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def from_lr_parser(cls, lr, signature):
+        """Pack the dict-of-dicts tables of a ply.yacc LRParser"""
+        terminals = sorted({term for row in lr.action.values() for term in row} | {END, ERROR})
+        nonterminals = sorted({production.name for production in lr.productions})
+        terminal_ids = {name: i for i, name in enumerate(terminals)}
+        nonterminal_ids = {name: i for i, name in enumerate(nonterminals)}
+        states = len(lr.action)
+
+        actions = [{terminal_ids[term]: value for term, value in lr.action[state].items()}
+                   for state in range(states)]
+        gotos = [{nonterminal_ids[name]: value for name, value in lr.goto.get(state, {}).items()}
+                 for state in range(states)]
+        action_bases, action_checks, action_values = displace(actions, len(terminals))
+        goto_bases, _, goto_values = displace(gotos, len(nonterminals))
+        defaults = [lr.defaulted_states.get(state, 0) for state in range(states)]
+
+        return cls(signature, terminals, nonterminals,
+                   [production.func or '' for production in lr.productions],
+                   action_bases=int16(action_bases), action_checks=int16(action_checks),
+                   action_values=int16(action_values), goto_bases=int16(goto_bases),
+                   goto_values=int16(goto_values), default_reductions=int16(defaults),
+                   production_lhs=int16(nonterminal_ids[p.name] for p in lr.productions),
+                   production_lengths=int16(p.len for p in lr.productions))
+
+    def to_bytes(self):
+        names = '\n'.join(self.terminals + self.nonterminals + self.functions).encode('utf-8')
+        header = HEADER.pack(MAGIC, VERSION, self.signature, len(names), len(self.terminals),
+                             len(self.nonterminals), len(self.action_bases), len(self.functions),
+                             len(self.action_checks), len(self.goto_values))
+        blobs = []
+        for name in self.ARRAYS:
+            values = getattr(self, name)
+            if sys.byteorder == 'big':
+                values = array.array('h', values)
+                values.byteswap()
+            blobs.append(values.tobytes())
+        return header + names + b''.join(blobs)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Tables from the bytes of a table file; raises ValueError if they are not valid"""
+        if len(data) < HEADER.size:
+            raise ValueError("table file is truncated")
+        (magic, version, signature, names_size, terminal_count, nonterminal_count, states,
+         productions, action_size, goto_size) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a version 1 TesLang table file")
+        sizes = (states, action_size, action_size, states, goto_size, states, productions, productions)
+        if len(data) != HEADER.size + names_size + 2 * sum(sizes):
+            raise ValueError("table file is truncated")
+
+        offset = HEADER.size + names_size
+        names = bytes(data[HEADER.size:offset]).decode('utf-8').split('\n')
+        arrays = {}
+        view = memoryview(data)
+        for name, size in zip(cls.ARRAYS, sizes):
+            values = array.array('h')
+            values.frombytes(view[offset:offset + 2 * size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            arrays[name] = values
+            offset += 2 * size
+        terminals = names[:terminal_count]
+        nonterminals = names[terminal_count:terminal_count + nonterminal_count]
+        functions = names[terminal_count + nonterminal_count:]
+        return cls(signature, terminals, nonterminals, functions, **arrays)
+
+
+def build_tables(module):
+    """Run the PLY table generator on module and pack its output"""
+    import ply.yacc as yacc
+    lr = yacc.yacc(module=module, debug=False, write_tables=False)
+    return CompactTables.from_lr_parser(lr, grammar_signature(module))
+
+
+def write_tables(tables, path=TABLE_FILE):
+    with open(path, 'wb') as f:
+        f.write(tables.to_bytes())
+
+
+def read_tables(path=TABLE_FILE):
+    """Tables from a table file, loaded with a single read"""
+    with open(path, 'rb') as f:
+        return CompactTables.from_bytes(f.read())
+
+
+def load_tables(module, path=TABLE_FILE):
+    """Tables for module's grammar; rebuilt, and rewritten if possible, when missing or stale"""
+    signature = grammar_signature(module)
+    try:
+        tables = read_tables(path)
+        if tables.signature == signature:
+            return tables
+    except (OSError, ValueError):
+        pass
+    tables = build_tables(module)
+    try:
+        write_tables(tables, path)
+    except OSError:
+        pass
+    return tables
+
+
+class Symbol:
+    """A nonterminal on the parse stack, or the end-of-input and error markers"""
+
+    __slots__ = ('type', 'value', 'lineno', 'lexpos')
+
+    def __init__(self, type, value=None):
+        self.type = type
+        self.value = value
+
+
+class Production:
+    """The p argument of grammar rule functions, like ply.yacc.YaccProduction"""
+
+    __slots__ = ('slice', 'lexer', 'parser')
+
+    def __init__(self, lexer, parser):
+        self.slice = None
+        self.lexer = lexer
+        self.parser = parser
+
+    def __getitem__(self, n):
+        if isinstance(n, slice):
+            return [symbol.value for symbol in self.slice[n]]
+        return self.slice[n].value
+
+    def __setitem__(self, n, value):
+        self.slice[n].value = value
+
+    def __len__(self):
+        return len(self.slice)
+
+    def lineno(self, n):
+        return getattr(self.slice[n], 'lineno', 0)
+
+    def lexpos(self, n):
+        return getattr(self.slice[n], 'lexpos', 0)
+
+
+class TableParser:
+    """LALR parser driven by CompactTables, calling module's p_ functions
+
+    parse() takes the arguments of the PLY parser's parse() and follows
+    ply.yacc step for step, error recovery included, so it reports the same
+    errors and returns the same result.
+    """
+
+    def __init__(self, tables, module):
+        self.tables = tables
+        self.terminal_ids = {name: i for i, name in enumerate(tables.terminals)}
+        self.callables = [getattr(module, name) if name else None for name in tables.functions]
+        self.lhs_names = [tables.nonterminals[i] for i in tables.production_lhs]
+        self.errorfunc = getattr(module, 'p_error', None)
+
+    def parse(self, input=None, lexer=None, debug=False, tracking=False, tokenfunc=None):
+        """Parse input (or the text already fed to lexer); returns the start symbol's value"""
+        tables = self.tables
+        action_bases = tables.action_bases
+        action_checks = tables.action_checks
+        action_values = tables.action_values
+        goto_bases = tables.goto_bases
+        goto_values = tables.goto_values
+        defaults = tables.default_reductions
+        lhs_ids = tables.production_lhs
+        lengths = tables.production_lengths
+        lhs_names = self.lhs_names
+        callables = self.callables
+        terminal_ids = self.terminal_ids
+
+        if not lexer:
+            from Lexer.lexer import base_lexer
+            lexer = base_lexer()
+        if input is not None:
+            lexer.input(input)
+        get_token = tokenfunc or lexer.token
+        production = Production(lexer, self)
+
+        statestack = [0]
+        symstack = [Symbol(END)]
+        state = 0
+        lookahead = None
+        lookaheadstack = []
+        errorcount = 0
+        while True:
+            t = defaults[state]
+            if not t:
+                t = None
+                if not lookahead:
+                    lookahead = lookaheadstack.pop() if lookaheadstack else get_token()
+                    if not lookahead:
+                        lookahead = Symbol(END)
+                term = terminal_ids.get(lookahead.type)
+                if term is not None:
+                    i = action_bases[state] + term
+                    if action_checks[i] == state:
+                        t = action_values[i]
+
+            if t is not None:
+                if t > 0:
+                    statestack.append(t)
+                    state = t
+                    symstack.append(lookahead)
+                    lookahead = None
+                    if errorcount:
+                        errorcount -= 1
+                    continue
+
+                if t < 0:
+                    rule = -t
+                    length = lengths[rule]
+                    sym = Symbol(lhs_names[rule])
+                    if length:
+                        targ = symstack[-length - 1:]
+                        targ[0] = sym
+                        del symstack[-length:]
+                        production.slice = targ
+                        callables[rule](production)
+                        del statestack[-length:]
+                    else:
+                        production.slice = [sym]
+                        callables[rule](production)
+                    symstack.append(sym)
+                    state = goto_values[goto_bases[statestack[-1]] + lhs_ids[rule]]
+                    statestack.append(state)
+                    continue
+
+                return getattr(symstack[-1], 'value', None)
+
+            # Syntax error: report it unless still recovering from the last one
+            if errorcount == 0:
+                errtoken = None if lookahead.type == END else lookahead
+                if errtoken is not None and not hasattr(errtoken, 'lexer'):
+                    errtoken.lexer = lexer
+                if self.errorfunc:
+                    self.errorfunc(errtoken)
+            errorcount = ERROR_COUNT
+
+            # Nothing left to unwind: drop the token and start over
+            if len(statestack) <= 1 and lookahead.type != END:
+                lookahead = None
+                state = 0
+                del lookaheadstack[:]
+                continue
+            if lookahead.type == END:
+                return None
+            if lookahead.type != ERROR:
+                if symstack[-1].type == ERROR:
+                    lookahead = None
+                    continue
+                error = Symbol(ERROR, lookahead)
+                if hasattr(lookahead, 'lineno'):
+                    error.lineno = lookahead.lineno
+                if hasattr(lookahead, 'lexpos'):
+                    error.lexpos = lookahead.lexpos
+                lookaheadstack.append(lookahead)
+                lookahead = error
+            else:
+                symstack.pop()
+                statestack.pop()
+                state = statestack[-1]
+
+
+_parsers = {}
+
+
+def table_parser(module):
+    """The TableParser for module's grammar, loading its tables once per process"""
+    parser = _parsers.get(module.__name__)
+    if parser is None:
+        parser = _parsers[module.__name__] = TableParser(load_tables(module), module)
+    return parser
+
+
+def main(argv=None):
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="Rebuild Parser/parsetab.bin from the grammar in Parser/parser.py")
+    arg_parser.add_argument("-o", "--output", default=TABLE_FILE, help="table file to write")
+    args = arg_parser.parse_args(argv)
+
+    import Parser.parser as grammar
+    tables = build_tables(grammar)
+    write_tables(tables, args.output)
+    print(f"{args.output}: {len(tables.action_bases)} states, {len(tables.terminals)} terminals, "
+          f"{len(tables.nonterminals)} nonterminals, {len(tables.functions)} productions, "
+          f"{os.path.getsize(args.output)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,25 @@
 # parser.py
 """Parser for TesLang Compiler using PLY - Fixed for Nested Functions"""
 
-import ply.yacc as yacc
 try:
     from Lexer.tokens import tokens
 except ImportError:
     from tokens import tokens
 
 from Parser.ast_nodes import *
+from Lexer.names import NameTable
 
 import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from SemanticAnalyzerF.symbol_table import SymbolTable, Symbol
-from SemanticAnalyzerF.semantic_analyzer import SemanticAnalyzer
 
 symbol_table = None
 function_context_stack = []  
 errors = []
 current_function_name = None
+# When set, each top-level function is passed here as soon as it is reduced
+# instead of being collected into the Program
+function_sink = None
 
 
 def add_error(message, line=None):
@@ -29,6 +29,18 @@ def add_error(message, line=None):
     else:
         errors.append(message)
 
+def token_column(p, n):
+    """1-based column of the n-th symbol of a production, or None if the source is unknown"""
+    data = getattr(p.lexer, 'lexdata', None)
+    if not data:
+        return None
+    pos = p.lexpos(n)
+    return pos - data.rfind('\n', 0, pos)
+
+def token_symbol(p, n):
+    """NameTable id of the n-th symbol of a production, or None unless it is an ID token"""
+    return getattr(p.slice[n], 'symbol_id', None)
+
 def push_function_context(function_name):
     """Push a new function context onto the stack"""
     function_context_stack.append(function_name)
@@ -50,12 +62,15 @@ def is_inside_function():
 
 def p_program(p):
     '''program : function_list'''
-    p[0] = Program(p[1])
+    p[0] = Program(p[1], getattr(p.lexer, 'names', None))
 
 def p_function_list(p):
     '''function_list : function_list function
                     | function'''
-    if len(p) == 2:
+    if function_sink is not None:
+        function_sink(p[len(p) - 1])
+        p[0] = []
+    elif len(p) == 2:
         p[0] = [p[1]]
     else:
         p[0] = p[1] + [p[2]]
@@ -70,16 +85,16 @@ def p_function(p):
     old_function = current_function_name
     current_function_name = p[2]
     
-    if len(p) == 12: 
-        p[0] = Function(p[2], p[4], p[7], p[10], p.lineno(1))
+    if len(p) == 12 and isinstance(p[4], list):
+        p[0] = Function(p[2], p[4], p[7], p[10], p.lineno(1), token_column(p, 1), token_symbol(p, 2))
     elif len(p) == 11:  
-        p[0] = Function(p[2], [], p[6], p[9], p.lineno(1))
+        p[0] = Function(p[2], [], p[6], p[9], p.lineno(1), token_column(p, 1), token_symbol(p, 2))
     elif len(p) == 13: 
-        return_stmt = Return(p[11], p.lineno(10))
-        p[0] = Function(p[2], p[4], p[7], [return_stmt], p.lineno(1))
+        return_stmt = Return(p[11], p.lineno(10), token_column(p, 10))
+        p[0] = Function(p[2], p[4], p[7], [return_stmt], p.lineno(1), token_column(p, 1), token_symbol(p, 2))
     else:  
-        return_stmt = Return(p[10], p.lineno(9))
-        p[0] = Function(p[2], [], p[6], [return_stmt], p.lineno(1))
+        return_stmt = Return(p[10], p.lineno(9), token_column(p, 9))
+        p[0] = Function(p[2], [], p[6], [return_stmt], p.lineno(1), token_column(p, 1), token_symbol(p, 2))
     
     current_function_name = old_function
 
@@ -93,7 +108,7 @@ def p_param_list(p):
 
 def p_parameter(p):
     '''parameter : ID AS type'''
-    p[0] = Parameter(p[1], p[3], p.lineno(1))
+    p[0] = Parameter(p[1], p[3], p.lineno(1), token_column(p, 1), token_symbol(p, 1))
 
 def p_type(p):
     '''type : INT
@@ -144,20 +159,20 @@ def p_var_declaration(p):
     '''var_declaration : ID DBL_COLON type SEMI_COLON
                        | ID DBL_COLON type EQ expression SEMI_COLON'''
     if len(p) == 5:
-        p[0] = VarDeclaration(p[1], p[3], p.lineno(1))
+        p[0] = VarDeclaration(p[1], p[3], p.lineno(1), token_column(p, 1), token_symbol(p, 1))
     else:
-        decl = VarDeclaration(p[1], p[3], p.lineno(1))
-        assign = Assignment(p[1], p[5], p.lineno(4))
+        decl = VarDeclaration(p[1], p[3], p.lineno(1), token_column(p, 1), token_symbol(p, 1))
+        assign = Assignment(p[1], p[5], p.lineno(4), token_column(p, 4), token_symbol(p, 1))
         p[0] = [decl, assign]
 
 def p_assignment(p):
     '''assignment : ID EQ expression SEMI_COLON
                  | array_access EQ expression SEMI_COLON'''
-    p[0] = Assignment(p[1], p[3], p.lineno(2))
+    p[0] = Assignment(p[1], p[3], p.lineno(2), token_column(p, 2), token_symbol(p, 1))
 
 def p_array_access(p):
     '''array_access : ID LSQUAREBR expression RSQUAREBR'''
-    p[0] = ArrayAccess(p[1], p[3], p.lineno(1))
+    p[0] = ArrayAccess(p[1], p[3], p.lineno(1), token_column(p, 1), token_symbol(p, 1))
 
 def p_function_call_stmt(p):
     '''function_call_stmt : function_call SEMI_COLON'''
@@ -170,12 +185,12 @@ def p_function_call(p):
                     | PRINT LPAREN RPAREN
                     | LEN LPAREN expression RPAREN'''
     if len(p) == 4:
-        p[0] = FunctionCall(p[1], [], p.lineno(1))
+        p[0] = FunctionCall(p[1], [], p.lineno(1), token_column(p, 1), token_symbol(p, 1))
     else:
         if p[1] == 'length':
-            p[0] = FunctionCall('length', [p[3]], p.lineno(1))
+            p[0] = FunctionCall('length', [p[3]], p.lineno(1), token_column(p, 1))
         else:
-            p[0] = FunctionCall(p[1], p[3], p.lineno(1))
+            p[0] = FunctionCall(p[1], p[3], p.lineno(1), token_column(p, 1), token_symbol(p, 1))
 
 def p_arg_list(p):
     '''arg_list : arg_list COMMA expression
@@ -190,34 +205,34 @@ def p_return_stmt(p):
                   | RETURN SEMI_COLON'''
     
     if len(p) == 3:
-        p[0] = Return(None, p.lineno(1))
+        p[0] = Return(None, p.lineno(1), token_column(p, 1))
     else:
-        p[0] = Return(p[2], p.lineno(1))
+        p[0] = Return(p[2], p.lineno(1), token_column(p, 1))
 
 def p_if_stmt(p):
     '''if_stmt : IF LSQUAREBR LSQUAREBR expression RSQUAREBR RSQUAREBR statement
               | IF LSQUAREBR LSQUAREBR expression RSQUAREBR RSQUAREBR statement ELSE statement'''
     if len(p) == 8:
-        p[0] = If(p[4], p[7], None, p.lineno(1))
+        p[0] = If(p[4], p[7], None, p.lineno(1), token_column(p, 1))
     else:
-        p[0] = If(p[4], p[7], p[9], p.lineno(1))
+        p[0] = If(p[4], p[7], p[9], p.lineno(1), token_column(p, 1))
 
 def p_for_stmt(p):
     '''for_stmt : FOR LPAREN ID EQ expression TO expression RPAREN BEGIN stmt_list END'''
-    p[0] = For(p[3], p[5], p[7], p[10], p.lineno(1))
+    p[0] = For(p[3], p[5], p[7], p[10], p.lineno(1), token_column(p, 1), token_symbol(p, 3))
 
 
 def p_while_stmt(p):
     '''while_stmt : WHILE LSQUAREBR LSQUAREBR expression RSQUAREBR RSQUAREBR statement'''
-    p[0] = While(p[4], p[7], p.lineno(1))
+    p[0] = While(p[4], p[7], p.lineno(1), token_column(p, 1))
 
 def p_do_while_stmt(p):
     '''do_while_stmt : DO statement WHILE LSQUAREBR LSQUAREBR expression RSQUAREBR RSQUAREBR SEMI_COLON'''
-    p[0] = DoWhile(p[2], p[6], p.lineno(1))
+    p[0] = DoWhile(p[2], p[6], p.lineno(1), token_column(p, 1))
 
 def p_block_stmt(p):
     '''block_stmt : BEGIN stmt_list END'''
-    p[0] = Block(p[2], p.lineno(1))
+    p[0] = Block(p[2], p.lineno(1), token_column(p, 1))
 
 def p_expression_binop(p):
     '''expression : expression PLUS expression
@@ -232,17 +247,17 @@ def p_expression_binop(p):
                  | expression GTEQ expression
                  | expression AND expression
                  | expression OR expression'''
-    p[0] = BinaryOp(p[1], p[2], p[3], p.lineno(2))
+    p[0] = BinaryOp(p[1], p[2], p[3], p.lineno(2), token_column(p, 2))
 
 def p_expression_unary(p):
     '''expression : NOT expression
                  | MINUS expression %prec UMINUS
                  | PLUS expression %prec UPLUS'''
-    p[0] = UnaryOp(p[1], p[2], p.lineno(1))
+    p[0] = UnaryOp(p[1], p[2], p.lineno(1), token_column(p, 1))
 
 def p_expression_ternary(p):
     '''expression : expression QMARK expression COLON expression'''
-    p[0] = TernaryOp(p[1], p[3], p[5], p.lineno(2))
+    p[0] = TernaryOp(p[1], p[3], p[5], p.lineno(2), token_column(p, 2))
 
 def p_expression_group(p):
     '''expression : LPAREN expression RPAREN'''
@@ -252,27 +267,27 @@ def p_expression_array_literal(p):
     '''expression : LSQUAREBR arg_list RSQUAREBR
                  | LSQUAREBR RSQUAREBR'''
     if len(p) == 3:
-        p[0] = ArrayLiteral([], p.lineno(1))
+        p[0] = ArrayLiteral([], p.lineno(1), token_column(p, 1))
     else:
-        p[0] = ArrayLiteral(p[2], p.lineno(1))
+        p[0] = ArrayLiteral(p[2], p.lineno(1), token_column(p, 1))
 
 def p_expression_number(p):
     '''expression : NUMBER'''
-    p[0] = Number(p[1], p.lineno(1))
+    p[0] = Number(p[1], p.lineno(1), token_column(p, 1))
 
 def p_expression_string(p):
     '''expression : STRING
                  | MSTRING'''
-    p[0] = String(p[1], p.lineno(1))
+    p[0] = String(p[1], p.lineno(1), token_column(p, 1))
 
 def p_expression_boolean(p):
     '''expression : TRUE
                  | FALSE'''
-    p[0] = Boolean(p[1], p.lineno(1))
+    p[0] = Boolean(p[1], p.lineno(1), token_column(p, 1))
 
 def p_expression_id(p):
     '''expression : ID'''
-    p[0] = Identifier(p[1], p.lineno(1))
+    p[0] = Identifier(p[1], p.lineno(1), token_column(p, 1), token_symbol(p, 1))
 
 def p_expression_array_access(p):
     '''expression : array_access'''
@@ -319,21 +334,59 @@ def p_error(p):
     else:
         add_error("Syntax error: unexpected end of file")
 
-def compile_teslang(code):
-    """Main function to compile TesLang code"""
+def reset_lexer():
+    """Restart line numbering and the NameTable so each compile starts afresh"""
+    lex = sys.modules.get('ply.lex')
+    if lex is not None and lex.lexer is not None:
+        lex.lexer.lineno = 1
+        lex.lexer.names = NameTable()
+
+def reset_parser_state():
+    """Clear the module-level state left behind by a previous parse"""
+    global symbol_table, function_context_stack, errors, current_function_name
+    symbol_table = SymbolTable()
+    function_context_stack = []
+    errors = []
+    current_function_name = None
+    reset_lexer()
+
+PARSERS = ('lalr', 'ply', 'descent')
+
+def make_parser(kind='lalr'):
+    """A parser for this grammar; all of them build the same AST
+
+    'lalr' runs on the compact tables in Parser/parsetab.bin, 'ply' is
+    ply.yacc's own parser on Parser/parsetab.py and 'descent' is the
+    recursive-descent parser.
+    """
+    if kind == 'lalr':
+        from Parser.lrtables import table_parser
+        return table_parser(sys.modules[__name__])
+    if kind == 'descent':
+        from Parser.descent import DescentParser
+        return DescentParser()
+    if kind != 'ply':
+        raise ValueError(f"unknown parser {kind}")
+    import ply.yacc as yacc
+    return yacc.yacc(module=sys.modules[__name__], debug=False)
+
+def compile_teslang(code, lexer=None, parser='lalr'):
+    """Main function to compile TesLang code; lexer defaults to the shared PLY lexer"""
     global symbol_table, function_context_stack, errors, current_function_name    
     symbol_table = SymbolTable()
     function_context_stack = []
     errors = []
     current_function_name = None
     
-    parser = yacc.yacc()
+    parser = make_parser(parser)
+    reset_lexer()
     
     try:
-        ast = parser.parse(code, debug=False)
+        ast = parser.parse(code, lexer=lexer, debug=False)
         if not ast:
             return errors
         
+        from SemanticAnalyzerF.semantic_analyzer import SemanticAnalyzer
         analyzer = SemanticAnalyzer()
         semantic_errors = analyzer.analyze(ast)
         
@@ -344,7 +397,7 @@ def compile_teslang(code):
         errors.append(f"Parser error: {str(e)}")
         return errors
 
-def parse_code(code):
+def parse_code(code, lexer=None, parser='lalr'):
     """Parse code and return AST (without semantic analysis)"""
     global symbol_table, function_context_stack, errors, current_function_name    
     symbol_table = SymbolTable()
@@ -352,10 +405,11 @@ def parse_code(code):
     errors = []
     current_function_name = None
     
-    parser = yacc.yacc()
+    parser = make_parser(parser)
+    reset_lexer()
     
     try:
-        ast = parser.parse(code, debug=False)
+        ast = parser.parse(code, lexer=lexer, debug=False)
         return ast
         
     except Exception as e:
@@ -4,6 +4,24 @@
 from SemanticAnalyzerF.symbol_table import SymbolTable, Symbol
 from Parser.ast_nodes import *
 
+BUILTINS = ('print', 'list', 'length', 'scan')
+
+
+def symbol_count(node):
+    """One more than the highest NameTable id used in a tree, for a Program without its names"""
+    highest = -1
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+        elif isinstance(current, ASTNode):
+            symbol_id = getattr(current, 'symbol_id', None)
+            if symbol_id is not None and symbol_id > highest:
+                highest = symbol_id
+            stack.extend(value for value in vars(current).values() if isinstance(value, (ASTNode, list)))
+    return highest + 1
+
 class SemanticAnalyzer:
     """Performs semantic analysis on the AST"""
     
@@ -42,33 +60,45 @@ class SemanticAnalyzer:
 
     def visit_Program(self, node):
         """Visit the program node - first pass to collect function declarations"""
+        size = len(node.names) if node.names is not None else symbol_count(node)
+        self.symbol_table = SymbolTable(size)
         for func in node.functions:
-            if not self.symbol_table.lookup_current_scope(func.name):
-                params = [(p.name, p.param_type) for p in func.params]
-                symbol = Symbol(func.name, 'function', params=params, return_type=func.return_type, line=func.line)
-                self.symbol_table.insert(func.name, symbol)
+            self.declare_function(func)
         
         for func in node.functions:
             self.visit_Function(func)
+
+    def declare_function(self, func):
+        """Enter a top-level function's signature, unless the name is taken already"""
+        if not self.symbol_table.lookup_current_scope(func.symbol_id):
+            params = [(p.name, p.param_type) for p in func.params]
+            symbol = Symbol(func.name, 'function', params=params, return_type=func.return_type, line=func.line)
+            self.symbol_table.insert(func.symbol_id, symbol)
+
+    def lookup_function(self, symbol_id):
+        """The symbol a call refers to, or None"""
+        return self.symbol_table.lookup(symbol_id)
+
+    def check(self, check, *args):
+        """Run a check on expression types; StreamingAnalyzer may postpone it"""
+        check(*args)
             
     def visit_Function(self, node):
         old_function = self.current_function
         self.current_function = node
 
-        func_scope = SymbolTable(self.symbol_table)
-        old_table = self.symbol_table
-        self.symbol_table = func_scope
+        self.symbol_table.enter_scope()
 
         for param in node.params:
             symbol = Symbol(param.name, 'variable', param.param_type, initialized=True, line=param.line)
-            self.symbol_table.insert(param.name, symbol)
+            self.symbol_table.insert(param.symbol_id, symbol)
 
         for stmt in (node.body.statements if hasattr(node.body, 'statements') else 
                     (node.body if isinstance(node.body, list) else [node.body])):
             if isinstance(stmt, Function):
                 params = [(p.name, p.param_type) for p in stmt.params]
                 symbol = Symbol(stmt.name, 'function', params=params, return_type=stmt.return_type, line=stmt.line)
-                self.symbol_table.insert(stmt.name, symbol)
+                self.symbol_table.insert(stmt.symbol_id, symbol)
 
         if hasattr(node.body, 'statements'):
             for stmt in node.body.statements:
@@ -79,24 +109,24 @@ class SemanticAnalyzer:
         else:
             self.visit(node.body)
 
-        self.symbol_table = old_table
+        self.symbol_table.exit_scope()
         self.current_function = old_function
 
 
     def visit_VarDeclaration(self, node):
         """Visit a variable declaration node"""
-        if self.symbol_table.lookup_current_scope(node.name):
+        if self.symbol_table.lookup_current_scope(node.symbol_id):
             self.add_error(f"variable '{node.name}' is already defined", node.line)
         else:
             symbol = Symbol(node.name, 'variable', node.var_type, initialized=False, line=node.line)
-            self.symbol_table.insert(node.name, symbol)
+            self.symbol_table.insert(node.symbol_id, symbol)
 
     def visit_Assignment(self, node):
         """Visit an assignment node"""
         self.visit(node.value)
 
         if isinstance(node.target, str):
-            var_symbol = self.symbol_table.lookup(node.target)
+            var_symbol = self.symbol_table.lookup(node.symbol_id)
             if not var_symbol:
                 self.add_error(f"function '{self.current_function.name}': variable '{node.target}' is not defined", node.line)
                 return
@@ -104,41 +134,48 @@ class SemanticAnalyzer:
             var_symbol.initialized = True
             
             value_type = self.get_expression_type(node.value)
-            if value_type and var_symbol.data_type != value_type:
-                self.add_error(f"function '{self.current_function.name}': variable '{node.target}' expected to be of type '{value_type}' but it is '{var_symbol.data_type}' instead", node.line)
+            self.check(self.check_assignment, self.current_function.name, node.target, var_symbol.data_type,
+                       value_type, node.line)
 
         elif isinstance(node.target, ArrayAccess):
             self.visit(node.target.index)
-            array_symbol = self.symbol_table.lookup(node.target.array)
+            array_symbol = self.symbol_table.lookup(node.target.symbol_id)
             if not array_symbol:
                 self.add_error(f"function '{self.current_function.name}': variable '{node.target.array}' is not defined", node.line)
                 return
             if array_symbol.data_type != 'vector':
                 self.add_error(f"function '{self.current_function.name}': expected '{node.target.array}' to be of type 'vector', but got '{array_symbol.data_type}' instead", node.line)
 
+    def check_assignment(self, function_name, target, var_type, value_type, line):
+        if value_type and var_type != value_type:
+            self.add_error(f"function '{function_name}': variable '{target}' expected to be of type '{value_type}' but it is '{var_type}' instead", line)
+
     def visit_FunctionCall(self, node):
         """Visit a function call node"""
         for arg in node.args:
             self.visit(arg)
 
-        if node.name in ['print', 'list', 'length', 'scan']:
+        if node.name in BUILTINS:
             return self.handle_builtin_function(node)
 
-        func_symbol = self.symbol_table.lookup(node.name)
+        func_symbol = self.lookup_function(node.symbol_id)
+        arg_types = [self.get_expression_type(arg) for arg in node.args]
+        self.check(self.check_call, node.name, func_symbol, arg_types, node.line)
+
+    def check_call(self, name, func_symbol, arg_types, line):
         if not func_symbol:
-            self.add_error(f"function '{node.name}' is not defined", node.line)
+            self.add_error(f"function '{name}' is not defined", line)
             return
 
         expected_params = len(func_symbol.params)
-        actual_args = len(node.args)
+        actual_args = len(arg_types)
         if expected_params != actual_args:
-            self.add_error(f"function '{node.name}': expects {expected_params} arguments but got {actual_args}", node.line)
+            self.add_error(f"function '{name}': expects {expected_params} arguments but got {actual_args}", line)
             return
 
-        for i, (arg, (param_name, param_type)) in enumerate(zip(node.args, func_symbol.params)):
-            arg_type = self.get_expression_type(arg)
+        for arg_type, (param_name, param_type) in zip(arg_types, func_symbol.params):
             if arg_type and arg_type != param_type:
-                self.add_error(f"function '{node.name}': expected '{param_name}' to be of type '{param_type}', but got '{arg_type}' instead", node.line)
+                self.add_error(f"function '{name}': expected '{param_name}' to be of type '{param_type}', but got '{arg_type}' instead", line)
 
     def handle_builtin_function(self, node):
         """Handle built-in functions"""
@@ -163,19 +200,21 @@ class SemanticAnalyzer:
 
         expected_type = self.current_function.return_type
         actual_type = 'null' if node.value is None else self.get_expression_type(node.value)
-        
+        self.check(self.check_return, self.current_function.name, expected_type, actual_type, node.line)
+
+    def check_return(self, function_name, expected_type, actual_type, line):
         if actual_type and expected_type != actual_type:
             self.add_error(
-                f"function '{self.current_function.name}': wrong return type. expected '{expected_type}' but got '{actual_type}'",
-                node.line
+                f"function '{function_name}': wrong return type. expected '{expected_type}' but got '{actual_type}'",
+                line
             )
             
     def visit_For(self, node):
         """Visit a for loop"""
-        var_symbol = self.symbol_table.lookup(node.var)
+        var_symbol = self.symbol_table.lookup(node.symbol_id)
         if not var_symbol:
             symbol = Symbol(node.var, 'variable', 'int', initialized=True, line=node.line)
-            self.symbol_table.insert(node.var, symbol)
+            self.symbol_table.insert(node.symbol_id, symbol)
         else:
             var_symbol.initialized = True
 
@@ -184,9 +223,7 @@ class SemanticAnalyzer:
 
         start_type = self.get_expression_type(node.start)
         end_type = self.get_expression_type(node.end)
-
-        if start_type != 'int' or end_type != 'int':
-            self.add_error(f"function '{self.current_function.name}': loop range must be of type 'int'", node.line)
+        self.check(self.check_range, self.current_function.name, start_type, end_type, node.line)
 
         if hasattr(node.body, 'statements'):
             for stmt in node.body.statements:
@@ -198,9 +235,13 @@ class SemanticAnalyzer:
             self.visit(node.body)
 
 
+    def check_range(self, function_name, start_type, end_type, line):
+        if start_type != 'int' or end_type != 'int':
+            self.add_error(f"function '{function_name}': loop range must be of type 'int'", line)
+
     def visit_Identifier(self, node):
         """Visit an identifier node"""
-        var_symbol = self.symbol_table.lookup(node.name)
+        var_symbol = self.symbol_table.lookup(node.symbol_id)
         if not var_symbol:
             self.add_error(f"function '{self.current_function.name}': variable '{node.name}' is not defined", node.line)
         elif not var_symbol.initialized:
@@ -213,8 +254,11 @@ class SemanticAnalyzer:
         self.visit(node.false_expr)
         
         cond_type = self.get_expression_type(node.condition)
+        self.check(self.check_condition, cond_type, node.line)
+
+    def check_condition(self, cond_type, line):
         if cond_type and cond_type != 'bool':
-            self.add_error(f"ternary operator condition must be boolean, got '{cond_type}'", node.line)
+            self.add_error(f"ternary operator condition must be boolean, got '{cond_type}'", line)
 
     def get_expression_type(self, node):
         """Get the type of an expression"""
@@ -225,7 +269,7 @@ class SemanticAnalyzer:
         elif isinstance(node, Boolean): 
             return 'bool'
         elif isinstance(node, Identifier):
-            symbol = self.symbol_table.lookup(node.name)
+            symbol = self.symbol_table.lookup(node.symbol_id)
             return symbol.data_type if symbol else None
         elif isinstance(node, FunctionCall):
             if node.name == 'list': 
@@ -237,7 +281,7 @@ class SemanticAnalyzer:
             elif node.name == 'scan':
                 return 'int'
             else:
-                func = self.symbol_table.lookup(node.name)
+                func = self.symbol_table.lookup(node.symbol_id)
                 return func.return_type if func else None
         elif isinstance(node, ArrayAccess): 
             return 'int'
@@ -249,4 +293,101 @@ class SemanticAnalyzer:
             t = self.get_expression_type(node.true_expr)
             f = self.get_expression_type(node.false_expr)
             return t if t == f else None
-        return None
\ No newline at end of file
+        return None
+
+class Pending:
+    """A symbol or type that depends on a function defined later in the source"""
+
+    __slots__ = ('resolve',)
+
+    def __init__(self, resolve):
+        self.resolve = resolve
+
+
+def is_pending(value):
+    if isinstance(value, list):
+        return any(isinstance(item, Pending) for item in value)
+    return isinstance(value, Pending)
+
+
+def resolved(value):
+    if isinstance(value, list):
+        return [resolved(item) for item in value]
+    return value.resolve() if isinstance(value, Pending) else value
+
+
+class StreamingAnalyzer(SemanticAnalyzer):
+    """Checks a program one top-level function at a time, as the parser reduces them
+
+    Each function is checked against the signatures of the functions before
+    it. A check that involves a call to a function not seen yet is kept,
+    with the types it compares, in a short deferred list; finish() runs
+    those once every signature is known and puts their errors where the
+    whole-program analysis reports them. Only a name used as a variable
+    before a function of that name is defined is reported differently, as
+    undefined.
+    """
+
+    def __init__(self, names):
+        super().__init__()
+        self.names = names
+        self.deferred = []
+
+    def analyze_function(self, function):
+        """Check one top-level function; returns whether no error has been found so far"""
+        self.symbol_table.grow(len(self.names))
+        self.declare_function(function)
+        self.visit_Function(function)
+        return not self.failed()
+
+    def failed(self):
+        """Whether an error has been found, not counting checks still deferred"""
+        return len(self.errors) > len(self.deferred)
+
+    def lookup_function(self, symbol_id):
+        symbol = self.symbol_table.lookup(symbol_id)
+        if symbol is None:
+            # Top-level functions live in the outermost scope, which is
+            # the only one left open when finish() resolves this
+            table = self.symbol_table
+            return Pending(lambda: table.lookup(symbol_id))
+        return symbol
+
+    def check(self, check, *args):
+        if any(is_pending(arg) for arg in args):
+            self.deferred.append((len(self.errors), check, args))
+            self.errors.append(None)
+        else:
+            check(*args)
+
+    def get_expression_type(self, node):
+        if isinstance(node, FunctionCall) and node.name not in BUILTINS:
+            func = self.lookup_function(node.symbol_id)
+            if isinstance(func, Pending):
+                return Pending(lambda: getattr(func.resolve(), 'return_type', None))
+            return func.return_type
+        if isinstance(node, TernaryOp):
+            t = self.get_expression_type(node.true_expr)
+            f = self.get_expression_type(node.false_expr)
+            if isinstance(t, Pending) or isinstance(f, Pending):
+                return Pending(lambda: resolved(t) if resolved(t) == resolved(f) else None)
+            return t if t == f else None
+        return super().get_expression_type(node)
+
+    def finish(self):
+        """Run the deferred checks and return every error in source order"""
+        found = []
+        errors = self.errors
+        for slot, check, args in self.deferred:
+            self.errors = []
+            check(*[resolved(arg) for arg in args])
+            found.append((slot, self.errors))
+        self.errors = []
+        start = 0
+        for slot, slot_errors in found:
+            self.errors.extend(errors[start:slot])
+            self.errors.extend(slot_errors)
+            start = slot + 1
+        self.errors.extend(errors[start:])
+        self.deferred = []
+        return self.errors
@@ -1,30 +1,52 @@
 """Symbol Table Implementation for TesLang Compiler"""
 
 class SymbolTable:
-    """Symbol table for managing variable and function scopes"""
+    """Symbol table for managing variable and function scopes
+
+    Symbols are indexed by the NameTable ids of their names. Each id holds
+    the innermost visible symbol directly, so a lookup is one list access
+    however deeply scopes nest; exit_scope() puts back what the closing
+    scope's declarations shadowed.
+    """
+    
+    def __init__(self, size=0):
+        self.symbols = [None] * size
+        self.depths = [0] * size
+        self.shadowed = [[]]
+    
+    def grow(self, size):
+        """Make room for ids below size, as the lexer interns new names"""
+        missing = size - len(self.symbols)
+        if missing > 0:
+            self.symbols.extend([None] * missing)
+            self.depths.extend([0] * missing)
     
-    def __init__(self, parent=None):
-        self.symbols = {}
-        self.parent = parent
-        self.children = []
-        if parent:
-            parent.children.append(self)
+    def enter_scope(self):
+        """Open a scope nested in the current one"""
+        self.shadowed.append([])
     
-    def insert(self, name, symbol_info):
+    def exit_scope(self):
+        """Close the current scope, restoring the symbols it shadowed"""
+        symbols, depths = self.symbols, self.depths
+        for symbol_id, symbol_info, depth in reversed(self.shadowed.pop()):
+            symbols[symbol_id] = symbol_info
+            depths[symbol_id] = depth
+    
+    def insert(self, symbol_id, symbol_info):
         """Insert a symbol into the current scope"""
-        self.symbols[name] = symbol_info
+        self.shadowed[-1].append((symbol_id, self.symbols[symbol_id], self.depths[symbol_id]))
+        self.symbols[symbol_id] = symbol_info
+        self.depths[symbol_id] = len(self.shadowed)
     
-    def lookup(self, name):
+    def lookup(self, symbol_id):
         """Look up a symbol in current scope and parent scopes"""
-        if name in self.symbols:
-            return self.symbols[name]
-        elif self.parent:
-            return self.parent.lookup(name)
-        return None
+        return self.symbols[symbol_id]
     
-    def lookup_current_scope(self, name):
+    def lookup_current_scope(self, symbol_id):
         """Look up a symbol only in the current scope"""
-        return self.symbols.get(name)
+        if self.depths[symbol_id] == len(self.shadowed):
+            return self.symbols[symbol_id]
+        return None
 
 class Symbol:
     """Represents a symbol (variable or function) in the symbol table"""
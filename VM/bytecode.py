@@ -0,0 +1,394 @@
+# bytecode.py
+"""Binary TSM: assembler, disassembler and a loader that decodes procs from an mmap on first call"""
+
+import mmap
+import os
+import sys
+
+from IR.linemap import LineMap, encode_varint, decode_varint, zigzag, unzigzag, map_path
+from IR.tsm import parse_program
+from VM.interpreter import (DecodedProc, Program, VMError, decode_proc, BUILTIN_OPCODES, OPCODES,
+                            MOV, MOVI, NE, JMP, JZ, JNZ, CALL, RET, LD, ST, NOP, FALLOFF,
+                            ADDI, BRANCH_OPCODES, IMMEDIATE_OFFSET, JLT, JLTI, JNEI)
+
+MAGIC = b'TSMB'
+VERSION = 1
+HAS_LINES = 1
+
+THREE_REGISTER_OPS = range(2, NE + 1)
+BUILTIN_OPS = frozenset(BUILTIN_OPCODES.values())
+BUILTIN_NAMES = {code: name for name, code in BUILTIN_OPCODES.items()}
+OP_NAMES = {code: name for name, code in OPCODES.items()}
+BRANCH_NAMES = {code: name for name, code in BRANCH_OPCODES.items()}
+BRANCH_NAMES.update({code + IMMEDIATE_OFFSET: name for name, code in BRANCH_OPCODES.items()})
+REGISTER_BRANCHES = range(JLT, JLTI)
+IMMEDIATE_BRANCHES = range(JLTI, JNEI + 1)
+
+
+def jump_targets(code):
+    """Sorted instruction indexes that the jumps of a decoded proc land on"""
+    targets = set()
+    for op, a, b, c in code:
+        if op == JMP:
+            targets.add(a)
+        elif op == JZ or op == JNZ:
+            targets.add(b)
+        elif op in BRANCH_NAMES:
+            targets.add(c)
+    return sorted(targets)
+
+
+def bytecode_path(tsm_path):
+    """Where the binary form of a .tsm file is stored"""
+    root, ext = os.path.splitext(tsm_path)
+    return (root if ext == '.tsm' else tsm_path) + '.tsb'
+
+
+class Assembler:
+    """Encodes decoded procs into the binary format
+
+    The file is the magic bytes, a version byte and a flags byte, then as
+    LEB128 varints: the proc count, the constant pool (every distinct
+    immediate, zigzagged) and one table entry per proc: its name, register
+    count, instruction count and the offset and size of its body. Offsets
+    count from the end of the table, so a proc can be decoded on its own.
+
+    A body starts with the proc's label table, the instruction index of
+    each jump target. Each instruction is its interpreter opcode byte
+    followed by its operands: registers as varints, jump targets as label
+    numbers, immediates as constant pool indexes, and for calls the callee's
+    proc index and the argument count. With HAS_LINES set, the body ends
+    with the source positions of its instructions, delta-encoded as in the
+    .tsm line map.
+    """
+
+    def __init__(self):
+        self.constants = {}
+
+    def constant(self, value):
+        index = self.constants.get(value)
+        if index is None:
+            index = self.constants[value] = len(self.constants)
+        return index
+
+    def encode_body(self, proc, with_lines):
+        out = bytearray()
+        code = proc.code[:-1]  # the FALLOFF sentinel is added back on loading
+        targets = jump_targets(code)
+        label_numbers = {target: i for i, target in enumerate(targets)}
+        encode_varint(len(targets), out)
+        for target in targets:
+            encode_varint(target, out)
+        for op, a, b, c in code:
+            out.append(op)
+            if op == MOV or op == LD or op == ST:
+                encode_varint(a, out)
+                encode_varint(b, out)
+            elif op == MOVI:
+                encode_varint(a, out)
+                encode_varint(self.constant(b), out)
+            elif op in THREE_REGISTER_OPS:
+                encode_varint(a, out)
+                encode_varint(b, out)
+                encode_varint(c, out)
+            elif op == JMP:
+                encode_varint(label_numbers[a], out)
+            elif op == JZ or op == JNZ:
+                encode_varint(a, out)
+                encode_varint(label_numbers[b], out)
+            elif op == ADDI:
+                encode_varint(a, out)
+                encode_varint(b, out)
+                encode_varint(self.constant(c), out)
+            elif op in REGISTER_BRANCHES:
+                encode_varint(a, out)
+                encode_varint(b, out)
+                encode_varint(label_numbers[c], out)
+            elif op in IMMEDIATE_BRANCHES:
+                encode_varint(a, out)
+                encode_varint(self.constant(b), out)
+                encode_varint(label_numbers[c], out)
+            elif op == CALL:
+                encode_varint(a, out)
+                encode_varint(b, out)
+                encode_varint(len(c), out)
+                for arg in c:
+                    encode_varint(arg, out)
+            elif op in BUILTIN_OPS:
+                encode_varint(a, out)
+                encode_varint(0 if b is None else b + 1, out)
+            elif op != RET and op != NOP:
+                raise VMError(f"cannot encode opcode {op}")
+        if with_lines:
+            previous_pc = -1
+            previous_line = 0
+            mapped = [(pc, line, proc.columns[pc]) for pc, line in enumerate(proc.lines[:len(code)]) if line]
+            encode_varint(len(mapped), out)
+            for pc, line, column in mapped:
+                encode_varint(pc - previous_pc - 1, out)
+                encode_varint(zigzag(line - previous_line), out)
+                encode_varint(column or 0, out)
+                previous_pc, previous_line = pc, line
+        return out
+
+    def assemble(self, decoded, with_lines):
+        bodies = [self.encode_body(proc, with_lines) for proc in decoded]
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        out.append(HAS_LINES if with_lines else 0)
+        encode_varint(len(decoded), out)
+        encode_varint(len(self.constants), out)
+        for value in self.constants:
+            encode_varint(zigzag(value), out)
+        offset = 0
+        for proc, body in zip(decoded, bodies):
+            name = proc.name.encode('utf-8')
+            encode_varint(len(name), out)
+            out += name
+            encode_varint(proc.register_count, out)
+            encode_varint(len(proc.code) - 1, out)
+            encode_varint(offset, out)
+            encode_varint(len(body), out)
+            offset += len(body)
+        for body in bodies:
+            out += body
+        return bytes(out)
+
+
+def assemble_procs(procs):
+    """Binary form of a list of IR Procs, with source positions if they carry any"""
+    proc_index = {proc.name: i for i, proc in enumerate(procs)}
+    decoded = [decode_proc(proc, proc_index) for proc in procs]
+    with_lines = any(line for proc in decoded for line in proc.lines)
+    return Assembler().assemble(decoded, with_lines)
+
+
+def assemble(text, line_map=None):
+    """Binary form of TSM text; line_map is the LineMap of its rows, if any"""
+    if line_map is None:
+        return assemble_procs(parse_program(text))
+    rows = text.split('\n')
+    lines, columns = line_map.source_positions(len(rows))
+    return assemble_procs(parse_program(rows, lines, columns))
+
+
+class BytecodeProgram(Program):
+    """A Program over binary TSM, decoding each proc the first time it is called
+
+    Opening one reads only the header, the constant pool and the proc table,
+    so it starts at once however large the program is. data may be bytes or
+    an mmap of a .tsb file.
+    """
+
+    def __init__(self, data):
+        if len(data) < len(MAGIC) + 2 or data[:len(MAGIC)] != MAGIC:
+            raise VMError("not a binary TSM program")
+        if data[len(MAGIC)] != VERSION:
+            raise VMError(f"unsupported binary TSM version {data[len(MAGIC)]}")
+        self.data = data
+        self.with_lines = bool(data[len(MAGIC) + 1] & HAS_LINES)
+        try:
+            count, pos = decode_varint(data, len(MAGIC) + 2)
+            constant_count, pos = decode_varint(data, pos)
+            self.constants = []
+            for _ in range(constant_count):
+                value, pos = decode_varint(data, pos)
+                self.constants.append(unzigzag(value))
+            self.entries = []
+            names = []
+            for _ in range(count):
+                length, pos = decode_varint(data, pos)
+                names.append(bytes(data[pos:pos + length]).decode('utf-8'))
+                pos += length
+                register_count, pos = decode_varint(data, pos)
+                instruction_count, pos = decode_varint(data, pos)
+                offset, pos = decode_varint(data, pos)
+                size, pos = decode_varint(data, pos)
+                self.entries.append((register_count, instruction_count, offset, size))
+        except ValueError as e:
+            raise VMError(f"corrupt binary TSM program: {e}")
+        self.body_start = pos
+        self.names = names
+        self.procs = [None] * count
+        self.index = {name: i for i, name in enumerate(names)}
+
+    def proc(self, name):
+        if name not in self.index:
+            raise VMError(f"procedure {name} not found")
+        return self.load_proc(self.index[name])
+
+    def load_proc(self, i):
+        """The DecodedProc at index i, decoding it on first use"""
+        proc = self.procs[i]
+        if proc is None:
+            try:
+                proc = self.procs[i] = self.decode_proc(i)
+            except (IndexError, ValueError) as e:
+                raise VMError(f"corrupt binary TSM procedure {self.names[i]}: {e}")
+        return proc
+
+    def load_all(self):
+        for i in range(len(self.procs)):
+            self.load_proc(i)
+        return self
+
+    def decode_proc(self, i):
+        register_count, instruction_count, offset, size = self.entries[i]
+        start = self.body_start + offset
+        data = bytes(self.data[start:start + size])
+        constants = self.constants
+        pos = 0
+
+        def varint():
+            nonlocal pos
+            value = data[pos]
+            if value < 0x80:
+                pos += 1
+                return value
+            value, pos = decode_varint(data, pos)
+            return value
+
+        label_count = varint()
+        targets = [varint() for _ in range(label_count)]
+        code = []
+        append = code.append
+        for _ in range(instruction_count):
+            op = data[pos]
+            pos += 1
+            if op == MOV or op == LD or op == ST:
+                append((op, varint(), varint(), None))
+            elif op == MOVI:
+                append((op, varint(), constants[varint()], None))
+            elif op in THREE_REGISTER_OPS:
+                append((op, varint(), varint(), varint()))
+            elif op == JZ or op == JNZ:
+                append((op, varint(), targets[varint()], None))
+            elif op == JMP:
+                append((op, targets[varint()], None, None))
+            elif op == ADDI:
+                append((op, varint(), varint(), constants[varint()]))
+            elif op in REGISTER_BRANCHES:
+                append((op, varint(), varint(), targets[varint()]))
+            elif op in IMMEDIATE_BRANCHES:
+                append((op, varint(), constants[varint()], targets[varint()]))
+            elif op == CALL:
+                callee = varint()
+                dst = varint()
+                append((op, callee, dst, tuple(varint() for _ in range(varint()))))
+            elif op in BUILTIN_OPS:
+                a = varint()
+                b = varint()
+                append((op, a, b - 1 if b else None, None))
+            elif op == RET or op == NOP:
+                append((op, None, None, None))
+            else:
+                raise VMError(f"instruction {op} unknown")
+        code.append((FALLOFF, None, None, None))
+
+        lines = [None] * len(code)
+        columns = [None] * len(code)
+        if self.with_lines:
+            pc = -1
+            line = 0
+            for _ in range(varint()):
+                pc += varint() + 1
+                line += unzigzag(varint())
+                lines[pc] = line
+                columns[pc] = varint() or None
+        return DecodedProc(self.names[i], code, register_count, None, lines, columns)
+
+
+def load_bytecode(path):
+    """Open a .tsb file as a BytecodeProgram, reading procs from an mmap as they are called"""
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped
+            data = f.read()
+    return BytecodeProgram(data)
+
+
+def disassemble(data):
+    """TSM text of a binary program, with labels named after their numbers"""
+    program = BytecodeProgram(data).load_all()
+    lines = []
+    for proc in program.procs:
+        targets = jump_targets(proc.code)
+        labels = {target: f"L{i}" for i, target in enumerate(targets)}
+        lines.append(f"proc {proc.name}")
+        for pc, (op, a, b, c) in enumerate(proc.code[:-1]):
+            if pc in labels:
+                lines.append(f"{labels[pc]}:")
+            lines.append(instruction_text(program, labels, op, a, b, c))
+        if len(proc.code) - 1 in labels:
+            lines.append(f"{labels[len(proc.code) - 1]}:")
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def instruction_text(program, labels, op, a, b, c):
+    if op == MOV:
+        return f"mov r{a}, r{b}"
+    if op == MOVI:
+        return f"mov r{a}, {b}"
+    if op == JMP:
+        return f"jmp {labels[a]}"
+    if op == JZ or op == JNZ:
+        return f"{'jz' if op == JZ else 'jnz'} r{a}, {labels[b]}"
+    if op == ADDI:
+        return f"add r{a}, r{b}, {c}"
+    if op in REGISTER_BRANCHES:
+        return f"{BRANCH_NAMES[op]} r{a}, r{b}, {labels[c]}"
+    if op in IMMEDIATE_BRANCHES:
+        return f"{BRANCH_NAMES[op]} r{a}, {b}, {labels[c]}"
+    if op == CALL:
+        return f"call {', '.join([program.names[a], f'r{b}'] + [f'r{arg}' for arg in c])}"
+    if op in BUILTIN_OPS:
+        regs = [f"r{a}"] + ([f"r{b}"] if b is not None else [])
+        return f"call {BUILTIN_NAMES[op]}, {', '.join(regs)}"
+    if op == RET or op == NOP:
+        return OP_NAMES[op]
+    return f"{OP_NAMES[op]} {', '.join(f'r{reg}' for reg in (a, b, c) if reg is not None)}"
+
+
+def main(argv=None):
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="Assemble, disassemble or run binary TSM")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    asm = commands.add_parser("asm", help="assemble a .tsm file, with its line map if present")
+    asm.add_argument("tsm_file")
+    asm.add_argument("-o", "--output", help="binary file to write (default: the .tsm name with .tsb)")
+    dis = commands.add_parser("dis", help="print a .tsb file as TSM text")
+    dis.add_argument("tsb_file")
+    run = commands.add_parser("run", help="run a .tsb file on the interpreter")
+    run.add_argument("tsb_file")
+    run.add_argument("-s", "--stats", action="store_true", help="print program statistics")
+    args = arg_parser.parse_args(argv)
+
+    from VM.interpreter import run_program
+    try:
+        if args.command == "asm":
+            with open(args.tsm_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+            line_map = LineMap.read(map_path(args.tsm_file)) if os.path.exists(map_path(args.tsm_file)) else None
+            output = args.output or bytecode_path(args.tsm_file)
+            data = assemble(text, line_map)
+            with open(output, 'wb') as f:
+                f.write(data)
+            print(f"{output}: {len(data)} bytes ({len(text.encode('utf-8'))} bytes of text)", file=sys.stderr)
+        elif args.command == "dis":
+            with open(args.tsb_file, 'rb') as f:
+                print(disassemble(f.read()))
+        else:
+            result = run_program(load_bytecode(args.tsb_file))
+            if args.stats:
+                print(result.report(), file=sys.stderr)
+    except (OSError, VMError) as e:
+        print(f"tsvm: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+# interpreter.py
+"""Pure-Python virtual machine for TSM code"""
+
+import os
+import sys
+import time
+
+from IR.tsm import parse_program, is_register, register_number
+from IR.linemap import LineMap, map_path
+
+# Opcodes of the decoded instruction array
+MOV, MOVI, ADD, SUB, MUL, DIV, MOD = range(7)
+LT, GT, LE, GE, EQ, NE = range(7, 13)
+JMP, JZ, JNZ, CALL, RET, LD, ST, NOP = range(13, 21)
+IPUT, IGET, MEM, REL = range(21, 25)
+FALLOFF, ABORT = 25, 26
+# Superinstructions, chosen by IR/superinstr.py: add-immediate and fused
+# compare-and-branch against a register or an immediate
+ADDI = 27
+JLT, JGT, JLE, JGE, JEQ, JNE = range(28, 34)
+JLTI, JGTI, JLEI, JGEI, JEQI, JNEI = range(34, 40)
+
+OPCODES = {
+    'add': ADD, 'sub': SUB, 'mul': MUL, 'div': DIV, 'mod': MOD,
+    'cmp<': LT, 'cmp>': GT, 'cmp<=': LE, 'cmp>=': GE, 'cmp==': EQ, 'cmp!=': NE,
+    'ld': LD, 'st': ST, 'nop': NOP, 'ret': RET,
+}
+BUILTIN_OPCODES = {'iput': IPUT, 'iget': IGET, 'mem': MEM, 'rel': REL, 'abort': ABORT}
+BRANCH_OPCODES = {'jlt': JLT, 'jgt': JGT, 'jle': JLE, 'jge': JGE, 'jeq': JEQ, 'jne': JNE}
+IMMEDIATE_OFFSET = JLTI - JLT
+OPCODE_NAMES = {MOV: 'mov', MOVI: 'mov', JMP: 'jmp', JZ: 'jz', JNZ: 'jnz', CALL: 'call'}
+OPCODE_NAMES.update({code: name for name, code in OPCODES.items()})
+OPCODE_NAMES.update({code: f"call {name}" for name, code in BUILTIN_OPCODES.items()})
+OPCODE_NAMES.update({code: name for name, code in BRANCH_OPCODES.items()})
+OPCODE_NAMES.update({code + IMMEDIATE_OFFSET: name for name, code in BRANCH_OPCODES.items()})
+OPCODE_NAMES[ADDI] = 'add'
+
+ENTRY_PROC = 'main'
+
+
+class VMError(Exception):
+    """Raised when a TSM program cannot be loaded or fails at run time"""
+
+
+def c_div(a, b):
+    """Integer division truncating toward zero, as the C VM does"""
+    if b == 0:
+        raise VMError("division by zero")
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def c_mod(a, b):
+    if b == 0:
+        raise VMError("division by zero")
+    return a - b * c_div(a, b)
+
+
+class DecodedProc:
+    """A procedure pre-decoded into a tuple array with resolved labels"""
+
+    def __init__(self, name, code, register_count, source=None, lines=None, columns=None):
+        self.name = name
+        self.code = code
+        self.register_count = register_count
+        self.source = source or []
+        self.lines = lines or []
+        self.columns = columns or []
+        self.labels = {}
+
+    def where(self, pc):
+        """' at line L:C' for the instruction at pc, or '' without a source position"""
+        line = self.lines[pc] if pc < len(self.lines) else None
+        if not line:
+            return ''
+        column = self.columns[pc] if pc < len(self.columns) else None
+        return f" at line {line}:{column}" if column else f" at line {line}"
+
+
+class Program:
+    """A loaded TSM program: decoded procedures addressed by index
+
+    A subclass may leave entries of procs None until load_proc(i) is
+    called, as VM.bytecode.BytecodeProgram does.
+    """
+
+    def __init__(self, procs):
+        self.procs = procs
+        self.index = {proc.name: i for i, proc in enumerate(procs)}
+
+    def proc(self, name):
+        if name not in self.index:
+            raise VMError(f"procedure {name} not found")
+        return self.procs[self.index[name]]
+
+
+def decode_proc(proc, proc_index):
+    """Translate one IR Proc into a DecodedProc"""
+    labels = {}
+    pos = 0
+    for instr in proc.body:
+        if instr.is_label:
+            if instr.args[0] in labels:
+                raise VMError(f"label {instr.args[0]} redefined")
+            labels[instr.args[0]] = pos
+        elif not instr.is_comment:
+            pos += 1
+
+    def reg(operand):
+        if not is_register(operand):
+            raise VMError(f"bad register identifier {operand} in {proc.name}")
+        return register_number(operand)
+
+    def label(name):
+        if name not in labels:
+            raise VMError(f"label {name} not found")
+        return labels[name]
+
+    code = []
+    source = []
+    lines = []
+    columns = []
+    max_reg = 0
+    for instr in proc.body:
+        if instr.is_label or instr.is_comment:
+            continue
+        op, args = instr.op, instr.args
+        if op == 'mov':
+            if is_register(args[1]):
+                decoded = (MOV, reg(args[0]), reg(args[1]), None)
+            else:
+                decoded = (MOVI, reg(args[0]), int(args[1]), None)
+        elif op == 'jmp':
+            decoded = (JMP, label(args[0]), None, None)
+        elif op == 'jz' or op == 'jnz':
+            decoded = (JZ if op == 'jz' else JNZ, reg(args[0]), label(args[1]), None)
+        elif op in BRANCH_OPCODES:
+            if is_register(args[1]):
+                decoded = (BRANCH_OPCODES[op], reg(args[0]), reg(args[1]), label(args[2]))
+            else:
+                decoded = (BRANCH_OPCODES[op] + IMMEDIATE_OFFSET, reg(args[0]), int(args[1]), label(args[2]))
+        elif (op == 'add' or op == 'sub') and len(args) == 3 and not is_register(args[2]):
+            value = int(args[2])
+            decoded = (ADDI, reg(args[0]), reg(args[1]), value if op == 'add' else -value)
+        elif op == 'call':
+            name = args[0]
+            regs = [reg(a) for a in args[1:]]
+            if name in BUILTIN_OPCODES:
+                if name == 'mem' and len(regs) == 1:
+                    regs = regs * 2
+                decoded = (BUILTIN_OPCODES[name], regs[0] if regs else 0, regs[1] if len(regs) > 1 else None, None)
+            else:
+                if name not in proc_index:
+                    raise VMError(f"procedure {name} not found")
+                dst = regs[0] if regs else 0
+                decoded = (CALL, proc_index[name], dst, tuple(regs[1:]))
+        elif op == 'ret' or op == 'nop':
+            decoded = (OPCODES[op], None, None, None)
+        elif op in OPCODES:
+            decoded = (OPCODES[op],) + tuple(reg(a) for a in args) + (None,) * (3 - len(args))
+        else:
+            raise VMError(f"instruction {op} unknown")
+        for operand in args:
+            if is_register(operand):
+                max_reg = max(max_reg, register_number(operand))
+        code.append(decoded)
+        source.append(str(instr))
+        lines.append(instr.line)
+        columns.append(instr.column)
+    code.append((FALLOFF, None, None, None))
+    source.append("")
+    lines.append(None)
+    columns.append(None)
+
+    decoded_proc = DecodedProc(proc.name, code, max_reg + 1, source, lines, columns)
+    decoded_proc.labels = labels
+    return decoded_proc
+
+
+def load_procs(procs):
+    """Load an in-memory list of IR Procs"""
+    proc_index = {proc.name: i for i, proc in enumerate(procs)}
+    return Program([decode_proc(proc, proc_index) for proc in procs])
+
+
+def load(text):
+    """Load a program from TSM text"""
+    return load_procs(parse_program(text))
+
+
+def load_file(path):
+    """Load a .tsm file, with source positions when its line map is next to it
+
+    A binary TSM file is opened with VM.bytecode.load_bytecode instead.
+    """
+    with open(path, 'rb') as f:
+        binary = f.read(4) == b'TSMB'
+    if binary:
+        from VM.bytecode import load_bytecode
+        return load_bytecode(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if not os.path.exists(map_path(path)):
+        return load(text)
+    rows = text.split('\n')
+    lines, columns = LineMap.read(map_path(path)).source_positions(len(rows))
+    return load_procs(parse_program(rows, lines, columns))
+
+
+class RunResult:
+    """Outcome and counters of one program run"""
+
+    def __init__(self, return_value, instructions, calls, max_depth, elapsed):
+        self.return_value = return_value
+        self.instructions = instructions
+        self.calls = calls
+        self.max_depth = max_depth
+        self.elapsed = elapsed
+
+    def report(self):
+        rate = self.instructions / self.elapsed if self.elapsed > 0 else 0
+        return (f"instructions: {self.instructions}  calls: {self.calls}  "
+                f"max depth: {self.max_depth}  time: {self.elapsed * 1000:.2f} ms  "
+                f"({rate / 1e6:.2f} M instr/s)")
+
+
+class Machine:
+    """Executes a loaded Program with a switch-style dispatch loop
+
+    The `# @name` comments in execute mark where instrumented_execute
+    inserts the hooks of a machine that observes the run.
+    """
+
+    def __init__(self, program, input_stream=None, output_stream=None):
+        self.program = program
+        self.input_stream = input_stream if input_stream is not None else sys.stdin
+        self.output_stream = output_stream if output_stream is not None else sys.stdout
+        self.memory = [0]
+        self.pending_input = []
+        self.output = []
+
+    def read_int(self):
+        while not self.pending_input:
+            self.flush()
+            line = self.input_stream.readline()
+            if not line:
+                raise VMError("iget: end of input")
+            self.pending_input = line.split()[::-1]
+        return int(self.pending_input.pop())
+
+    def write_int(self, value):
+        self.output.append(f"{value}\n")
+        if len(self.output) >= 4096:
+            self.flush()
+
+    def flush(self):
+        if self.output:
+            self.output_stream.write(''.join(self.output))
+            self.output = []
+
+    def allocate(self, size):
+        if size < 0:
+            raise VMError(f"failed to allocate {size} words")
+        base = len(self.memory)
+        self.memory.extend([0] * size)
+        return base
+
+    def run(self, entry=ENTRY_PROC, args=()):
+        """Run a procedure to completion and return a RunResult"""
+        start = time.perf_counter()
+        try:
+            value, count, calls, depth = self.execute(self.program.proc(entry), args)
+        finally:
+            self.flush()
+        return RunResult(value, count, calls, depth, time.perf_counter() - start)
+
+    def execute(self, proc, args):
+        procs = self.program.procs
+        memory = self.memory
+        code = proc.code
+        regs = [0] * proc.register_count
+        regs[1:len(args) + 1] = args
+        stack = []
+        pc = 0
+        count = 0
+        calls = 0
+        max_depth = 0
+        current = proc
+        # @enter
+
+        while True:
+            op, a, b, c = code[pc]
+            # @step
+            pc += 1
+            count += 1
+            if op == 0:    # MOV
+                regs[a] = regs[b]
+            elif op == 1:  # MOVI
+                regs[a] = b
+            elif op == 2:  # ADD
+                regs[a] = regs[b] + regs[c]
+            elif op == 3:  # SUB
+                regs[a] = regs[b] - regs[c]
+            elif op == 7:  # LT
+                regs[a] = 1 if regs[b] < regs[c] else 0
+            elif op == 14:  # JZ
+                if not regs[a]:
+                    pc = b
+            elif op == 13:  # JMP
+                pc = a
+            elif op == 15:  # JNZ
+                if regs[a]:
+                    pc = b
+            # Superinstructions, most frequent first, come after the hot base
+            # opcodes so that those do not pay for the range test
+            elif op >= 27:
+                if op == 27:  # ADDI
+                    regs[a] = regs[b] + c
+                elif op == 37:  # JGEI
+                    if regs[a] >= b:
+                        pc = c
+                elif op == 31:  # JGE
+                    if regs[a] >= regs[b]:
+                        pc = c
+                elif op == 34:  # JLTI
+                    if regs[a] < b:
+                        pc = c
+                elif op == 28:  # JLT
+                    if regs[a] < regs[b]:
+                        pc = c
+                elif op == 36:  # JLEI
+                    if regs[a] <= b:
+                        pc = c
+                elif op == 30:  # JLE
+                    if regs[a] <= regs[b]:
+                        pc = c
+                elif op == 35:  # JGTI
+                    if regs[a] > b:
+                        pc = c
+                elif op == 29:  # JGT
+                    if regs[a] > regs[b]:
+                        pc = c
+                elif op == 39:  # JNEI
+                    if regs[a] != b:
+                        pc = c
+                elif op == 33:  # JNE
+                    if regs[a] != regs[b]:
+                        pc = c
+                elif op == 38:  # JEQI
+                    if regs[a] == b:
+                        pc = c
+                elif op == 32:  # JEQ
+                    if regs[a] == regs[b]:
+                        pc = c
+                else:
+                    raise VMError(f"instruction {OPCODE_NAMES.get(op, op)} unknown")
+            elif op == 4:  # MUL
+                regs[a] = regs[b] * regs[c]
+            elif op == 8:  # GT
+                regs[a] = 1 if regs[b] > regs[c] else 0
+            elif op == 9:  # LE
+                regs[a] = 1 if regs[b] <= regs[c] else 0
+            elif op == 10:  # GE
+                regs[a] = 1 if regs[b] >= regs[c] else 0
+            elif op == 11:  # EQ
+                regs[a] = 1 if regs[b] == regs[c] else 0
+            elif op == 12:  # NE
+                regs[a] = 1 if regs[b] != regs[c] else 0
+            elif op == 18:  # LD
+                address = regs[b]
+                if not 0 < address < len(memory):
+                    raise VMError(f"bad memory address {address} in {current.name}{current.where(pc - 1)}")
+                regs[a] = memory[address]
+            elif op == 19:  # ST
+                address = regs[b]
+                if not 0 < address < len(memory):
+                    raise VMError(f"bad memory address {address} in {current.name}{current.where(pc - 1)}")
+                memory[address] = regs[a]
+            elif op == 16:  # CALL
+                callee = procs[a]
+                if callee is None:
+                    callee = self.program.load_proc(a)
+                new_regs = [0] * callee.register_count
+                for i, arg in enumerate(c):
+                    new_regs[i + 1] = regs[arg]
+                stack.append((current, code, pc, regs, b))
+                calls += 1
+                if len(stack) > max_depth:
+                    max_depth = len(stack)
+                current, code, pc, regs = callee, callee.code, 0, new_regs
+                # @call
+            elif op == 17:  # RET
+                value = regs[0]
+                # @ret
+                if not stack:
+                    return value, count, calls, max_depth
+                current, code, pc, regs, dst = stack.pop()
+                regs[dst] = value
+            elif op == 5:  # DIV
+                regs[a] = c_div(regs[b], regs[c])
+            elif op == 6:  # MOD
+                regs[a] = c_mod(regs[b], regs[c])
+            elif op == 21:  # IPUT
+                self.write_int(regs[a])
+            elif op == 22:  # IGET
+                regs[a] = self.read_int()
+            elif op == 23:  # MEM
+                regs[a] = self.allocate(regs[b])
+            elif op == 24 or op == 20:  # REL, NOP
+                pass
+            elif op == 25:  # FALLOFF
+                raise VMError(f"leaving {current.name} without a ret{current.where(pc - 2)}")
+            elif op == 26:  # ABORT
+                raise VMError(f"{current.name} aborted at line {regs[a]}")
+
+            else:
+                raise VMError(f"instruction {OPCODE_NAMES.get(op, op)} unknown")
+
+
+def instrumented_execute(hooks):
+    """Machine.execute with the lines of hooks[name] inserted at its `# @name` markers
+
+    The markers are plain comments, so the uninstrumented loop pays nothing
+    for them.
+    """
+    import inspect
+    import textwrap
+    lines = []
+    for line in textwrap.dedent(inspect.getsource(Machine.execute)).split('\n'):
+        marker = line.strip()
+        if marker.startswith('# @'):
+            indent = line[:len(line) - len(line.lstrip())]
+            lines.extend(indent + hook for hook in hooks.get(marker[3:], ()))
+        else:
+            lines.append(line)
+    namespace = dict(globals())
+    exec(compile('\n'.join(lines), f"<instrumented {__name__}>", 'exec'), namespace)
+    return namespace['execute']
+
+
+def run_program(program, input_stream=None, output_stream=None, entry=ENTRY_PROC):
+    """Run a loaded Program and return its RunResult"""
+    return Machine(program, input_stream, output_stream).run(entry)
+
+
+def run_text(text, input_stream=None, output_stream=None):
+    return run_program(load(text), input_stream, output_stream)
+
+
+def main(argv=None):
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="Run a TSM program")
+    arg_parser.add_argument("tsm_file")
+    arg_parser.add_argument("-s", "--stats", action="store_true", help="print program statistics")
+    args = arg_parser.parse_args(argv)
+    try:
+        result = run_program(load_file(args.tsm_file))
+    except VMError as e:
+        print(f"tsvm: {e}", file=sys.stderr)
+        return 1
+    if args.stats:
+        print(result.report(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
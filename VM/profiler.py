@@ -0,0 +1,200 @@
+# profiler.py
+"""Profiling mode for the TSM interpreter: hot instructions, blocks, procs and source lines"""
+
+import sys
+import time
+
+from VM.interpreter import (Machine, VMError, load_procs, instrumented_execute, ENTRY_PROC,
+                            BRANCH_OPCODES, IMMEDIATE_OFFSET, JMP, JZ, JNZ, RET)
+
+# Opcodes that end a basic block: jumps, fused compare-and-branches and ret
+BLOCK_ENDS = {JMP, JZ, JNZ, RET} | set(BRANCH_OPCODES.values())
+BLOCK_ENDS |= {code + IMMEDIATE_OFFSET for code in BRANCH_OPCODES.values()}
+
+
+class ProcProfile:
+    """Counters of one procedure"""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.counts = [0] * len(proc.code)
+        self.calls = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+
+    @property
+    def instructions(self):
+        return sum(self.counts)
+
+
+class ProfilingMachine(Machine):
+    """Machine that counts every executed instruction and times every call"""
+
+    def __init__(self, program, input_stream=None, output_stream=None):
+        super().__init__(program, input_stream, output_stream)
+        self.profiles = [ProcProfile(proc) for proc in program.procs]
+        self.frames = []
+        self.frame = None
+
+    def enter(self, index):
+        """Start timing a call of procs[index] and return its instruction counters"""
+        if self.frame is not None:
+            self.frames.append(self.frame)
+        profile = self.profiles[index]
+        profile.calls += 1
+        self.frame = [profile, time.perf_counter(), 0.0]
+        return profile.counts
+
+    def leave(self):
+        """Stop timing the current call and return the caller's instruction counters"""
+        profile, started, child_time = self.frame
+        elapsed = time.perf_counter() - started
+        profile.inclusive += elapsed
+        profile.exclusive += elapsed - child_time
+        if not self.frames:
+            self.frame = None
+            return profile.counts
+        self.frame = self.frames.pop()
+        self.frame[2] += elapsed
+        return self.frame[0].counts
+
+    execute = instrumented_execute({
+        'enter': ["counts = self.enter(self.program.index[proc.name])"],
+        'step': ["counts[pc] += 1"],
+        'call': ["counts = self.enter(a)"],
+        'ret': ["counts = self.leave()"],
+    })
+
+    def report(self, source=None, top=10):
+        """Text report: procedures, blocks, hot instructions and annotated source"""
+        return ProfileReport(self.profiles, source).render(top)
+
+
+class ProfileReport:
+    """Formats the counters gathered by a ProfilingMachine"""
+
+    def __init__(self, profiles, source=None):
+        self.profiles = profiles
+        self.source = source
+        self.total = sum(profile.instructions for profile in profiles) or 1
+
+    def render(self, top=10):
+        sections = [self.procs_table(), self.blocks_table(top), self.hot_instructions(top)]
+        if self.source is not None:
+            sections.append(self.annotated_source())
+        return '\n\n'.join(sections)
+
+    def share(self, count):
+        return count / self.total * 100
+
+    def procs_table(self):
+        lines = ["Procedures:",
+                 f"{'proc':<20} | {'calls':>8} | {'instructions':>12} | {'%':>5} | {'incl ms':>9} | {'excl ms':>9}"]
+        for profile in sorted(self.profiles, key=lambda p: p.exclusive, reverse=True):
+            if not profile.calls:
+                continue
+            lines.append(f"{profile.proc.name:<20} | {profile.calls:>8} | {profile.instructions:>12} | "
+                         f"{self.share(profile.instructions):>5.1f} | {profile.inclusive * 1000:>9.2f} | "
+                         f"{profile.exclusive * 1000:>9.2f}")
+        return '\n'.join(lines)
+
+    def blocks(self):
+        """(proc, label, entry count, instructions executed in the block) for every basic block"""
+        result = []
+        for profile in self.profiles:
+            proc = profile.proc
+            names = {}
+            for label, pc in proc.labels.items():
+                names.setdefault(pc, label)
+            leaders = {0} | set(names)
+            for pc, (op, a, b, c) in enumerate(proc.code):
+                if op in BLOCK_ENDS:
+                    leaders.add(pc + 1)
+            ordered = sorted(pc for pc in leaders if pc < len(proc.code))
+            for i, start in enumerate(ordered):
+                end = ordered[i + 1] if i + 1 < len(ordered) else len(proc.code)
+                executed = sum(profile.counts[start:end])
+                if executed:
+                    result.append((proc.name, names.get(start, f"+{start}"), profile.counts[start], executed))
+        return result
+
+    def blocks_table(self, top):
+        lines = [f"Hot blocks (top {top}):",
+                 f"{'proc':<20} | {'block':<24} | {'entries':>10} | {'instructions':>12} | {'%':>5}"]
+        for name, label, entries, executed in sorted(self.blocks(), key=lambda b: b[3], reverse=True)[:top]:
+            lines.append(f"{name:<20} | {label:<24} | {entries:>10} | {executed:>12} | {self.share(executed):>5.1f}")
+        return '\n'.join(lines)
+
+    def hot_instructions(self, top):
+        entries = []
+        for profile in self.profiles:
+            for pc, executed in enumerate(profile.counts):
+                if executed:
+                    entries.append((executed, profile.proc, pc))
+        entries.sort(key=lambda e: e[0], reverse=True)
+        lines = [f"Hot instructions (top {top}):",
+                 f"{'count':>10} | {'%':>5} | {'line':>5} | instruction"]
+        for executed, proc, pc in entries[:top]:
+            line = proc.lines[pc] if pc < len(proc.lines) and proc.lines[pc] else '-'
+            text = proc.source[pc] if pc < len(proc.source) else ''
+            lines.append(f"{executed:>10} | {self.share(executed):>5.1f} | {line:>5} | {proc.name}: {text}")
+        return '\n'.join(lines)
+
+    def line_counts(self):
+        counts = {}
+        for profile in self.profiles:
+            for pc, executed in enumerate(profile.counts):
+                line = profile.proc.lines[pc] if pc < len(profile.proc.lines) else None
+                if executed and line:
+                    counts[line] = counts.get(line, 0) + executed
+        return counts
+
+    def annotated_source(self):
+        counts = self.line_counts()
+        lines = ["Annotated source:", f"{'count':>10} | {'%':>5} | {'line':>5} | source"]
+        for number, text in enumerate(self.source.splitlines(), 1):
+            executed = counts.get(number)
+            if executed:
+                lines.append(f"{executed:>10} | {self.share(executed):>5.1f} | {number:>5} | {text}")
+            else:
+                lines.append(f"{'':>10} | {'':>5} | {number:>5} | {text}")
+        return '\n'.join(lines)
+
+
+def profile_procs(procs, input_stream=None, output_stream=None, entry=ENTRY_PROC):
+    """Run IR Procs under the profiler; returns (RunResult, ProfilingMachine)"""
+    machine = ProfilingMachine(load_procs(procs), input_stream, output_stream)
+    return machine.run(entry), machine
+
+
+def main(argv=None):
+    import argparse
+    from Driver.pipeline import lex, parse, analyze
+    from IR.codegen import generate_procs
+
+    arg_parser = argparse.ArgumentParser(description="Profile a TesLang program on the TSM interpreter")
+    arg_parser.add_argument("input_file", help="TesLang source file")
+    arg_parser.add_argument("-O", "--optimize", action="store_true", help="optimize generated code")
+    arg_parser.add_argument("--top", type=int, default=10, help="rows in the hot block and instruction tables")
+    args = arg_parser.parse_args(argv)
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        source = f.read()
+    ast, errors = parse(lex(source), source)
+    errors = errors or (analyze(ast) if ast else ["Syntax error: empty program"])
+    if errors:
+        for error in errors:
+            print(error, file=sys.stderr)
+        return 1
+    try:
+        result, machine = profile_procs(generate_procs(ast, args.optimize))
+    except VMError as e:
+        print(f"tsvm: {e}", file=sys.stderr)
+        return 1
+    print(result.report(), file=sys.stderr)
+    print(machine.report(source, args.top), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
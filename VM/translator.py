@@ -0,0 +1,449 @@
+# translator.py
+"""Ahead-of-time translation of TSM procedures into Python functions"""
+
+import sys
+import time
+
+from IR.tsm import parse_program, BUILTINS
+from IR.cfg import CFG, compute_dominators, find_loops
+from VM.interpreter import VMError, RunResult, c_div, c_mod, ENTRY_PROC
+
+BINARY_OPS = {'add': '+', 'sub': '-', 'mul': '*'}
+COMPARE_OPS = {'cmp<': '<', 'cmp>': '>', 'cmp<=': '<=', 'cmp>=': '>=', 'cmp==': '==', 'cmp!=': '!='}
+INVERSE = {'<': '>=', '>': '<=', '<=': '>', '>=': '<', '==': '!=', '!=': '=='}
+BRANCH_OPS = {'jlt': '<', 'jgt': '>', 'jle': '<=', 'jge': '>=', 'jeq': '==', 'jne': '!='}
+RECURSION_LIMIT = 20000
+
+
+class StructureError(Exception):
+    """Raised when a procedure's control flow cannot be written as nested loops and ifs"""
+
+
+class LoopContext:
+    """A natural loop being emitted as `while True`"""
+
+    def __init__(self, header, exit):
+        self.header = header
+        self.exit = exit
+        self.flag = f"exit{header}"
+        self.far_exit = None
+
+
+def proc_function_name(name):
+    return f"proc_{name}"
+
+
+class ProcTranslator:
+    """Generates the Python source of one procedure"""
+
+    def __init__(self, proc, param_count):
+        self.proc = proc
+        self.param_count = param_count
+        self.cfg = CFG(proc)
+        self.blocks = self.cfg.blocks
+        self.structured = True
+        self.live = set(self.cfg.reverse_postorder())
+        idom = compute_dominators(self.cfg)
+        self.loop_ranges = {}
+        self.loop_headers = []
+        for loop in find_loops(self.cfg, idom):
+            self.loop_headers.append(loop.header.index)
+            indices = sorted(block.index for block in loop.blocks)
+            if indices[0] == loop.header.index:
+                self.loop_ranges[loop.header.index] = indices[-1] + 1
+        self.fused = {}
+        self.find_fused_branches()
+
+    def find_fused_branches(self):
+        """Fold `cmp t, a, b` into the following jz/jnz when t is read nowhere else"""
+        use_counts = {}
+        for instr in self.proc.body:
+            for reg in instr.uses():
+                use_counts[reg] = use_counts.get(reg, 0) + 1
+        for block in self.blocks:
+            code = [i for i in block.instrs if not i.is_label and not i.is_comment]
+            if len(code) < 2:
+                continue
+            compare, branch = code[-2], code[-1]
+            if (branch.op in ('jz', 'jnz') and compare.op in COMPARE_OPS
+                    and compare.args[0] == branch.args[0] and use_counts.get(branch.args[0]) == 1):
+                a, b = compare.args[1], compare.args[2]
+                true_test = f"{a} {COMPARE_OPS[compare.op]} {b}"
+                false_test = f"{a} {INVERSE[COMPARE_OPS[compare.op]]} {b}"
+                self.fused[compare] = None
+                self.fused[branch] = (false_test, true_test) if branch.op == 'jz' else (true_test, false_test)
+
+    def branch_tests(self, control):
+        """Python tests for a conditional jump being taken and being skipped"""
+        if control in self.fused:
+            return self.fused[control]
+        if control.op in BRANCH_OPS:
+            a, b = control.args[0], control.args[1]
+            test = BRANCH_OPS[control.op]
+            return f"{a} {test} {b}", f"{a} {INVERSE[test]} {b}"
+        cond = control.args[0]
+        if control.op == 'jz':
+            return f"not {cond}", cond
+        return cond, f"not {cond}"
+
+    def translate(self):
+        regs = sorted(self.proc.registers() | {'r0'}, key=lambda r: int(r[1:]))
+        params = [f"r{i}" for i in range(1, self.param_count + 1)]
+        locals_ = [r for r in regs if r not in params]
+        lines = [f"def {proc_function_name(self.proc.name)}({', '.join(p + '=0' for p in params)}):"]
+        lines.append(f"    {' = '.join(locals_)} = 0")
+        try:
+            body = self.structured_body()
+        except StructureError:
+            self.structured = False
+            body = self.dispatch_body()
+        lines.extend("    " + line for line in body)
+        return '\n'.join(lines)
+
+    # Straight-line instructions
+
+    def statement(self, instr):
+        op, args = instr.op, instr.args
+        if op == 'mov':
+            return f"{args[0]} = {args[1]}"
+        if op in BINARY_OPS:
+            return f"{args[0]} = {args[1]} {BINARY_OPS[op]} {args[2]}"
+        if op in COMPARE_OPS:
+            return f"{args[0]} = 1 if {args[1]} {COMPARE_OPS[op]} {args[2]} else 0"
+        if op == 'div':
+            return f"{args[0]} = c_div({args[1]}, {args[2]})"
+        if op == 'mod':
+            return f"{args[0]} = c_mod({args[1]}, {args[2]})"
+        if op == 'ld':
+            return f"{args[0]} = memory[{args[1]}] if {args[1]} > 0 else bad_address({args[1]})"
+        if op == 'st':
+            return f"memory[{args[1]} if {args[1]} > 0 else bad_address({args[1]})] = {args[0]}"
+        if op == 'nop':
+            return "pass"
+        if op == 'call':
+            name, regs = args[0], args[1:]
+            if name == 'iput':
+                return f"iput({regs[0]})"
+            if name == 'iget':
+                return f"{regs[0]} = iget()"
+            if name == 'mem':
+                return f"{regs[0]} = mem({regs[-1]})"
+            if name == 'rel':
+                return "pass"
+            if name == 'abort':
+                return f"abort({regs[0]})"
+            if name in BUILTINS:
+                raise VMError(f"instruction call {name} unknown")
+            target = regs[0] if regs else '_'
+            return f"{target} = {proc_function_name(name)}({', '.join(regs[1:])})"
+        raise VMError(f"instruction {op} unknown")
+
+    def block_statements(self, block):
+        """Python lines for a block's straight-line part and its final control instruction"""
+        lines = []
+        control = None
+        for instr in block.instrs:
+            if instr.is_label or instr.is_comment:
+                continue
+            if instr.is_jump or instr.op == 'ret':
+                control = instr
+                break
+            if instr not in self.fused:
+                lines.append(self.statement(instr))
+        return lines, control
+
+    # Structured translation
+
+    def structured_body(self):
+        lines = self.emit_range(0, len(self.blocks), None, None)
+        lines.append("raise VMError(LEAVING)")
+        return lines
+
+    def target_index(self, label):
+        block = self.cfg.label_map.get(label)
+        if block is None:
+            raise VMError(f"label {label} not found")
+        return block.index
+
+    def emit_range(self, start, end, exit_index, loop):
+        """Emit blocks [start, end) that continue at exit_index when done.
+
+        `loop` is the innermost enclosing LoopContext, or None.
+        """
+        lines = []
+        k = start
+        reachable = True
+        while k < end:
+            block = self.blocks[k]
+            if not reachable:
+                if self.has_live_preds(block):
+                    raise StructureError()
+                k += 1
+                continue
+            if k in self.loop_ranges and (loop is None or k != loop.header):
+                loop_end = self.loop_ranges[k]
+                if loop_end > end:
+                    raise StructureError()
+                inner = LoopContext(k, loop_end)
+                body = self.emit_range(k, loop_end, None, inner)
+                if inner.far_exit is not None:
+                    lines.append(f"{inner.flag} = 0")
+                lines.append("while True:")
+                lines.extend("    " + line for line in body)
+                k = loop_end
+                if inner.far_exit is None:
+                    continue
+                far = inner.far_exit
+                if loop is not None and far in (loop.header, loop.exit):
+                    lines.append(f"if {inner.flag}:")
+                    lines.append("    " + ("continue" if far == loop.header else "break"))
+                    continue
+                if far == exit_index:
+                    rest = self.emit_range(k, end, exit_index, loop)
+                    lines.append(f"if not {inner.flag}:")
+                    lines.extend(self.indent(rest))
+                    return lines
+                if not k < far < end:
+                    raise StructureError()
+                skipped = self.emit_range(k, far, far, loop)
+                lines.append(f"if not {inner.flag}:")
+                lines.extend(self.indent(skipped))
+                k = far
+                continue
+            if k in self.loop_headers and (loop is None or k != loop.header):
+                raise StructureError()
+
+            statements, control = self.block_statements(block)
+            lines.extend(statements)
+            k += 1
+            if control is None:
+                continue
+            if control.op == 'ret':
+                lines.append("return r0")
+                reachable = False
+                continue
+
+            target = self.target_index(control.target)
+            if control.op == 'jmp':
+                lines.extend(self.leave(target, exit_index, loop))
+                reachable = False
+                continue
+
+            taken_test, skip_test = self.branch_tests(control)
+            if loop is not None and (target in (loop.header, loop.exit) or target > loop.exit):
+                lines.append(f"if {taken_test}:")
+                lines.extend(self.indent(self.leave(target, exit_index, loop)))
+                continue
+            if target == exit_index:
+                rest = self.emit_range(k, end, exit_index, loop)
+                lines.append(f"if {skip_test}:")
+                lines.extend(self.indent(rest))
+                return lines
+            if not k <= target < end:
+                raise StructureError()
+
+            then_end = target
+            else_end = None
+            last_then = None
+            for candidate in range(then_end - 1, k - 1, -1):
+                if self.has_live_preds(self.blocks[candidate]) or candidate == k:
+                    last_then = self.blocks[candidate]
+                    break
+            if last_then is not None:
+                _, then_control = self.block_statements(last_then)
+                if then_control is not None and then_control.op == 'jmp':
+                    join = self.target_index(then_control.target)
+                    if target < join < end:
+                        else_end = join
+                    elif join == exit_index:
+                        else_end = end
+
+            if else_end is None:
+                then_lines = self.emit_range(k, then_end, then_end, loop)
+                lines.append(f"if {skip_test}:")
+                lines.extend(self.indent(then_lines))
+                k = then_end
+            else:
+                join = else_end if else_end < end else exit_index
+                then_lines = self.emit_range(k, then_end, join, loop)
+                else_lines = self.emit_range(then_end, else_end, join, loop)
+                lines.append(f"if {skip_test}:")
+                lines.extend(self.indent(then_lines))
+                lines.append("else:")
+                lines.extend(self.indent(else_lines))
+                k = else_end
+
+        if reachable and loop is not None and start == loop.header and end == loop.exit:
+            lines.append("break")
+        return lines
+
+    def has_live_preds(self, block):
+        return any(pred in self.live for pred in block.preds)
+
+    def leave(self, target, exit_index, loop):
+        """Lines for an unconditional jump out of the current range"""
+        if loop is not None:
+            if target == loop.header:
+                return ["continue"]
+            if target == loop.exit:
+                return ["break"]
+        if target == exit_index:
+            return []
+        if loop is not None and target > loop.exit:
+            if loop.far_exit not in (None, target):
+                raise StructureError()
+            loop.far_exit = target
+            return [f"{loop.flag} = 1", "break"]
+        raise StructureError()
+
+    def indent(self, lines):
+        return ["    " + line for line in lines] if lines else ["    pass"]
+
+    # Block dispatch fallback
+
+    def dispatch_body(self):
+        """A `while True` loop over basic blocks keyed by a local block number"""
+        # A block is only inlined into the case before it when nothing jumps to it
+        targets = {self.target_index(block.last.target) for block in self.blocks
+                   if block.last is not None and block.last.is_jump}
+        entries = {0} | targets | {succ.index for block in self.blocks for succ in block.succs
+                                   if not (succ.index == block.index + 1 and block.falls_through
+                                           and len(succ.preds) == 1)}
+        order = sorted(entries, key=lambda i: (i not in self.loop_headers, i))
+        lines = ["pc = 0", "while True:"]
+        first = True
+        for entry in order:
+            lines.append(f"    {'if' if first else 'elif'} pc == {entry}:")
+            first = False
+            case = []
+            k = entry
+            while True:
+                statements, control = self.block_statements(self.blocks[k])
+                case.extend(statements)
+                if control is not None:
+                    if control.op == 'ret':
+                        case.append("return r0")
+                        break
+                    target = self.target_index(control.target)
+                    if control.op == 'jmp':
+                        case.extend([f"pc = {target}", "continue"])
+                        break
+                    taken_test, _ = self.branch_tests(control)
+                    case.extend([f"if {taken_test}:", f"    pc = {target}", "    continue"])
+                k += 1
+                if k >= len(self.blocks):
+                    case.append("raise VMError(LEAVING)")
+                    break
+                if k in entries:
+                    case.extend([f"pc = {k}", "continue"])
+                    break
+            lines.extend("        " + line for line in case)
+        return lines
+
+
+class TranslatedProgram:
+    """Python functions generated for every procedure of a TSM program"""
+
+    def __init__(self, procs):
+        param_counts = {}
+        for proc in procs:
+            for instr in proc.body:
+                if instr.op == 'call' and instr.args[0] not in BUILTINS:
+                    count = max(len(instr.args) - 2, 0)
+                    param_counts[instr.args[0]] = max(param_counts.get(instr.args[0], 0), count)
+        self.translators = [ProcTranslator(proc, param_counts.get(proc.name, 0)) for proc in procs]
+        self.names = [proc.name for proc in procs]
+        self.source = '\n\n'.join(t.translate() for t in self.translators) + '\n'
+        self.code = compile(self.source, '<tsm>', 'exec')
+
+    @property
+    def structured_procs(self):
+        return [t.proc.name for t in self.translators if t.structured]
+
+    def run(self, input_stream=None, output_stream=None, entry=ENTRY_PROC):
+        """Execute the program and return a RunResult without instruction counts"""
+        if entry not in self.names:
+            raise VMError(f"procedure {entry} not found")
+        input_stream = input_stream if input_stream is not None else sys.stdin
+        output_stream = output_stream if output_stream is not None else sys.stdout
+        memory = [0]
+        output = []
+        pending = []
+
+        def iput(value):
+            output.append(f"{value}\n")
+
+        def iget():
+            while not pending:
+                output_stream.write(''.join(output))
+                del output[:]
+                line = input_stream.readline()
+                if not line:
+                    raise VMError("iget: end of input")
+                pending.extend(reversed(line.split()))
+            return int(pending.pop())
+
+        def mem(size):
+            if size < 0:
+                raise VMError(f"failed to allocate {size} words")
+            base = len(memory)
+            memory.extend([0] * size)
+            return base
+
+        def bad_address(address):
+            raise VMError(f"bad memory address {address}")
+
+        def abort(line):
+            raise VMError(f"aborted at line {line}")
+
+        namespace = {
+            'memory': memory, 'iput': iput, 'iget': iget, 'mem': mem,
+            'bad_address': bad_address, 'abort': abort, 'c_div': c_div, 'c_mod': c_mod,
+            'VMError': VMError, 'LEAVING': "leaving procedure without a ret",
+        }
+        exec(self.code, namespace)
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(old_limit, RECURSION_LIMIT))
+        start = time.perf_counter()
+        try:
+            value = namespace[proc_function_name(entry)]()
+        except RecursionError:
+            raise VMError("call stack overflow")
+        except IndexError:
+            raise VMError("bad memory address")
+        finally:
+            sys.setrecursionlimit(old_limit)
+            output_stream.write(''.join(output))
+        return RunResult(value, None, None, None, time.perf_counter() - start)
+
+
+def translate(text_or_procs):
+    """Translate TSM text or a list of IR Procs"""
+    procs = parse_program(text_or_procs) if isinstance(text_or_procs, str) else text_or_procs
+    return TranslatedProgram(procs)
+
+
+def main(argv=None):
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="Run a TSM program through the Python translator")
+    arg_parser.add_argument("tsm_file")
+    arg_parser.add_argument("-s", "--stats", action="store_true", help="print run time")
+    arg_parser.add_argument("--source", action="store_true", help="print the generated Python source")
+    args = arg_parser.parse_args(argv)
+    with open(args.tsm_file, 'r', encoding='utf-8') as f:
+        program = translate(f.read())
+    if args.source:
+        print(program.source)
+        return 0
+    try:
+        result = program.run()
+    except VMError as e:
+        print(f"tsvm: {e}", file=sys.stderr)
+        return 1
+    if args.stats:
+        print(f"time: {result.elapsed * 1000:.2f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
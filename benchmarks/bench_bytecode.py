@@ -0,0 +1,123 @@
+# bench_bytecode.py
+"""Binary TSM vs text: round-trip equality, artifact size and load time"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generator import generate_program
+from IR.codegen import compile_teslang_with_codegen
+from IR.linemap import map_path
+from IR.tsm import parse_program
+from VM.bytecode import BytecodeProgram, assemble, disassemble, load_bytecode
+from VM.interpreter import load, load_file, load_procs, run_program
+
+PROGRAMS = os.path.join(ROOT, 'benchmarks', 'programs', '*.tes')
+SIZES = {
+    'small': dict(functions=20),
+    'medium': dict(functions=100),
+    'large': dict(functions=400),
+}
+
+
+def compiled(source, optimize=False):
+    """(TSM text, LineMap) of source"""
+    code, line_map, errors = compile_teslang_with_codegen(source, optimize=optimize, line_map=True)
+    if errors:
+        raise RuntimeError(f"program does not compile: {errors[:3]}")
+    return code, line_map
+
+
+def same_procs(expected, actual):
+    """Whether two loaded Programs decode to the same instructions and positions"""
+    if [proc.name for proc in expected.procs] != actual.names:
+        return False
+    actual.load_all()
+    return all(e.code == a.code and e.register_count == a.register_count
+               and e.lines == a.lines and e.columns == a.columns
+               for e, a in zip(expected.procs, actual.procs))
+
+
+def check(name, code, line_map, failures):
+    """Assemble code and record how the binary program, its disassembly or a run differ"""
+    text_rows = code.split('\n')
+    lines, columns = line_map.source_positions(len(text_rows))
+    expected = load_procs(parse_program(text_rows, lines, columns))
+    data = assemble(code, line_map)
+    if not same_procs(expected, BytecodeProgram(data)):
+        failures.append((name, "binary program decodes differently"))
+        return
+    text = disassemble(data)
+    plain = load(code)
+    reloaded = BytecodeProgram(assemble(text))
+    if [p.code for p in plain.procs] != [p.code for p in reloaded.load_all().procs]:
+        failures.append((name, "disassembly does not reassemble to the same code"))
+        return
+    out, binary_out = io.StringIO(), io.StringIO()
+    result = run_program(plain, io.StringIO(), out)
+    binary_result = run_program(BytecodeProgram(data), io.StringIO(), binary_out)
+    if (result.return_value, result.instructions, out.getvalue()) != \
+            (binary_result.return_value, binary_result.instructions, binary_out.getvalue()):
+        failures.append((name, "runs differ"))
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", "--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    failures = []
+    checked = 0
+    for path in sorted(glob.glob(PROGRAMS)):
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        for optimize in (False, True):
+            code, line_map = compiled(source, optimize)
+            check(f"{os.path.basename(path)}{' -O' if optimize else ''}", code, line_map, failures)
+            checked += 1
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    print(f"{'✓' if not failures else '✗'} {checked - len(failures)}/{checked} programs decode, "
+          f"disassemble and run the same from binary\n")
+
+    print(f"{'Input':<8} | {'Text KB':>7} | {'Map KB':>6} | {'Binary KB':>9} | {'Text load ms':>12} | "
+          f"{'Binary open ms':>14} | {'Binary decode ms':>16}")
+    print('-' * 92)
+    with tempfile.TemporaryDirectory() as directory:
+        for label, options in SIZES.items():
+            code, line_map = compiled(generate_program(0, **options))
+            tsm = os.path.join(directory, f"{label}.tsm")
+            tsb = os.path.join(directory, f"{label}.tsb")
+            with open(tsm, 'w', encoding='utf-8') as f:
+                f.write(code)
+            line_map.write(map_path(tsm))
+            with open(tsb, 'wb') as f:
+                f.write(assemble(code, line_map))
+            text_load = best_time(lambda: load_file(tsm), args.repeat)
+            binary_open = best_time(lambda: load_bytecode(tsb).proc('main'), args.repeat)
+            binary_decode = best_time(lambda: load_bytecode(tsb).load_all(), args.repeat)
+            print(f"{label:<8} | {os.path.getsize(tsm) / 1024:>7,.0f} | {os.path.getsize(map_path(tsm)) / 1024:>6,.0f} | "
+                  f"{os.path.getsize(tsb) / 1024:>9,.0f} | {text_load * 1000:>12.1f} | "
+                  f"{binary_open * 1000:>14.2f} | {binary_decode * 1000:>16.1f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
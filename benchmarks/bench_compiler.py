@@ -0,0 +1,131 @@
+# bench_compiler.py
+"""Compiler throughput on generated programs, with a JSON history and regression check"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generator import generate_program
+from Driver.pipeline import compile_source
+from Driver.profiler import PhaseProfiler
+
+HISTORY = os.path.join(ROOT, 'benchmarks', 'history.json')
+SUITES = {
+    'small': dict(functions=10, depth=2, expr_depth=2, loop_count=10, vectors=1, statements=4),
+    'medium': dict(functions=50, depth=3, expr_depth=3, loop_count=10, vectors=1, statements=6),
+    'large': dict(functions=200, depth=3, expr_depth=3, loop_count=20, vectors=2, statements=8),
+}
+THRESHOLD = 0.25
+
+
+def bench_suite(source, repeat, optimize):
+    """Best time of each phase over repeat compiles of source"""
+    best = {}
+    nodes = 0
+    for _ in range(repeat):
+        profiler = PhaseProfiler(trace_memory=False)
+        result = compile_source(source, optimize, profiler=profiler)
+        if result.errors:
+            raise RuntimeError(f"generated program does not compile: {result.errors[:3]}")
+        for record in profiler.records:
+            if record.name == 'parse':
+                nodes = record.count
+            if record.name not in best or record.seconds < best[record.name]:
+                best[record.name] = record.seconds
+    lines = source.count('\n')
+    phases = {}
+    for name, seconds in best.items():
+        phases[name] = {
+            'seconds': seconds,
+            'lines_per_sec': lines / seconds if seconds else 0,
+            'nodes_per_sec': nodes / seconds if seconds else 0,
+        }
+    return {'lines': lines, 'nodes': nodes, 'phases': phases}
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+
+
+def find_regressions(baseline, results, threshold):
+    """Phases whose time grew by more than threshold relative to the baseline run"""
+    regressions = []
+    for suite, result in results.items():
+        previous = baseline.get('results', {}).get(suite)
+        if not previous or previous.get('config') != result.get('config'):
+            continue
+        for phase, stats in result['phases'].items():
+            old = previous['phases'].get(phase)
+            if old and old['seconds'] > 0:
+                ratio = stats['seconds'] / old['seconds']
+                if ratio > 1 + threshold:
+                    regressions.append((suite, phase, old['seconds'], stats['seconds'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("suites", nargs="*",
+                            help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("-n", "--repeat", type=int, default=5, help="compiles per suite")
+    arg_parser.add_argument("-O", "--optimize", action="store_true", help="include the optimize phase")
+    arg_parser.add_argument("--history", default=HISTORY, help="JSON history file")
+    arg_parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                            help="allowed slowdown per phase against the last run (default: 0.25)")
+    arg_parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    args = arg_parser.parse_args(argv)
+    for suite in args.suites:
+        if suite not in SUITES:
+            arg_parser.error(f"unknown suite {suite}")
+
+    results = {}
+    print(f"{'Suite':<8} | {'Phase':<9} | {'Time ms':>9} | {'Lines/s':>10} | {'Nodes/s':>10}")
+    print('-' * 58)
+    for suite in args.suites or list(SUITES):
+        config = dict(SUITES[suite], seed=args.seed, optimize=args.optimize)
+        source = generate_program(args.seed, **SUITES[suite])
+        result = bench_suite(source, args.repeat, args.optimize)
+        result['config'] = config
+        results[suite] = result
+        for phase, stats in result['phases'].items():
+            print(f"{suite:<8} | {phase:<9} | {stats['seconds'] * 1000:>9.2f} | "
+                  f"{stats['lines_per_sec']:>10.0f} | {stats['nodes_per_sec']:>10.0f}")
+
+    history = load_history(args.history)
+    status = 0
+    if history:
+        regressions = find_regressions(history[-1], results, args.threshold)
+        for suite, phase, old, new, ratio in regressions:
+            print(f"REGRESSION: {suite}/{phase} {old * 1000:.2f} ms -> {new * 1000:.2f} ms ({ratio:.2f}x)")
+        status = 1 if regressions else 0
+        if not regressions:
+            print(f"\n✓ No phase slower than {args.threshold:.0%} against {history[-1]['timestamp']}")
+
+    if not args.no_save:
+        history.append({
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'results': results,
+        })
+        save_history(args.history, history)
+        print(f"✓ Results appended to {args.history}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
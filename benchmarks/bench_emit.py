@@ -0,0 +1,106 @@
+# bench_emit.py
+"""Streamed TSM output vs joining the whole program: text equality and peak memory"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_parser import corpus
+from benchmarks.generator import generate_program
+from Driver.pipeline import analyze, lex, parse
+from IR.codegen import generate_code_with_map, write_code
+from IR.linemap import LineMap
+from IR.writer import TsmWriter
+
+SIZES = {
+    'small': dict(functions=20),
+    'medium': dict(functions=100),
+    'large': dict(functions=400),
+}
+
+
+def checked_ast(code):
+    """AST of code if it parses and passes semantic analysis, else None"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast, errors = parse(lex(code), code)
+        if errors or ast is None or analyze(ast):
+            return None
+    return ast
+
+
+def check_output(inputs):
+    """Inputs whose streamed text or line map differs from generate_code_with_map"""
+    failures = []
+    checked = 0
+    for name, code in inputs:
+        ast = checked_ast(code)
+        if ast is None:
+            continue
+        checked += 1
+        expected, line_map = generate_code_with_map(ast)
+        out = io.StringIO()
+        writer = write_code(ast, TsmWriter(out))
+        if out.getvalue() != expected:
+            failures.append((name, "text differs"))
+        elif LineMap.decode(writer.line_map.encode()) != line_map:
+            failures.append((name, "line map differs"))
+    return checked, failures
+
+
+def joined(ast, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(generate_code_with_map(ast)[0])
+
+
+def streamed(ast, path):
+    with open(path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        write_code(ast, TsmWriter(f))
+
+
+def measure(func, ast, path):
+    """(seconds, peak bytes allocated) of one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(ast, path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seeds", type=int, default=30, help="seeds of the equality corpus")
+    args = arg_parser.parse_args(argv)
+
+    checked, failures = check_output(corpus(args.seeds))
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    print(f"{'✓' if not failures else '✗'} {checked - len(failures)}/{checked} programs stream "
+          f"the same text and line map\n")
+
+    print(f"{'Input':<8} | {'Output KB':>9} | {'Joined peak KB':>14} | {'Streamed peak KB':>16} | "
+          f"{'Joined s':>8} | {'Streamed s':>10}")
+    print('-' * 81)
+    path = os.devnull
+    for label, options in SIZES.items():
+        ast = checked_ast(generate_program(0, **options))
+        if ast is None:
+            raise RuntimeError("generated program does not compile")
+        size = len(generate_code_with_map(ast)[0]) / 1024
+        joined_time, joined_peak = measure(joined, ast, path)
+        streamed_time, streamed_peak = measure(streamed, ast, path)
+        print(f"{label:<8} | {size:>9,.0f} | {joined_peak / 1024:>14,.0f} | {streamed_peak / 1024:>16,.0f} | "
+              f"{joined_time:>8.3f} | {streamed_time:>10.3f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
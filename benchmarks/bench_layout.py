@@ -0,0 +1,106 @@
+# bench_layout.py
+"""Block layout on and off: run parity and executed branches, jumps and instructions on the VM"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_superinstr import checked_ast, outcome
+from benchmarks.generator import generate_program
+from IR.codegen import CodeGenerator
+from IR.layout import layout_blocks
+from IR.optimizer import optimize_procs
+from IR.tsm import format_program
+from VM.interpreter import BRANCH_OPCODES, IMMEDIATE_OFFSET, JMP, JZ, JNZ, load, run_program
+from VM.profiler import profile_procs
+from VM.translator import translate
+
+PROGRAMS = os.path.join(ROOT, 'benchmarks', 'programs', '*.tes')
+BRANCHES = {JMP, JZ, JNZ} | set(BRANCH_OPCODES.values()) | {code + IMMEDIATE_OFFSET for code in BRANCH_OPCODES.values()}
+
+
+def compiled(ast, optimize, layout):
+    """Procs of ast, with or without the layout pass"""
+    generator = CodeGenerator()
+    generator.generate(ast)
+    procs = generator.procs()
+    if optimize:
+        optimize_procs(procs, generator.param_counts, layout)
+    elif layout:
+        for proc in procs:
+            layout_blocks(proc)
+    return procs
+
+
+def check(name, ast, optimize, failures):
+    """Record where laid out code behaves differently on the interpreter or the translator"""
+    plain = format_program(compiled(ast, optimize, False))
+    laid_out = format_program(compiled(ast, optimize, True))
+    expected = outcome(lambda out: run_program(load(plain), io.StringIO(), out))
+    for engine, run in (('interp', lambda out: run_program(load(laid_out), io.StringIO(), out)),
+                        ('translate', lambda out: translate(laid_out).run(io.StringIO(), out))):
+        actual = outcome(run)
+        if actual != expected:
+            failures.append((f"{name}{' -O' if optimize else ''} ({engine})", f"{expected} vs {actual}"))
+
+
+def counts(procs):
+    """(branches, unconditional jumps, instructions) executed by one run"""
+    _, machine = profile_procs(procs, io.StringIO(), io.StringIO())
+    branches = jumps = instructions = 0
+    for profile in machine.profiles:
+        for (op, _, _, _), count in zip(profile.proc.code, profile.counts):
+            instructions += count
+            if op in BRANCHES:
+                branches += count
+                if op == JMP:
+                    jumps += count
+    return branches, jumps, instructions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seeds", type=int, default=20, help="generated programs of the parity check")
+    args = arg_parser.parse_args(argv)
+
+    programs = []
+    for path in sorted(glob.glob(PROGRAMS)):
+        with open(path, 'r', encoding='utf-8') as f:
+            programs.append((os.path.basename(path), checked_ast(f.read())))
+    generated = [(f"generated #{seed}", checked_ast(generate_program(seed))) for seed in range(args.seeds)]
+
+    failures = []
+    checked = 0
+    for name, ast in programs + generated:
+        if ast is None:
+            failures.append((name, "does not compile"))
+            continue
+        for optimize in (False, True):
+            check(name, ast, optimize, failures)
+            checked += 1
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    print(f"{'✓' if not failures else '✗'} {checked} programs return and print the same after block "
+          f"layout on the interpreter and the translator\n")
+
+    print(f"{'Program':<14} | {'Opt':<3} | {'Branches':>10} | {'Laid out':>10} | {'Jumps':>9} | "
+          f"{'Laid out':>9} | {'Instrs':>10} | {'Laid out':>10}")
+    print('-' * 96)
+    for name, ast in programs:
+        if ast is None:
+            continue
+        for optimize in (False, True):
+            before = counts(compiled(ast, optimize, False))
+            after = counts(compiled(ast, optimize, True))
+            print(f"{name:<14} | {'-O' if optimize else '':<3} | {before[0]:>10,} | {after[0]:>10,} | "
+                  f"{before[1]:>9,} | {after[1]:>9,} | {before[2]:>10,} | {after[2]:>10,}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# bench_lexer.py
+"""PLY lexer vs the hand-written scanner: token-for-token equivalence and MB/s"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generator import generate_program
+from Lexer.lexer import make_lexer
+from Lexer.scanner import tokenize
+
+# Inputs that exercise the odd corners of the PLY rules: strings, nested
+# comments, illegal characters, non-ASCII digits and keywords as prefixes
+EDGE_CASES = [
+    'x = "a\\"b" + \'c\\n\' ;',
+    's :: mstr = """one\ntwo""";',
+    '</ outer </ inner /> still comment\n/> after',
+    'a</b/>c',
+    'if [[a<=b && c>=d || !e]] x => y :: z : w ? 1 : 2;',
+    'returned fork lengthy for_each int1 _x X9',
+    'y = a | b & c; z \r q @@ 3;\n "unterminated\nw',
+    'n = 12345678901234567890 + 0 + 007;',
+    'd = ٣٤ + 1٥;',
+    'a\t\tb\n\n\n  c',
+    '',
+]
+UNCLOSED = "Error: Unclosed comment"
+
+
+def source_files():
+    patterns = ['benchmarks/programs/*.tes', 'tests/*.tes', '*.tes']
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(os.path.join(ROOT, pattern))))
+    return paths
+
+
+def corpus(seeds):
+    """(name, code) of the edge cases, the .tes files and seeds generated programs"""
+    inputs = [(f"edge case {i}", code) for i, code in enumerate(EDGE_CASES)]
+    for path in source_files():
+        with open(path, 'r', encoding='utf-8') as f:
+            inputs.append((os.path.relpath(path, ROOT), f.read()))
+    inputs.extend((f"seed {seed}", generate_program(seed)) for seed in range(seeds))
+    return inputs
+
+
+def ply_tokens(code):
+    lexer = make_lexer('ply')
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        lexer.input(code)
+        tokens = [(t.type, t.value, t.lineno, t.lexpos) for t in iter(lexer.token, None)]
+    return tokens, out.getvalue()
+
+
+def dfa_tokens(code):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        tokens = [(t.type, t.value, t.lineno, t.lexpos) for t in tokenize(code)[0]]
+    return tokens, out.getvalue()
+
+
+def until_unclosed_comment(tokens, output):
+    """Tokens and diagnostics up to an unclosed comment
+
+    After an unclosed comment PLY starts rescanning the text from the
+    beginning, which the scanner deliberately does not copy.
+    """
+    if UNCLOSED not in output:
+        return tokens, output
+    output = output[:output.index('\n', output.index(UNCLOSED)) + 1]
+    prefix = []
+    for tok in tokens:
+        if prefix and tok[3] <= prefix[-1][3]:
+            break
+        prefix.append(tok)
+    return prefix, output
+
+
+def check_equivalence(corpus):
+    """Names of the inputs on which the two lexers disagree, with the first difference"""
+    failures = []
+    for name, code in corpus:
+        expected, expected_output = until_unclosed_comment(*ply_tokens(code))
+        actual, actual_output = dfa_tokens(code)
+        if expected == actual and expected_output == actual_output:
+            continue
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            if a != b:
+                failures.append((name, f"token {i}: ply {a} vs dfa {b}"))
+                break
+        else:
+            if len(expected) != len(actual):
+                failures.append((name, f"ply {len(expected)} tokens vs dfa {len(actual)}"))
+            else:
+                failures.append((name, f"diagnostics differ: {expected_output!r} vs {actual_output!r}"))
+    return failures
+
+
+def throughput(func, code, repeat):
+    """Best MB/s of func(code) over repeat runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(code)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(code.encode('utf-8')) / best / 1e6
+
+
+def ply_lex(code):
+    lexer = make_lexer('ply')
+    lexer.input(code)
+    return list(iter(lexer.token, None))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seeds", type=int, default=30, help="generated programs in the equivalence corpus")
+    arg_parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    inputs = corpus(args.seeds)
+    failures = check_equivalence(inputs)
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    print(f"{'✓' if not failures else '✗'} {len(inputs) - len(failures)}/{len(inputs)} inputs lex identically\n")
+
+    print(f"{'Input':<10} | {'KB':>7} | {'PLY MB/s':>9} | {'DFA MB/s':>9} | Speedup")
+    print('-' * 54)
+    for name, size in (('small', 10), ('medium', 50), ('large', 200)):
+        code = generate_program(0, functions=size)
+        ply = throughput(ply_lex, code, args.repeat)
+        dfa = throughput(tokenize, code, args.repeat)
+        print(f"{name:<10} | {len(code) / 1024:>7.1f} | {ply:>9.2f} | {dfa:>9.2f} | {dfa / ply:>6.1f}x")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# bench_names.py
+"""Identifier interning: symbol id consistency, token memory and name-lookup phases"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_parser import corpus
+from benchmarks.generator import generate_program
+from Driver.pipeline import analyze, generate, lex, parse
+from Lexer.names import NameTable
+from Parser.ast_nodes import *
+
+# Attribute holding the name each node's symbol_id stands for
+NAME_FIELDS = {
+    Function: 'name', Parameter: 'name', VarDeclaration: 'name', Assignment: 'target',
+    FunctionCall: 'name', For: 'var', Identifier: 'name', ArrayAccess: 'array',
+}
+# Identifier-heavy: deep expressions over many locals
+SIZES = {
+    'small': dict(functions=10, expr_depth=5, statements=10),
+    'medium': dict(functions=50, expr_depth=5, statements=10),
+    'large': dict(functions=150, expr_depth=5, statements=10),
+}
+
+
+def name_nodes(node):
+    """(node, name) for every node below node that refers to a name"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+            continue
+        if not isinstance(current, ASTNode):
+            continue
+        field = NAME_FIELDS.get(type(current))
+        if field is not None:
+            name = getattr(current, field)
+            if isinstance(name, str):
+                yield current, name
+        stack.extend(value for value in vars(current).values() if isinstance(value, (ASTNode, list)))
+
+
+def check_ids(inputs):
+    """Inputs on which some node's symbol_id does not name it in the Program's NameTable"""
+    failures = []
+    for name, code in inputs:
+        for lexer in ('ply', 'dfa'):
+            for parser in ('lalr', 'descent'):
+                names = NameTable()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ast, _ = parse(lex(code, lexer, names), code, parser, names)
+                if ast is None:
+                    continue
+                for node, text in name_nodes(ast):
+                    # print(...) and length(...) are keyword tokens, not interned names
+                    if node.symbol_id is None and text in ('print', 'length'):
+                        continue
+                    if node.symbol_id is None or ast.names[node.symbol_id] != text:
+                        failures.append((f"{name} ({lexer}, {parser})", f"{type(node).__name__} {text!r} "
+                                         f"has symbol_id {node.symbol_id}"))
+                        break
+    return failures
+
+
+def token_memory(code, lexer):
+    """Bytes allocated for the token list of code"""
+    lex(code, lexer)
+    tracemalloc.start()
+    tokens = lex(code, lexer)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tokens
+    return size
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seeds", type=int, default=30, help="seeds of the consistency corpus")
+    arg_parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    failures = check_ids(corpus(args.seeds))
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    print(f"{'✓' if not failures else '✗'} every name node's symbol_id names it, "
+          f"with both lexers and parsers\n")
+
+    print(f"{'Input':<8} | {'IDs':>7} | {'Names':>6} | {'PLY B/tok':>9} | {'DFA B/tok':>9} | "
+          f"{'Semantic refs/s':>15} | {'Codegen refs/s':>14}")
+    print('-' * 87)
+    for label, options in SIZES.items():
+        code = generate_program(0, **options)
+        names = NameTable()
+        tokens = lex(code, 'ply', names)
+        ast, errors = parse(tokens, code, 'lalr', names)
+        if errors:
+            raise RuntimeError(f"generated program does not parse: {errors[:3]}")
+        references = sum(1 for _ in name_nodes(ast))
+        ply = token_memory(code, 'ply') / len(tokens)
+        dfa = token_memory(code, 'dfa') / len(tokens)
+        semantic = best_time(lambda: analyze(ast), args.repeat)
+        codegen = best_time(lambda: generate(ast), args.repeat)
+        ids = sum(1 for tok in tokens if tok.type == 'ID')
+        print(f"{label:<8} | {ids:>7} | {len(names):>6} | {ply:>9.1f} | {dfa:>9.1f} | "
+              f"{references / semantic:>15,.0f} | {references / codegen:>14,.0f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
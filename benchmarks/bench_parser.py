@@ -0,0 +1,213 @@
+# bench_parser.py
+"""LALR parser vs the recursive-descent parser: AST equality and parse throughput"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generator import generate_program
+from Driver.pipeline import parse
+from Lexer.scanner import tokenize
+from Parser.ast_nodes import ast_equal
+
+BINARY = ['+', '-', '*', '/', '==', '!=', '<', '>', '<=', '>=', '&&', '||']
+UNARY = ['-', '+', '!']
+TYPES = ['int', 'str', 'mstr', 'bool', 'vector', 'null']
+
+
+class GrammarFuzzer:
+    """Random syntactically valid programs using every rule of the grammar
+
+    Unlike benchmarks/generator.py the output is not meant to pass semantic
+    analysis: it mixes all operators, unary and ternary expressions, nested
+    functions, dangling elses and flattened declarations to stress precedence
+    and statement parsing.
+    """
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def expression(self, depth):
+        rand = self.random
+        if depth <= 0 or rand.random() < 0.2:
+            return self.atom(depth)
+        kind = rand.random()
+        if kind < 0.5:
+            return f"{self.expression(depth - 1)} {rand.choice(BINARY)} {self.expression(depth - 1)}"
+        if kind < 0.65:
+            return f"{rand.choice(UNARY)}{self.expression(depth - 1)}"
+        if kind < 0.8:
+            return (f"{self.expression(depth - 1)} ? {self.expression(depth - 1)} "
+                    f": {self.expression(depth - 1)}")
+        return f"({self.expression(depth - 1)})"
+
+    def atom(self, depth):
+        rand = self.random
+        kind = rand.randrange(9)
+        if kind == 0:
+            return str(rand.randint(0, 999))
+        if kind == 1:
+            return rand.choice(['"s"', "'t'"])
+        if kind == 2:
+            return rand.choice(['true', 'false'])
+        if kind == 3:
+            return f"v[{self.expression(depth - 1)}]"
+        if kind == 4:
+            args = ', '.join(self.expression(depth - 1) for _ in range(rand.randint(0, 2)))
+            return f"{rand.choice(['f', 'print'])}({args})"
+        if kind == 5:
+            return f"length({self.expression(depth - 1)})"
+        if kind == 6:
+            return f"[{', '.join(self.expression(depth - 1) for _ in range(rand.randint(0, 3)))}]"
+        return rand.choice(['a', 'b', 'c'])
+
+    def condition(self):
+        return f"[[{self.expression(3)}]]"
+
+    def statement(self, depth):
+        rand = self.random
+        kind = rand.randrange(12 if depth > 0 else 5)
+        if kind == 0:
+            return f"x :: {rand.choice(TYPES)};"
+        if kind == 1:
+            return f"y :: int = {self.expression(3)};"
+        if kind == 2:
+            return f"{rand.choice(['a', 'v[' + self.expression(2) + ']'])} = {self.expression(3)};"
+        if kind == 3:
+            return f"f({self.expression(2)}, {self.expression(2)});"
+        if kind == 4:
+            return rand.choice(["return;", f"return {self.expression(3)};"])
+        if kind == 5:
+            tail = f" else {self.statement(depth - 1)}" if rand.random() < 0.5 else ""
+            return f"if {self.condition()} {self.statement(depth - 1)}{tail}"
+        if kind == 6:
+            return f"while {self.condition()} {self.statement(depth - 1)}"
+        if kind == 7:
+            return f"do {self.statement(depth - 1)} while {self.condition()};"
+        if kind == 8:
+            return (f"for (i = {self.expression(2)} to {self.expression(2)}) begin\n"
+                    f"{self.statements(depth - 1)}\nend")
+        if kind == 9:
+            return self.function(depth - 1)
+        return f"begin\n{self.statements(depth - 1)}\nend"
+
+    def statements(self, depth):
+        return '\n'.join(self.statement(depth) for _ in range(self.random.randint(0, 4)))
+
+    def function(self, depth):
+        rand = self.random
+        params = ', '.join(f"p{i} as {rand.choice(TYPES)}" for i in range(rand.randint(0, 3)))
+        header = f"funk g{rand.randint(0, 99)}({params}) <{rand.choice(TYPES)}>"
+        if rand.random() < 0.2:
+            return f"{header} => return {self.expression(3)};"
+        return f"{header} {{\n{self.statements(depth)}\n}}"
+
+    def program(self):
+        return '\n'.join(self.function(3) for _ in range(self.random.randint(1, 4))) + '\n'
+
+
+def mutate(code, seed):
+    """code with one token dropped, duplicated or swapped with its neighbour"""
+    rand = random.Random(seed)
+    tokens, _ = tokenize(code)
+    if len(tokens) < 2:
+        return code
+    i = rand.randrange(len(tokens) - 1)
+    start, end = tokens[i].lexpos, tokens[i + 1].lexpos
+    text = code[start:end]
+    kind = rand.randrange(3)
+    if kind == 0:
+        return code[:start] + code[end:]
+    if kind == 1:
+        return code[:start] + text + text + code[end:]
+    after = tokens[i + 2].lexpos if i + 2 < len(tokens) else len(code)
+    return code[:start] + code[end:after] + ' ' + text + code[after:]
+
+
+def parse_with(parser, tokens, code):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        return parse(tokens, code, parser)
+
+
+def compare(name, code, failures):
+    """Parse code with both parsers and record how they differ
+
+    On valid input the ASTs must be equal, positions included. On invalid
+    input the descent parser must report PLY's first error and nothing else.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        tokens, _ = tokenize(code)
+    expected, expected_errors = parse_with('lalr', tokens, code)
+    actual, actual_errors = parse_with('descent', tokens, code)
+    if expected_errors:
+        if actual is not None or actual_errors != expected_errors[:1]:
+            failures.append((name, f"errors: lalr {expected_errors[:1]} vs descent {actual_errors}"))
+        return False
+    if actual_errors or not ast_equal(expected, actual):
+        failures.append((name, f"ASTs differ (descent errors: {actual_errors})"))
+    return True
+
+
+def corpus(seeds):
+    inputs = []
+    for pattern in ['benchmarks/programs/*.tes', 'tests/*.tes', '*.tes']:
+        for path in sorted(glob.glob(os.path.join(ROOT, pattern))):
+            with open(path, 'r', encoding='utf-8') as f:
+                inputs.append((os.path.relpath(path, ROOT), f.read()))
+    for seed in range(seeds):
+        inputs.append((f"generated seed {seed}", generate_program(seed)))
+        program = GrammarFuzzer(seed).program()
+        inputs.append((f"fuzzed seed {seed}", program))
+        inputs.append((f"mutated seed {seed}", mutate(program, seed)))
+    return inputs
+
+
+def throughput(parser, tokens, code, repeat):
+    """Best tokens per second of parsing an already-lexed program"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(tokens, code, parser)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(tokens) / best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seeds", type=int, default=100,
+                            help="generated, fuzzed and mutated programs of each kind")
+    arg_parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    inputs = corpus(args.seeds)
+    failures = []
+    valid = sum(compare(name, code, failures) for name, code in inputs)
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    mark = '✓' if not failures else '✗'
+    print(f"{mark} {len(inputs) - len(failures)}/{len(inputs)} inputs parse identically "
+          f"({valid} valid, {len(inputs) - valid} with syntax errors)\n")
+
+    print(f"{'Input':<10} | {'Tokens':>7} | {'LALR tok/s':>11} | {'Descent tok/s':>13} | Speedup")
+    print('-' * 62)
+    for name, size in (('small', 10), ('medium', 50), ('large', 200)):
+        code = generate_program(0, functions=size)
+        tokens, _ = tokenize(code)
+        lalr = throughput('lalr', tokens, code, args.repeat)
+        descent = throughput('descent', tokens, code, args.repeat)
+        print(f"{name:<10} | {len(tokens):>7} | {lalr:>11,.0f} | {descent:>13,.0f} | {descent / lalr:>6.1f}x")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# bench_pipeline.py
+"""Pipelined per-function compilation vs whole-program compilation: output parity and peak memory"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_parser import corpus
+from benchmarks.generator import generate_program
+from Driver.pipeline import compile_pipelined, compile_source, get_parser
+from IR.writer import TsmWriter
+
+PARSERS = ('lalr', 'ply', 'descent')
+SIZES = (50, 200, 800)
+
+
+def pipelined(code, parser='lalr', lexer='ply'):
+    """(errors, code) of a pipelined compile"""
+    out = io.StringIO()
+    errors = compile_pipelined(code, TsmWriter(out), lexer=lexer, parser=parser)
+    return errors, out.getvalue()
+
+
+def compare(name, code, failures):
+    """Compile code both ways with every parser and record how they differ; returns whether it compiled"""
+    compiled = False
+    for parser in PARSERS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = compile_source(code, parser=parser)
+            errors, text = pipelined(code, parser)
+        if errors != expected.errors:
+            failures.append((f"{name} ({parser})", f"errors: {expected.errors[:2]} vs {errors[:2]}"))
+        elif not errors and text != expected.code:
+            failures.append((f"{name} ({parser})", "generated code differs"))
+        compiled = compiled or not errors
+    return compiled
+
+
+def peak_memory(func):
+    """(seconds, peak bytes allocated) of one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def whole(code):
+    result = compile_source(code)
+    with open(os.devnull, 'w', encoding='utf-8') as f:
+        f.write(result.code)
+
+
+def streamed(code):
+    with open(os.devnull, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        compile_pipelined(code, TsmWriter(f))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seeds", type=int, default=30,
+                            help="generated, fuzzed and mutated programs of each kind")
+    args = arg_parser.parse_args(argv)
+
+    for parser in PARSERS:
+        get_parser(parser)
+    inputs = corpus(args.seeds)
+    failures = []
+    compiled = sum(compare(name, code, failures) for name, code in inputs)
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    mark = '✓' if not failures else '✗'
+    print(f"{mark} {len(inputs)} inputs give the same errors and code with every parser "
+          f"({compiled} compile, {len(inputs) - compiled} with errors)\n")
+
+    print(f"{'Functions':>9} | {'Source KB':>9} | {'Whole peak KB':>13} | {'Pipelined peak KB':>17} | "
+          f"{'Whole s':>7} | {'Pipelined s':>11}")
+    print('-' * 83)
+    for functions in SIZES:
+        code = generate_program(0, functions=functions)
+        whole_time, whole_peak = peak_memory(lambda: whole(code))
+        streamed_time, streamed_peak = peak_memory(lambda: streamed(code))
+        print(f"{functions:>9} | {len(code) / 1024:>9,.0f} | {whole_peak / 1024:>13,.0f} | "
+              f"{streamed_peak / 1024:>17,.0f} | {whole_time:>7.2f} | {streamed_time:>11.2f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
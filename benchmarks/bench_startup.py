@@ -0,0 +1,106 @@
+# bench_startup.py
+"""CLI startup cost: wall time and -X importtime totals for main.py subcommands"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAM = os.path.join(ROOT, 'benchmarks', 'programs', 'loops.tes')
+MAIN = os.path.join(ROOT, 'main.py')
+
+# Modules each quick invocation must not import, with its startup budget
+# over a bare interpreter in milliseconds
+SCENARIOS = [
+    ('tokens-only', ['--tokens-only'], ('ply.yacc', 'Parser.parser', 'SemanticAnalyzerF', 'IR.codegen'), 60),
+    ('check', ['--check'], ('ply.yacc', 'IR.codegen', 'IR.optimizer', 'VM.interpreter'), 100),
+    ('compile', [], (), None),
+]
+
+
+def run_once(args):
+    """Wall seconds and {module: (self us, cumulative us)} of one run
+
+    Bytecode caching is forced on, so repeated runs measure startup as users
+    see it rather than recompiling every module.
+    """
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own), int(cumulative))
+    return elapsed, modules
+
+
+def measure(args, repeat):
+    """Best wall time over repeat runs and the import table of that run"""
+    best = None
+    for _ in range(repeat):
+        elapsed, modules = run_once(args)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, modules)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", "--repeat", type=int, default=10, help="runs per scenario")
+    arg_parser.add_argument("--program", default=PROGRAM,
+                            help="TesLang file to pass to main.py (copied to a temporary directory)")
+    arg_parser.add_argument("--top", type=int, default=5, help="slowest imports to list per scenario")
+    args = arg_parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp()
+    program = shutil.copy(args.program, workdir)
+    try:
+        return run_scenarios(program, args.repeat, args.top)
+    finally:
+        shutil.rmtree(workdir)
+
+
+def run_scenarios(program, repeat, top):
+    """Print the startup table; returns 1 if a quick scenario is over budget or imports too much"""
+    bare, _ = measure(['-c', 'pass'], repeat)
+    print(f"bare interpreter: {bare * 1000:.1f} ms\n")
+    print(f"{'Scenario':<12} | {'Wall ms':>8} | {'Over ms':>8} | {'Imports ms':>10} | {'Modules':>7} | Budget")
+    print('-' * 70)
+    status = 0
+    details = []
+    for name, flags, forbidden, budget in SCENARIOS:
+        elapsed, modules = measure([MAIN] + flags + [program], repeat)
+        overhead = (elapsed - bare) * 1000
+        imports = sum(own for own, _ in modules.values()) / 1000
+        verdict = '-'
+        if budget is not None:
+            verdict = 'ok' if overhead <= budget else f'OVER {budget} ms'
+            if overhead > budget:
+                status = 1
+        print(f"{name:<12} | {elapsed * 1000:>8.1f} | {overhead:>8.1f} | {imports:>10.1f} | {len(modules):>7} | {verdict}")
+        leaked = [module for module in modules if module.startswith(forbidden)] if forbidden else []
+        if leaked:
+            status = 1
+        details.append((name, modules, leaked))
+
+    for name, modules, leaked in details:
+        print(f"\n{name}: slowest imports (self ms)")
+        slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        for module, (own, cumulative) in slowest:
+            print(f"  {own / 1000:>7.2f}  {module}")
+        if leaked:
+            print(f"  ✗ imports modules it should not need: {', '.join(sorted(leaked))}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
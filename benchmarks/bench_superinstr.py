@@ -0,0 +1,125 @@
+# bench_superinstr.py
+"""Superinstructions vs plain TSM: run parity on every engine, dispatch counts and runtime"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generator import generate_program
+from Driver.pipeline import analyze, lex, parse
+from IR.codegen import generate_procs
+from IR.tsm import format_program
+from VM.bytecode import BytecodeProgram, assemble
+from VM.interpreter import VMError, load, run_program
+from VM.profiler import profile_procs
+from VM.translator import translate
+
+PROGRAMS = os.path.join(ROOT, 'benchmarks', 'programs', '*.tes')
+
+
+def checked_ast(code):
+    """AST of code if it parses and passes semantic analysis, else None"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast, errors = parse(lex(code), code)
+        if errors or ast is None or analyze(ast):
+            return None
+    return ast
+
+
+def outcome(run):
+    """(return value or error, output) of one run"""
+    out = io.StringIO()
+    try:
+        value = run(out).return_value
+    except (VMError, RecursionError) as e:
+        value = f"error: {str(e).split(' at ')[0]}"
+    return value, out.getvalue()
+
+
+def runs(code, procs):
+    """Outcome of code on the interpreter, the translator, binary TSM and the profiler"""
+    return {
+        'interp': outcome(lambda out: run_program(load(code), io.StringIO(), out)),
+        'translate': outcome(lambda out: translate(code).run(io.StringIO(), out)),
+        'bytecode': outcome(lambda out: run_program(BytecodeProgram(assemble(code)), io.StringIO(), out)),
+        'profile': outcome(lambda out: profile_procs(procs, io.StringIO(), out)[0]),
+    }
+
+
+def check(name, ast, optimize, failures):
+    """Record where fused code behaves differently from plain code"""
+    plain = format_program(generate_procs(ast, optimize))
+    fused_procs = generate_procs(ast, optimize, superinstructions=True)
+    fused = format_program(fused_procs)
+    expected = runs(plain, generate_procs(ast, optimize))['interp']
+    for engine, actual in runs(fused, fused_procs).items():
+        if actual != expected:
+            failures.append((f"{name}{' -O' if optimize else ''} ({engine})", f"{expected} vs {actual}"))
+
+
+def best_time(func, repeat):
+    """(best seconds, last result) of repeat calls"""
+    best = result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seeds", type=int, default=20, help="generated programs of the parity check")
+    arg_parser.add_argument("-n", "--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    programs = []
+    for path in sorted(glob.glob(PROGRAMS)):
+        with open(path, 'r', encoding='utf-8') as f:
+            programs.append((os.path.basename(path), checked_ast(f.read())))
+    generated = [(f"generated #{seed}", checked_ast(generate_program(seed))) for seed in range(args.seeds)]
+
+    failures = []
+    checked = 0
+    for name, ast in programs + generated:
+        if ast is None:
+            failures.append((name, "does not compile"))
+            continue
+        for optimize in (False, True):
+            check(name, ast, optimize, failures)
+            checked += 1
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    print(f"{'✓' if not failures else '✗'} {checked} programs return and print the same with "
+          f"superinstructions on the interpreter, translator, binary TSM and profiler\n")
+
+    print(f"{'Program':<14} | {'Opt':<3} | {'Plain instrs':>12} | {'Fused instrs':>12} | {'Saved':>6} | "
+          f"{'Plain ms':>8} | {'Fused ms':>8}")
+    print('-' * 82)
+    for name, ast in programs:
+        if ast is None:
+            continue
+        for optimize in (False, True):
+            plain = load(format_program(generate_procs(ast, optimize)))
+            fused = load(format_program(generate_procs(ast, optimize, superinstructions=True)))
+            plain_time, plain_result = best_time(lambda: run_program(plain, io.StringIO(), io.StringIO()),
+                                                 args.repeat)
+            fused_time, fused_result = best_time(lambda: run_program(fused, io.StringIO(), io.StringIO()),
+                                                 args.repeat)
+            saved = 1 - fused_result.instructions / plain_result.instructions
+            print(f"{name:<14} | {'-O' if optimize else '':<3} | {plain_result.instructions:>12,} | "
+                  f"{fused_result.instructions:>12,} | {saved:>6.1%} | {plain_time * 1000:>8.1f} | "
+                  f"{fused_time * 1000:>8.1f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# bench_tables.py
+"""Compact binary LALR tables vs PLY's parsetab.py: load time, memory, first parse and parity"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_parser import corpus
+from Driver.pipeline import parse
+from Lexer.scanner import tokenize
+from Parser.ast_nodes import ast_equal
+from Parser.lrtables import TABLE_FILE
+
+PROGRAM = os.path.join(ROOT, 'benchmarks', 'programs', 'loops.tes')
+PARSETAB = os.path.join(ROOT, 'Parser', 'parsetab.py')
+
+# Runs in a fresh interpreter: time building the parser and its first parse,
+# or with trace set, the memory held by the loaded tables
+SNIPPET = '''
+import json, sys, time, tracemalloc
+sys.path.insert(0, {root!r})
+import Parser.parser as grammar
+from Lexer.lexer import make_lexer
+with open({program!r}, 'r', encoding='utf-8') as f:
+    code = f.read()
+if {trace!r}:
+    tracemalloc.start()
+start = time.perf_counter()
+parser = grammar.make_parser({kind!r})
+loaded = time.perf_counter()
+memory = tracemalloc.get_traced_memory()[0] if {trace!r} else 0
+tracemalloc.stop()
+lexer = make_lexer('ply')
+grammar.reset_parser_state()
+before = time.perf_counter()
+ast = parser.parse(code, lexer=lexer)
+parsed = time.perf_counter()
+print(json.dumps({{'load': loaded - start, 'parse': parsed - before, 'memory': memory, 'ok': ast is not None}}))
+'''
+
+
+def run_snippet(kind, program, trace=False):
+    """Measurements of one fresh interpreter; bytecode caching stays on, as users see it"""
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    code = SNIPPET.format(root=ROOT, program=program, kind=kind, trace=trace)
+    proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def measure(kind, program, repeat):
+    """Best load and first-parse seconds over repeat processes, and traced table memory"""
+    runs = [run_snippet(kind, program) for _ in range(repeat)]
+    memory = run_snippet(kind, program, trace=True)['memory']
+    return min(run['load'] for run in runs), min(run['parse'] for run in runs), memory
+
+
+def check_parity(seeds):
+    """Inputs on which the table-driven parser and ply.yacc disagree, errors included"""
+    failures = []
+    for name, code in corpus(seeds):
+        tokens, _ = tokenize(code)
+        expected, expected_errors = parse(tokens, code, 'ply')
+        actual, actual_errors = parse(tokens, code, 'lalr')
+        if expected_errors != actual_errors:
+            failures.append((name, f"errors: ply {expected_errors} vs lalr {actual_errors}"))
+        elif not ast_equal(expected, actual):
+            failures.append((name, "ASTs differ"))
+    return failures
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", "--repeat", type=int, default=10, help="processes per parser")
+    arg_parser.add_argument("--seeds", type=int, default=50, help="seeds of the parity corpus")
+    arg_parser.add_argument("--program", default=PROGRAM, help="TesLang file for the first parse")
+    args = arg_parser.parse_args(argv)
+
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        failures = check_parity(args.seeds)
+    for name, difference in failures:
+        print(f"✗ {name}: {difference}")
+    print(f"{'✓' if not failures else '✗'} table-driven parser matches ply.yacc on "
+          f"{3 * args.seeds} generated inputs and the sample programs\n")
+
+    print(f"parsetab.py: {os.path.getsize(PARSETAB) / 1024:.1f} KB, "
+          f"parsetab.bin: {os.path.getsize(TABLE_FILE) / 1024:.1f} KB\n")
+    print(f"{'Parser':<8} | {'Load ms':>8} | {'Tables KB':>9} | {'First parse ms':>14}")
+    print('-' * 50)
+    results = {}
+    for kind in ('ply', 'lalr'):
+        load, first_parse, memory = measure(kind, args.program, args.repeat)
+        results[kind] = load + first_parse
+        print(f"{kind:<8} | {load * 1000:>8.2f} | {memory / 1024:>9.1f} | {first_parse * 1000:>14.2f}")
+    print(f"\nload + first parse: {results['ply'] / results['lalr']:.1f}x faster with the compact tables")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
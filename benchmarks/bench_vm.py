@@ -0,0 +1,190 @@
+# bench_vm.py
+"""Compare the TSM interpreter, the TSM translator and the Python backend on sample programs"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from IR.codegen import compile_teslang_with_codegen
+from IR.pycodegen import compile_teslang_to_python
+from VM.interpreter import load, run_program
+from VM.translator import translate
+
+PROGRAMS = os.path.join(ROOT, 'benchmarks', 'programs', '*.tes')
+
+# Sources whose corner cases the sample programs do not reach
+PARITY_SOURCES = {
+    'for loop whose body raises its bound': """funk main() <int> {
+    s :: int = 0;
+    n :: int = 3;
+    for (i = 0 to n)
+    begin
+        s = s + i;
+        if [[n < 5]] n = n + 1;
+    end
+    print(s);
+    print(i);
+    return 0;
+}
+""",
+    'tail call behind a folded condition': """funk rec(n as int, a as int) <int> {
+    if [[n <= 0 || a > 1000]] return a;
+    return (true || a == n) ? rec(n - 1, a + 5) : rec(n - 1, a);
+}
+funk main() <int> {
+    print(rec(3, 0));
+    print(rec(4, 0));
+    return 0;
+}
+""",
+}
+
+# Procs the structurer rejects, so the translator runs them through block dispatch
+DISPATCH_CASES = {
+    'jump into a loop, then jnz to the next block': """proc main
+mov r1, 0
+mov r2, 1
+jmp inside
+top:
+mov r3, 1
+add r1, r1, r3
+inside:
+mov r4, 3
+cmp< r5, r1, r4
+jnz r5, top
+jnz r2, after
+after:
+call iput, r1
+mov r0, r1
+ret
+""",
+}
+
+
+def best_of(repeat, func):
+    """Run func repeat times and return (best seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def check_parity_sources():
+    """Names of PARITY_SOURCES that print differently under -O, on the translator or the Python backend"""
+    failures = []
+    for name, source in PARITY_SOURCES.items():
+        code, errors = compile_teslang_with_codegen(source)
+        optimized, optimize_errors = compile_teslang_with_codegen(source, optimize=True)
+        python_program, python_errors = compile_teslang_to_python(source, name)
+        if errors or optimize_errors or python_errors:
+            failures.append(name)
+            continue
+        outputs = [io.StringIO() for _ in range(4)]
+        run_program(load(code), output_stream=outputs[0])
+        run_program(load(optimized), output_stream=outputs[1])
+        translate(code).run(output_stream=outputs[2])
+        python_program.run(output_stream=outputs[3])
+        if len({out.getvalue() for out in outputs}) != 1:
+            failures.append(name)
+    return failures
+
+
+def check_dispatch_cases():
+    """Names of DISPATCH_CASES whose translation is structured or runs differently"""
+    failures = []
+    for name, code in DISPATCH_CASES.items():
+        program = translate(code)
+        out, translated_out = io.StringIO(), io.StringIO()
+        result = run_program(load(code), output_stream=out)
+        translated = program.run(output_stream=translated_out)
+        if program.structured_procs or (result.return_value, out.getvalue()) != \
+                (translated.return_value, translated_out.getvalue()):
+            failures.append(name)
+    return failures
+
+
+def bench_program(path, optimize, repeat):
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    code, errors = compile_teslang_with_codegen(source, optimize=optimize)
+    if errors:
+        raise RuntimeError(f"{path}: {errors}")
+    python_program, errors = compile_teslang_to_python(source, path)
+    if errors:
+        raise RuntimeError(f"{path}: {errors}")
+
+    def interpret():
+        out = io.StringIO()
+        result = run_program(load(code), output_stream=out)
+        return out.getvalue(), result.instructions
+
+    def translated():
+        out = io.StringIO()
+        translate(code).run(output_stream=out)
+        return out.getvalue()
+
+    interp_time, (interp_out, instructions) = best_of(repeat, interpret)
+    translate_time, program = best_of(repeat, lambda: translate(code))
+    run_time, _ = best_of(repeat, lambda: program.run(output_stream=io.StringIO()))
+    python_time, _ = best_of(repeat, lambda: python_program.run(output_stream=io.StringIO()))
+    translated_out = translated()
+    if translated_out != interp_out:
+        raise RuntimeError(f"{path}: translator output differs from the interpreter")
+    python_out = io.StringIO()
+    python_program.run(output_stream=python_out)
+    if python_out.getvalue() != interp_out:
+        raise RuntimeError(f"{path}: Python backend output differs from the interpreter")
+    return {
+        'program': os.path.basename(path),
+        'instructions': instructions,
+        'interpreter': interp_time,
+        'translate': translate_time,
+        'translated': run_time,
+        'python': python_time,
+        'structured': len(program.structured_procs), 'procs': len(program.translators),
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("programs", nargs="*", help="TesLang sources (default: benchmarks/programs)")
+    arg_parser.add_argument("-O", "--optimize", action="store_true", help="optimize generated code")
+    arg_parser.add_argument("-n", "--repeat", type=int, default=3, help="runs per measurement")
+    args = arg_parser.parse_args(argv)
+
+    paths = args.programs or sorted(glob.glob(PROGRAMS))
+    parity_failures = check_parity_sources()
+    for name in parity_failures:
+        print(f"✗ {name}: engines print different output")
+    print(f"{'✓' if not parity_failures else '✗'} {len(PARITY_SOURCES) - len(parity_failures)}/"
+          f"{len(PARITY_SOURCES)} sources print the same with and without -O on every engine")
+    failures = check_dispatch_cases()
+    for name in failures:
+        print(f"✗ {name}: block dispatch differs from the interpreter")
+    print(f"{'✓' if not failures else '✗'} {len(DISPATCH_CASES) - len(failures)}/{len(DISPATCH_CASES)} "
+          f"unstructured procs run the same through block dispatch\n")
+    failures += parity_failures
+    print(f"{'Program':<16} | {'Instrs':>10} | {'Interp ms':>10} | {'Compile ms':>10} | "
+          f"{'Run ms':>9} | {'Speedup':>7} | {'Python ms':>9} | Structured")
+    print('-' * 102)
+    for path in paths:
+        row = bench_program(path, args.optimize, args.repeat)
+        speedup = row['interpreter'] / row['translated'] if row['translated'] else 0
+        print(f"{row['program']:<16} | {row['instructions']:>10} | {row['interpreter'] * 1000:>10.1f} | "
+              f"{row['translate'] * 1000:>10.1f} | {row['translated'] * 1000:>9.1f} | {speedup:>6.1f}x | "
+              f"{row['python'] * 1000:>9.1f} | {row['structured']}/{row['procs']}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
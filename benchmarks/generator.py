@@ -0,0 +1,199 @@
+# generator.py
+"""Seeded generator of valid, terminating TesLang programs for benchmarks"""
+
+import argparse
+import random
+import sys
+
+
+class ProgramGenerator:
+    """Builds a program from a random seed and a few size knobs
+
+    Every function returns int. Locals are either fixed (assigned once) or
+    accumulators (only ever incremented), loops have constant trip counts and
+    functions only call functions defined before them, so generated programs
+    pass semantic analysis and always terminate.
+    """
+
+    def __init__(self, seed=0, functions=10, depth=3, expr_depth=3, loop_count=10,
+                 vectors=1, statements=6):
+        self.random = random.Random(seed)
+        self.function_count = functions
+        self.depth = depth
+        self.expr_depth = expr_depth
+        self.loop_count = loop_count
+        self.vectors = vectors
+        self.statements = statements
+        self.lines = []
+        self.functions = []
+
+    def name(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def emit(self, indent, text):
+        self.lines.append("    " * indent + text)
+
+    def generate(self):
+        for i in range(self.function_count):
+            self.function(f"fn{i}", self.random.randint(1, 3))
+        self.main()
+        return '\n'.join(self.lines) + '\n'
+
+    # Expressions
+
+    def atom(self, scope):
+        choices = scope['ints'] + scope['loop_vars']
+        if scope['elements'] and self.random.random() < 0.3:
+            vector, index = self.random.choice(scope['elements'])
+            return f"{vector}[{index}]"
+        if choices and self.random.random() < 0.7:
+            return self.random.choice(choices)
+        return str(self.random.randint(0, 99))
+
+    def expression(self, scope, depth=None):
+        depth = self.expr_depth if depth is None else depth
+        if depth <= 0 or self.random.random() < 0.25:
+            return self.atom(scope)
+        kind = self.random.random()
+        left = self.expression(scope, depth - 1)
+        if kind < 0.5:
+            op = self.random.choice(['+', '-'])
+            return f"{left} {op} {self.expression(scope, depth - 1)}"
+        if kind < 0.7:
+            return f"({left}) * {self.random.randint(2, 9)}"
+        if kind < 0.85:
+            return f"({left}) / {self.random.randint(1, 9)}"
+        condition = self.condition(scope, depth - 1)
+        return f"(({condition}) ? ({left}) : ({self.expression(scope, depth - 1)}))"
+
+    def condition(self, scope, depth=1):
+        op = self.random.choice(['<', '>', '<=', '>=', '==', '!='])
+        return f"{self.expression(scope, depth)} {op} {self.expression(scope, depth)}"
+
+    # Statements
+
+    def function(self, name, param_count):
+        self.counter = 0
+        params = [f"p{i}" for i in range(param_count)]
+        self.emit(0, f"funk {name}({', '.join(p + ' as int' for p in params)}) <int> {{")
+        scope = {'ints': list(params), 'loop_vars': [], 'elements': [], 'accumulators': []}
+
+        for _ in range(self.random.randint(1, 3)):
+            local = self.name('x')
+            value = self.expression(scope)
+            if self.functions and self.random.random() < 0.4:
+                callee, count = self.random.choice(self.functions)
+                args = ', '.join(self.atom(scope) for _ in range(count))
+                value = f"{callee}({args}) / 1000 + {value}"
+            self.emit(1, f"{local} :: int = {value};")
+            scope['ints'].append(local)
+        for _ in range(self.random.randint(1, 2)):
+            accumulator = self.name('acc')
+            self.emit(1, f"{accumulator} :: int = 0;")
+            scope['accumulators'].append(accumulator)
+
+        vectors = []
+        for _ in range(self.vectors):
+            vector = self.name('v')
+            self.emit(1, f"{vector} :: vector = list({self.random.randint(1, self.loop_count)});")
+            index = self.name('i')
+            self.emit(1, f"for ({index} = 0 to length({vector}))")
+            self.emit(1, "begin")
+            inner = dict(scope, loop_vars=scope['loop_vars'] + [index])
+            self.emit(2, f"{vector}[{index}] = {self.expression(inner)};")
+            self.emit(1, "end")
+            vectors.append(vector)
+        scope['vectors'] = vectors
+
+        for _ in range(self.statements):
+            self.statement(scope, 1, self.depth)
+        total = ' + '.join(scope['accumulators'])
+        self.emit(1, f"return {total} + {self.random.choice(scope['ints'])};")
+        self.emit(0, "}")
+        self.emit(0, "")
+        self.functions.append((name, param_count))
+
+    def statement(self, scope, indent, depth):
+        kind = self.random.random() if depth > 0 else 0
+        if kind < 0.4:
+            accumulator = self.random.choice(scope['accumulators'])
+            op = self.random.choice(['+', '-'])
+            self.emit(indent, f"{accumulator} = {accumulator} {op} {self.expression(scope)};")
+        elif kind < 0.6:
+            self.for_loop(scope, indent, depth)
+        elif kind < 0.7 and scope['vectors']:
+            self.vector_loop(scope, indent, depth)
+        elif kind < 0.8:
+            self.while_loop(scope, indent, depth)
+        else:
+            self.emit(indent, f"if [[{self.condition(scope)}]]")
+            self.block(scope, indent, depth - 1)
+            if self.random.random() < 0.5:
+                self.emit(indent, "else")
+                self.block(scope, indent, depth - 1)
+
+    def block(self, scope, indent, depth):
+        self.emit(indent, "begin")
+        for _ in range(self.random.randint(1, 3)):
+            self.statement(scope, indent + 1, depth)
+        self.emit(indent, "end")
+
+    def for_loop(self, scope, indent, depth):
+        index = self.name('i')
+        start = self.random.randint(0, 3)
+        self.emit(indent, f"for ({index} = {start} to {start + self.random.randint(1, self.loop_count)})")
+        self.block(dict(scope, loop_vars=scope['loop_vars'] + [index]), indent, depth - 1)
+
+    def vector_loop(self, scope, indent, depth):
+        vector = self.random.choice(scope['vectors'])
+        index = self.name('i')
+        self.emit(indent, f"for ({index} = 0 to length({vector}))")
+        inner = dict(scope, loop_vars=scope['loop_vars'] + [index],
+                     elements=scope['elements'] + [(vector, index)])
+        self.block(inner, indent, depth - 1)
+
+    def while_loop(self, scope, indent, depth):
+        counter = self.name('w')
+        self.emit(indent, f"{counter} :: int = 0;")
+        self.emit(indent, f"while [[{counter} < {self.random.randint(1, self.loop_count)}]]")
+        self.emit(indent, "begin")
+        inner = dict(scope, loop_vars=scope['loop_vars'] + [counter])
+        for _ in range(self.random.randint(1, 2)):
+            self.statement(inner, indent + 1, depth - 1)
+        self.emit(indent + 1, f"{counter} = {counter} + 1;")
+        self.emit(indent, "end")
+
+    def main(self):
+        self.counter = 0
+        self.emit(0, "funk main() <int> {")
+        for name, count in self.functions:
+            args = ', '.join(str(self.random.randint(0, 20)) for _ in range(count))
+            self.emit(1, f"print({name}({args}));")
+        self.emit(1, "return 0;")
+        self.emit(0, "}")
+
+
+def generate_program(seed=0, **options):
+    """Source text of a generated program; see ProgramGenerator for the options"""
+    return ProgramGenerator(seed, **options).generate()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--functions", type=int, default=10)
+    arg_parser.add_argument("--depth", type=int, default=3, help="statement nesting depth")
+    arg_parser.add_argument("--expr-depth", type=int, default=3, help="expression nesting depth")
+    arg_parser.add_argument("--loops", type=int, default=10, help="maximum loop trip count")
+    arg_parser.add_argument("--vectors", type=int, default=1, help="vectors per function")
+    arg_parser.add_argument("--statements", type=int, default=6, help="top-level statements per function")
+    args = arg_parser.parse_args(argv)
+    sys.stdout.write(generate_program(args.seed, functions=args.functions, depth=args.depth,
+                                      expr_depth=args.expr_depth, loop_count=args.loops,
+                                      vectors=args.vectors, statements=args.statements))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,79 @@
 import sys
 import os
+import argparse
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from Lexer import lexer
-    from Parser.parser import compile_teslang, parse_code, errors as parser_errors
-    from Parser.ast_nodes import print_ast_tree
-    from IR.codegen import compile_teslang_with_codegen
-except ImportError as e:
-    print(f"Import error: {e}")
-    print("Make sure all files are in the correct directory structure")
-    sys.exit(1)
+# The lexer, parser tables, code generator and AST printer are imported by
+# the steps that need them, so --tokens-only and --check start quickly.
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    arg_parser = argparse.ArgumentParser(description="TesLang Compiler")
+    arg_parser.add_argument("input_file", help="TesLang source file")
+    arg_parser.add_argument("--tokens-only", action="store_true",
+                            help="print the token stream and stop")
+    arg_parser.add_argument("--check", action="store_true",
+                            help="only parse and check the program; exit status 1 on errors")
+    arg_parser.add_argument("--lexer", choices=["ply", "dfa"], default="ply",
+                            help="PLY lexer or the hand-written scanner (default: ply)")
+    arg_parser.add_argument("--parser", choices=["lalr", "ply", "descent"], default="lalr",
+                            help="LALR parser on the compact tables, ply.yacc's own parser or the "
+                                 "recursive-descent parser (default: lalr)")
+    arg_parser.add_argument("-O", "--optimize", action="store_true",
+                            help="run loop optimizations on the generated code")
+    arg_parser.add_argument("--run", action="store_true",
+                            help="execute the generated code with the built-in TSM virtual machine")
+    arg_parser.add_argument("-s", "--stats", action="store_true",
+                            help="print VM statistics after --run")
+    arg_parser.add_argument("--engine", choices=["interp", "translate"], default="interp",
+                            help="execution engine for --run (default: interp)")
+    arg_parser.add_argument("--vm-profile", action="store_true",
+                            help="with --run, count executed instructions and print a per-proc, per-block "
+                                 "and per-source-line profile")
+    arg_parser.add_argument("--bounds-checks", action="store_true",
+                            help="emit run-time checks for vector indexing; a failed check calls abort, "
+                                 "so the output then only runs on the built-in VM")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="time each compiler phase and print a report")
+    arg_parser.add_argument("--profile-json", metavar="FILE",
+                            help="with --profile, also write the report as JSON")
+    arg_parser.add_argument("--profile-cprofile", metavar="FILE",
+                            help="with --profile, dump cProfile stats of the slowest phase")
+    arg_parser.add_argument("--backend", choices=["tsm", "python"], default="tsm",
+                            help="code generator: TSM text or Python functions (default: tsm)")
+    arg_parser.add_argument("-q", "--quiet", action="store_true",
+                            help="do not print the AST and the generated code; the code is still "
+                                 "written to the output file")
+    arg_parser.add_argument("--bytecode", action="store_true",
+                            help="also write the code as binary TSM (.tsb), which python -m VM.interpreter "
+                                 "runs straight from an mmap")
+    arg_parser.add_argument("--pipeline", action="store_true",
+                            help="check, generate and write each top-level function as soon as it is "
+                                 "parsed, keeping one function in memory at a time; the AST and the "
+                                 "code are not printed")
+    arg_parser.add_argument("--superinstructions", action="store_true",
+                            help="fuse compares with the branches after them and fold constant operands; "
+                                 "the output then only runs on the built-in VM")
+    args = arg_parser.parse_args(argv)
+    if args.backend == "python" and args.optimize:
+        arg_parser.error("--backend python has no optimizer; -O only applies to TSM")
+    if args.pipeline and (args.optimize or args.backend != "tsm" or args.vm_profile or args.superinstructions):
+        arg_parser.error("--pipeline cannot be combined with -O, --backend python, --vm-profile or "
+                         "--superinstructions, which need the whole program")
+    return args
+
+def output_path(input_file):
+    """Where the generated code of input_file is written"""
+    output_file = input_file.replace('.tl', '.tsm').replace('.txt', '.tsm')
+    if output_file == input_file:
+        output_file = input_file + '.tsm'
+    return output_file
 
 def main():
     """Handle file input"""
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <input_file>")
-        print("Or run without arguments to test the example code")
-        main()  
-        return
-    
-    input_file = sys.argv[1]
+    args = parse_args()
+    input_file = args.input_file
     
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
@@ -32,13 +84,34 @@ def main():
     except Exception as e:
         print(f"Error reading file: {e}")
         sys.exit(1)
+
+    if args.tokens_only:
+        from Lexer.lexer import print_tokens
+        print_tokens(code, args.lexer)
+        return 0
+    if args.check:
+        return check_program(code, input_file, args.lexer, args.parser)
     
     print(f"TesLang Compiler - Processing: {input_file}")
     print("=" * 50)
+
+    if args.profile:
+        profile_compilation(code, input_file, args)
+        return
+
+    if args.pipeline:
+        intermediate_code = compile_pipelined_file(code, output_path(input_file), args)
+        if intermediate_code:
+            run_intermediate_code(intermediate_code, args.stats, args.engine)
+        return
     
+    from Lexer.lexer import make_lexer
+    from Parser.parser import compile_teslang, parse_code
+    from Parser.ast_nodes import print_ast_tree
+
     # Step 1 & 2: Parse and perform semantic analysis
     print("Step 1 & 2: Parsing and Semantic Analysis...")
-    errors = compile_teslang(code)
+    errors = compile_teslang(code, make_lexer(args.lexer), args.parser)
     
     if errors:
         print("Compilation errors found:")
@@ -48,38 +121,255 @@ def main():
         return
     else:
         print("✓ Parsing and semantic analysis successful")
-        ast = parse_code(code)
-        print_ast_tree(ast, "Abstract Syntax Tree (AST)")
+        ast = parse_code(code, make_lexer(args.lexer), args.parser)
+        if not args.quiet:
+            print_ast_tree(ast, "Abstract Syntax Tree (AST)")
 
 
     
-    # Step 3: Generate intermediate code
+    if args.backend == "python":
+        run_python_backend(ast, input_file, args)
+        return
+
+    # Step 3: Generate intermediate code, streamed to the output file proc by proc
     print("\nStep 3: Generating Intermediate Code...")
     print("-" * 30)
-    
-    intermediate_code, codegen_errors = compile_teslang_with_codegen(code)
-    
-    if codegen_errors:
-        print("Code generation errors:")
-        for error in codegen_errors:
-            print(error)
-    else:
-        print("✓ Code generation successful")
+
+    intermediate_code = write_intermediate_code(ast, output_path(input_file), args)
+    if intermediate_code is None:
+        return
+
+    if args.run and args.vm_profile:
+        run_vm_profile(ast, code, args)
+    elif args.run:
+        run_intermediate_code(intermediate_code, args.stats, args.engine)
+
+def write_intermediate_code(ast, output_file, args):
+    """Generate TSM code straight into output_file, echoing it unless quiet
+
+    Returns the code when --run needs it, '' when it does not, or None if
+    code generation failed.
+    """
+    import io
+    from IR.codegen import write_code
+    from IR.linemap import map_path
+    from IR.writer import TsmWriter
+
+    if not args.quiet:
         print("\nGenerated Intermediate Code:")
         print("=" * 50)
-        print(intermediate_code)
+
+    try:
+        out = open(output_file, 'w', encoding='utf-8', buffering=1 << 16)
+    except OSError as e:
+        print(f"\n⚠ Could not save output file: {e}")
+        output_file, out = None, io.StringIO()
+
+    try:
+        with out:
+            writer = TsmWriter(out, None if args.quiet else sys.stdout)
+            write_code(ast, writer, args.optimize, args.bounds_checks, args.superinstructions)
+            intermediate_code = out.getvalue() if output_file is None else ''
+    except Exception as e:
+        print("\nCode generation errors:")
+        print(f"Compiler error: {str(e)}")
+        if output_file is not None:
+            os.remove(output_file)
+        return None
+
+    if not args.quiet:
+        print()
         print("=" * 50)
-        
-        output_file = input_file.replace('.tl', '.tsm').replace('.txt', '.tsm')
-        if output_file == input_file:
-            output_file = input_file + '.tsm'
-        
+    print("✓ Code generation successful")
+    if output_file is None:
+        return intermediate_code
+    print(f"\n✓ Intermediate code saved to: {output_file}")
+    try:
+        writer.line_map.write(map_path(output_file))
+        print(f"✓ Line map saved to: {map_path(output_file)}")
+    except Exception as e:
+        print(f"\n⚠ Could not save output file: {e}")
+    if args.bytecode:
+        save_bytecode(output_file, writer.line_map)
+    if args.run and not args.vm_profile:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    return ''
+
+def compile_pipelined_file(code, output_file, args):
+    """Compile one function at a time straight into output_file
+
+    Returns the code when --run needs it, '' when it does not, or None if
+    compilation failed, in which case the output file is removed.
+    """
+    from Driver.pipeline import compile_pipelined
+    from IR.linemap import map_path
+    from IR.writer import TsmWriter
+
+    print("Pipelined compilation: parsing, semantic analysis and code generation per function...")
+    try:
+        out = open(output_file, 'w', encoding='utf-8', buffering=1 << 16)
+    except OSError as e:
+        print(f"Error: could not open output file: {e}")
+        return None
+    try:
+        with out:
+            writer = TsmWriter(out)
+            errors = compile_pipelined(code, writer, args.bounds_checks, args.lexer, args.parser)
+    except Exception as e:
+        errors = [f"Compiler error: {str(e)}"]
+
+    if errors:
+        os.remove(output_file)
+        print("Compilation errors found:")
+        print("-" * 30)
+        for error in errors:
+            print(error)
+        return None
+    print("✓ Parsing, semantic analysis and code generation successful")
+    print(f"\n✓ Intermediate code saved to: {output_file}")
+    try:
+        writer.line_map.write(map_path(output_file))
+        print(f"✓ Line map saved to: {map_path(output_file)}")
+    except Exception as e:
+        print(f"\n⚠ Could not save output file: {e}")
+    if args.bytecode:
+        save_bytecode(output_file, writer.line_map)
+    if args.run:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    return ''
+
+def save_bytecode(output_file, line_map):
+    """Assemble the written code, with its line map, into a .tsb file next to it"""
+    from IR.linemap import LineMap
+    from VM.bytecode import assemble, bytecode_path
+
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            data = assemble(f.read(), LineMap.decode(line_map.encode()))
+        with open(bytecode_path(output_file), 'wb') as f:
+            f.write(data)
+        print(f"✓ Binary code saved to: {bytecode_path(output_file)} ({len(data)} bytes)")
+    except Exception as e:
+        print(f"\n⚠ Could not save binary code: {e}")
+
+def check_program(code, input_file, lexer="ply", parser="lalr"):
+    """Parse and analyze only: print diagnostics and return the exit status"""
+    from Lexer.lexer import make_lexer
+    from Parser.parser import compile_teslang
+
+    errors = compile_teslang(code, make_lexer(lexer), parser)
+    for error in errors:
+        print(f"{input_file}: {error}")
+    if errors:
+        return 1
+    print(f"✓ {input_file}: no errors")
+    return 0
+
+def profile_compilation(code, input_file, args):
+    """Compile once through the instrumented pipeline and report each phase"""
+    from Driver.pipeline import compile_source
+    from Driver.profiler import PhaseProfiler
+
+    profiler = PhaseProfiler()
+    result = compile_source(code, args.optimize, args.bounds_checks, profiler, args.lexer,
+                            args.parser)
+    if result.errors:
+        print("Compilation errors found:")
+        for error in result.errors:
+            print(error)
+    print("\nCompiler phase profile:")
+    print(profiler.report())
+    if args.profile_json:
+        profiler.write_json(args.profile_json, file=input_file, lines=code.count('\n') + 1)
+        print(f"\n✓ Profile saved to: {args.profile_json}")
+    if args.profile_cprofile:
+        phase, stats = profiler.profile_slowest(args.profile_cprofile)
+        print(f"\ncProfile of the slowest phase ({phase}):")
+        print(stats)
+        print(f"✓ cProfile stats saved to: {args.profile_cprofile}")
+
+def run_python_backend(ast, input_file, args):
+    """Compile the checked AST to Python functions and optionally run them"""
+    import time
+    from IR.pycodegen import compile_to_python, TesLangRuntimeError
+
+    print("\nStep 3: Generating Python Code...")
+    print("-" * 30)
+    try:
+        program = compile_to_python(ast, input_file)
+    except (TypeError, SyntaxError) as e:
+        print("Code generation errors:")
+        print(f"Compiler error: {e}")
+        return
+    print("✓ Code generation successful")
+    if not args.quiet:
+        print("\nGenerated Python Code:")
+        print("=" * 50)
+        print(program.source)
+        print("=" * 50)
+
+    if args.run:
+        print("\nStep 4: Running the compiled Python functions...")
+        print("-" * 30)
+        start = time.perf_counter()
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(intermediate_code)
-            print(f"\n✓ Intermediate code saved to: {output_file}")
-        except Exception as e:
-            print(f"\n⚠ Could not save output file: {e}")
+            value = program.run()
+        except TesLangRuntimeError as e:
+            print(f"Runtime error: {e}")
+            return
+        elapsed = time.perf_counter() - start
+        sys.stdout.flush()
+        print("-" * 30)
+        print(f"✓ Program returned {value}")
+        if args.stats:
+            print(f"time: {elapsed * 1000:.2f} ms")
+
+def run_intermediate_code(intermediate_code, show_stats, engine="interp"):
+    """Execute generated code on the local TSM virtual machine"""
+    from VM.interpreter import load, run_program, VMError
+
+    print("\nStep 4: Running on the TSM virtual machine...")
+    print("-" * 30)
+    try:
+        if engine == "translate":
+            from VM.translator import translate
+            result = translate(intermediate_code).run()
+        else:
+            result = run_program(load(intermediate_code))
+    except VMError as e:
+        print(f"Runtime error: {e}")
+        return
+    sys.stdout.flush()
+    print("-" * 30)
+    print(f"✓ Program returned {result.return_value}")
+    if show_stats:
+        if result.instructions is None:
+            print(f"time: {result.elapsed * 1000:.2f} ms")
+        else:
+            print(result.report())
+
+def run_vm_profile(ast, code, args):
+    """Execute on the profiling interpreter and print where the time went"""
+    from IR.codegen import generate_procs
+    from VM.interpreter import VMError
+    from VM.profiler import profile_procs
+
+    print("\nStep 4: Profiling on the TSM virtual machine...")
+    print("-" * 30)
+    try:
+        procs = generate_procs(ast, args.optimize, args.bounds_checks, args.superinstructions)
+        result, machine = profile_procs(procs)
+    except VMError as e:
+        print(f"Runtime error: {e}")
+        return
+    sys.stdout.flush()
+    print("-" * 30)
+    print(f"✓ Program returned {result.return_value}")
+    print(result.report())
+    print()
+    print(machine.report(code))
 
 if __name__ == "__main__":
-        main()
+        sys.exit(main())
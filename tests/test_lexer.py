@@ -0,0 +1,19 @@
+# test_lexer.py
+"""The hand-written scanner gives the PLY lexer's tokens and diagnostics on every input"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_lexer import check_equivalence, corpus
+
+INPUTS = corpus(seeds=30)
+
+
+@pytest.mark.parametrize("name, code", INPUTS, ids=[name for name, _ in INPUTS])
+def test_dfa_lexes_like_ply(name, code):
+    assert check_equivalence([(name, code)]) == []
@@ -0,0 +1,21 @@
+# test_parser.py
+"""The recursive-descent parser builds the LALR parser's AST, or reports its first syntax error"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_parser import compare, corpus
+
+INPUTS = corpus(seeds=100)
+
+
+@pytest.mark.parametrize("name, code", INPUTS, ids=[name for name, _ in INPUTS])
+def test_descent_parses_like_lalr(name, code):
+    failures = []
+    compare(name, code, failures)
+    assert failures == []